@@ -0,0 +1,58 @@
+"""
+Near-duplicate clustering of the TwExportly tweets (MinHash/LSH) and of an image folder
+(perceptual hashes and a BK-tree): time taken and LLM calls saved. No API call is made.
+
+Run from the `main` directory:
+
+    python benchmarks/dedup.py --images data/image_compressed_cristiano --threshold 0.8 --max-distance 6
+"""
+import os
+import sys
+import glob
+import json
+import time
+import argparse
+
+MAIN_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, MAIN_DIR)
+
+from scripts.dedup import TextDeduplicator, ImageDeduplicator, cluster_sizes  # noqa: E402
+from scripts.twexportly import TwExportlyLoader  # noqa: E402
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark near-duplicate clustering of tweets and images.")
+    parser.add_argument("--tweets", default=os.path.join("data", "TwExportly"))
+    parser.add_argument("--images", default=os.path.join("data", "image_compressed_cristiano"))
+    parser.add_argument("--threshold", type=float, default=0.8)
+    parser.add_argument("--max-distance", type=int, default=6)
+    parser.add_argument("--method", default="dhash", choices=["dhash", "phash"])
+    parser.add_argument("--output", default=None, help="JSON report path (default: print only).")
+    args = parser.parse_args()
+
+    os.chdir(MAIN_DIR)
+    texts = TwExportlyLoader().read_directory(args.tweets)["text"].tolist()
+    tstart = time.perf_counter()
+    text_labels = TextDeduplicator(threshold=args.threshold).cluster(texts)
+    text_report = dict(cluster_sizes(text_labels), seconds=time.perf_counter() - tstart)
+
+    image_paths = sorted(p for p in glob.glob(os.path.join(args.images, "**", "*"), recursive=True)
+                         if p.lower().endswith((".jpg", ".jpeg", ".png")))
+    tstart = time.perf_counter()
+    image_labels = ImageDeduplicator(max_distance=args.max_distance, method=args.method).cluster(image_paths)
+    image_report = dict(cluster_sizes(image_labels), seconds=time.perf_counter() - tstart)
+
+    report = {"tweets": text_report, "images": image_report, "threshold": args.threshold,
+              "max_distance": args.max_distance, "method": args.method}
+    for name in ("tweets", "images"):
+        result = report[name]
+        print(f"✅ {name}: {result['items']:,} items -> {result['clusters']:,} calls "
+              f"({result['calls_saved']:,} saved) in {result['seconds']:.2f} s")
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump(report, f, indent=2)
+        print(f"Saved report to {args.output}")
+
+
+if __name__ == "__main__":
+    main()
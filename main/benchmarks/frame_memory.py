@@ -0,0 +1,76 @@
+"""
+Peak memory (tracemalloc) of building a video description request.
+
+Compares the previous payload path (base64 list from `extract_frames`, then data URLs,
+then the message dict) with the lazy path of `generate_video_description`
+(`_video_frame_urls`, optionally with a byte budget). Both paths end with the request body
+serialized to JSON, as the OpenAI client does. No API call is made.
+
+Run from the `main` directory on a long video:
+
+    python benchmarks/frame_memory.py --video data/movie.mp4 --max-samples 15 --max-request-bytes 4000000
+"""
+import os
+import sys
+import json
+import time
+import argparse
+import tracemalloc
+
+MAIN_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, MAIN_DIR)
+
+from scripts.genai import GenAI, MAX_VISION_REQUEST_BYTES  # noqa: E402
+
+
+def legacy_payload(jarvis, video, max_samples):
+    base64_frames, _, _ = jarvis.extract_frames(video, max_samples)
+    image_urls = [f"data:image/jpeg;base64,{frame}" for frame in base64_frames]
+    messages = GenAI._vision_messages("Describe this video.", image_urls)
+    return json.dumps({"model": "gpt-4o-mini", "messages": messages, "max_tokens": 1000})
+
+
+def lazy_payload(jarvis, video, max_samples, max_request_bytes):
+    image_urls, _, _ = jarvis._video_frame_urls(video, max_samples, max_request_bytes)
+    messages = GenAI._vision_messages("Describe this video.", image_urls)
+    return json.dumps({"model": "gpt-4o-mini", "messages": messages, "max_tokens": 1000})
+
+
+def measure(build):
+    tracemalloc.start()
+    tstart = time.perf_counter()
+    body = build()
+    seconds = time.perf_counter() - tstart
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return {"peak_mb": peak / 1e6, "body_mb": len(body) / 1e6, "seconds": seconds}
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Measure peak memory of video description payloads.")
+    parser.add_argument("--video", required=True)
+    parser.add_argument("--max-samples", type=int, default=15)
+    parser.add_argument("--max-request-bytes", type=int, default=MAX_VISION_REQUEST_BYTES)
+    parser.add_argument("--output", default=None, help="JSON report path (default: print only).")
+    args = parser.parse_args()
+
+    jarvis = GenAI("sk-unused")
+    report = {
+        "video": args.video,
+        "max_samples": args.max_samples,
+        "legacy": measure(lambda: legacy_payload(jarvis, args.video, args.max_samples)),
+        "lazy": measure(lambda: lazy_payload(jarvis, args.video, args.max_samples, None)),
+        "lazy_with_budget": measure(lambda: lazy_payload(jarvis, args.video, args.max_samples, args.max_request_bytes)),
+    }
+    report["max_request_bytes"] = args.max_request_bytes
+    for name in ("legacy", "lazy", "lazy_with_budget"):
+        result = report[name]
+        print(f"✅ {name}: peak {result['peak_mb']:.1f} MB, body {result['body_mb']:.1f} MB, {result['seconds']:.2f} s")
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump(report, f, indent=2)
+        print(f"Saved report to {args.output}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,68 @@
+"""
+Compares per-clip frame extraction (`GenAI.extract_frames` on every clip) with the
+single-pass sampler (`MovieAI.sample_clip_frames`) on a local video.
+
+Run from the `main` directory:
+
+    python benchmarks/frame_sampling.py --video data/movie.mp4 --segment-time 60 --max-width 768
+"""
+import os
+import sys
+import json
+import time
+import shutil
+import argparse
+import tempfile
+
+MAIN_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, MAIN_DIR)
+
+from scripts.movieai import MovieAI  # noqa: E402
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark per-clip vs single-pass frame sampling.")
+    parser.add_argument("--video", required=True)
+    parser.add_argument("--segment-time", type=int, default=60)
+    parser.add_argument("--max-samples", type=int, default=10)
+    parser.add_argument("--max-width", type=int, default=None)
+    parser.add_argument("--ffmpeg", default=shutil.which("ffmpeg") or "ffmpeg")
+    parser.add_argument("--output", default=None, help="JSON report path (default: print only).")
+    args = parser.parse_args()
+
+    movie = MovieAI("sk-unused", ffmpeg_path=args.ffmpeg)
+    clip_dir = tempfile.mkdtemp(prefix="frame_bench_")
+    try:
+        movie.split_video(args.video, clip_dir, segment_time=args.segment_time)
+        clip_paths, _ = movie.segment_boundaries(clip_dir)
+
+        tstart = time.perf_counter()
+        per_clip = [movie.extract_frames(clip_path, args.max_samples) for clip_path in clip_paths]
+        per_clip_s = time.perf_counter() - tstart
+
+        tstart = time.perf_counter()
+        single_pass = movie.sample_clip_frames(args.video, clip_dir, max_samples=args.max_samples,
+                                               max_width=args.max_width)
+        single_pass_s = time.perf_counter() - tstart
+    finally:
+        shutil.rmtree(clip_dir, ignore_errors=True)
+
+    report = {
+        "video": args.video,
+        "clips": len(clip_paths),
+        "per_clip": {"seconds": per_clip_s, "frames": sum(len(frames) for frames, _, _ in per_clip)},
+        "single_pass": {"seconds": single_pass_s, "frames": sum(len(frames) for frames, _, _ in single_pass.values()),
+                        "max_width": args.max_width},
+        "speedup": per_clip_s / single_pass_s if single_pass_s else None,
+    }
+    print(f"✅ per-clip: {per_clip_s:.1f} s, single pass: {single_pass_s:.1f} s ({report['speedup']:.1f}x)")
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump(report, f, indent=2)
+        print(f"Saved report to {args.output}")
+    else:
+        print(json.dumps(report, indent=2))
+
+
+if __name__ == "__main__":
+    main()
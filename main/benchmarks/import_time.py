@@ -0,0 +1,94 @@
+"""
+Measures the cold-start import time of the scripts modules with `python -X importtime`.
+
+Run from the `main` directory:
+
+    python benchmarks/import_time.py
+    python benchmarks/import_time.py scripts.movieai --top 20 --output benchmarks/results/import_time.json
+
+Each module is imported in a fresh interpreter so nothing is cached between runs.
+"""
+import os
+import sys
+import json
+import argparse
+import subprocess
+
+
+MAIN_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+DEFAULT_MODULES = ["scripts.genai", "scripts.movieai"]
+
+
+def measure_import(module, repeats=5):
+    """
+    Imports `module` in fresh interpreters under `-X importtime`.
+
+    Parameters:
+    ----------
+    module : str
+        Dotted module name, e.g. "scripts.genai".
+    repeats : int, optional (default=5)
+        Number of fresh interpreters. The run with the smallest total is reported.
+
+    Returns:
+    -------
+    dict
+        {"module", "total_us", "imports": [{"module", "self_us", "cumulative_us"}, ...]}
+        with imports sorted by cumulative time.
+    """
+    best = None
+    for _ in range(repeats):
+        result = subprocess.run(
+            [sys.executable, "-X", "importtime", "-c", f"import {module}"],
+            cwd=MAIN_DIR,
+            stdout=subprocess.PIPE,
+            stderr=subprocess.PIPE,
+            text=True,
+        )
+        if result.returncode != 0:
+            raise RuntimeError(f"❌ Importing {module} failed:\n{result.stderr[-2000:]}")
+
+        imports = []
+        for line in result.stderr.splitlines():
+            # "import time:      self [us] |  cumulative | imported package"
+            if not line.startswith("import time:") or "self [us]" in line:
+                continue
+            self_us, cumulative_us, name = line[len("import time:"):].split("|", 2)
+            imports.append({
+                "module": name.strip(),
+                "self_us": int(self_us),
+                "cumulative_us": int(cumulative_us),
+            })
+        total_us = sum(entry["self_us"] for entry in imports)
+        if best is None or total_us < best["total_us"]:
+            best = {"module": module, "total_us": total_us, "imports": imports}
+
+    best["imports"].sort(key=lambda entry: entry["cumulative_us"], reverse=True)
+    return best
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark import time of scripts modules.")
+    parser.add_argument("modules", nargs="*", default=DEFAULT_MODULES)
+    parser.add_argument("--repeats", type=int, default=5)
+    parser.add_argument("--top", type=int, default=10, help="Number of slowest imports to print.")
+    parser.add_argument("--output", default=None, help="Optional JSON file for the full report.")
+    args = parser.parse_args()
+
+    reports = []
+    for module in args.modules:
+        report = measure_import(module, args.repeats)
+        reports.append(report)
+        print(f"{module}: {report['total_us'] / 1000:.1f} ms")
+        for entry in report["imports"][:args.top]:
+            print(f"    {entry['cumulative_us'] / 1000:8.1f} ms  {entry['module']}")
+
+    if args.output:
+        os.makedirs(os.path.dirname(os.path.abspath(args.output)), exist_ok=True)
+        with open(args.output, "w") as f:
+            json.dump(reports, f, indent=2)
+        print(f"Saved report to {args.output}")
+
+
+if __name__ == "__main__":
+    main()
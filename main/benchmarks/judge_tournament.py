@@ -0,0 +1,91 @@
+"""
+Judge calls and ranking quality of `JudgeTournament` (Swiss rounds with Bradley-Terry
+fitting and early stopping) versus an all-pairs tournament.
+
+The judge is simulated: each candidate has a hidden quality and the judge prefers the
+better one with Bradley-Terry probability, so no API call is made and the true ranking
+is known.
+
+Run from the `main` directory:
+
+    python benchmarks/judge_tournament.py --candidates 16 32 64 --k 3 --noise 1.0
+"""
+import os
+import sys
+import json
+import random
+import argparse
+import threading
+from itertools import combinations
+
+import numpy as np
+
+MAIN_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, MAIN_DIR)
+
+from scripts.tournament import JudgeTournament, fit_bradley_terry  # noqa: E402
+
+
+def simulated_judge(quality, noise, seed):
+    rng = random.Random(seed)
+    lock = threading.Lock()
+
+    def judge(a, b):
+        p = 1 / (1 + np.exp(-(quality[a] - quality[b]) / noise))
+        with lock:
+            return 1.0 if rng.random() < p else 0.0
+    return judge
+
+
+def all_pairs(candidates, judge):
+    index = {c: i for i, c in enumerate(candidates)}
+    wins = np.zeros((len(candidates), len(candidates)))
+    for a, b in combinations(candidates, 2):
+        result = judge(a, b)
+        wins[index[a], index[b]] += result
+        wins[index[b], index[a]] += 1 - result
+    return [candidates[i] for i in np.argsort(-fit_bradley_terry(wins))]
+
+
+def top_k_recall(ranking, truth, k):
+    return len(set(ranking[:k]) & set(truth[:k])) / k
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark the Swiss judge tournament against all pairs.")
+    parser.add_argument("--candidates", type=int, nargs="+", default=[16, 32, 64])
+    parser.add_argument("--k", type=int, default=3)
+    parser.add_argument("--noise", type=float, default=1.0, help="Judge noise (Bradley-Terry scale).")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--output", default=None, help="JSON report path (default: print only).")
+    args = parser.parse_args()
+
+    rng = np.random.default_rng(args.seed)
+    report = []
+    for n in args.candidates:
+        candidates = [f"Candidate post {i}" for i in range(n)]
+        quality = dict(zip(candidates, rng.normal(0, 2, n)))
+        truth = sorted(candidates, key=quality.get, reverse=True)
+
+        tournament = JudgeTournament(judge=simulated_judge(quality, args.noise, args.seed), seed=args.seed)
+        swiss = tournament.rank(candidates, k=args.k)["candidate"].tolist()
+        exhaustive = all_pairs(candidates, simulated_judge(quality, args.noise, args.seed))
+
+        result = {
+            "candidates": n,
+            "swiss_calls": tournament.calls,
+            "all_pairs_calls": n * (n - 1) // 2,
+            "swiss_top_k_recall": top_k_recall(swiss, truth, args.k),
+            "all_pairs_top_k_recall": top_k_recall(exhaustive, truth, args.k),
+        }
+        report.append(result)
+        print(f"✅ n={n}: Swiss {result['swiss_calls']} calls (top-{args.k} recall {result['swiss_top_k_recall']:.2f}), "
+              f"all pairs {result['all_pairs_calls']} calls (recall {result['all_pairs_top_k_recall']:.2f})")
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump(report, f, indent=2)
+        print(f"Saved report to {args.output}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,464 @@
+"""
+A local stand-in for the OpenAI and ElevenLabs endpoints used by the scripts modules.
+
+Implements chat completions, embeddings, image generation, speech, transcriptions and
+the ElevenLabs conversational AI (convai) agent and conversation endpoints, with
+configurable latency, error rate and rate limiting. Responses follow the shapes of the
+public APIs closely enough for the official client libraries to parse them.
+
+Run standalone from the `main` directory:
+
+    python benchmarks/mock_server.py --port 8089 --latency-ms 200 --error-rate 0.01
+
+and point the clients at it:
+
+    GenAI(api_key, base_url="http://127.0.0.1:8089/v1")
+    ElevenLabsAPI(api_key, base_url="http://127.0.0.1:8089")
+"""
+import re
+import json
+import time
+import random
+import hashlib
+import argparse
+import threading
+from urllib.parse import urlparse, parse_qs
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+
+CLIP_PATH_PATTERN = re.compile(r'"clip_path"\s*:\s*"((?:[^"\\]|\\.)*)"')
+ID_SUFFIX_PATTERN = re.compile(r"/[^/]+_\d+$")
+
+
+class MockConfig:
+    """
+    Behavior of the mock server.
+
+    Attributes:
+    ----------
+    latency_ms : float
+        Mean added latency per request in milliseconds.
+    jitter_ms : float
+        Standard deviation of the added latency.
+    ms_per_token : float
+        Extra latency per generated completion token (models decode time).
+    error_rate : float
+        Fraction of requests answered with HTTP 500.
+    rate_limit_rps : float or None
+        Sustained requests per second before HTTP 429 is returned. `None` disables it.
+    burst : int
+        Token-bucket size for the rate limiter.
+    embedding_dim : int
+        Length of the returned embedding vectors.
+    completion_tokens : int
+        Number of tokens in generated chat completions.
+    seed : int
+        Seed for latency jitter and error injection, for reproducible runs.
+    """
+
+    def __init__(self, latency_ms=100.0, jitter_ms=10.0, ms_per_token=0.0, error_rate=0.0,
+                 rate_limit_rps=None, burst=10, embedding_dim=1536, completion_tokens=50,
+                 num_conversations=25, seed=0):
+        self.latency_ms = latency_ms
+        self.jitter_ms = jitter_ms
+        self.ms_per_token = ms_per_token
+        self.error_rate = error_rate
+        self.rate_limit_rps = rate_limit_rps
+        self.burst = burst
+        self.embedding_dim = embedding_dim
+        self.completion_tokens = completion_tokens
+        self.num_conversations = num_conversations
+        self.seed = seed
+
+    def to_dict(self):
+        return dict(vars(self))
+
+
+class MockServer:
+    """
+    Runs the mock API in a background thread.
+
+    Example:
+    -------
+    >>> with MockServer(MockConfig(latency_ms=50)) as server:
+    ...     jarvis = GenAI("sk-test", base_url=server.openai_base_url)
+    ...     jarvis.generate_text("hello")
+    """
+
+    def __init__(self, config=None, host="127.0.0.1", port=0):
+        self.config = config or MockConfig()
+        self._rng = random.Random(self.config.seed)
+        self._rng_lock = threading.Lock()
+        self._bucket_tokens = float(self.config.burst)
+        self._bucket_time = time.monotonic()
+        self._bucket_lock = threading.Lock()
+        self.request_counts = {}
+        self._seen_prefixes = set()
+        self.httpd = ThreadingHTTPServer((host, port), _make_handler(self))
+        self.httpd.daemon_threads = True
+        self._thread = None
+        self._agents = {
+            f"agent_{i}": {"agent_id": f"agent_{i}", "name": f"Mock Agent {i}", "first_message": "Hi!",
+                           "prompt": "You are a helpful agent.", "llm": "gpt-4o-mini", "max_duration_seconds": 300}
+            for i in range(3)
+        }
+
+    @property
+    def url(self):
+        host, port = self.httpd.server_address[:2]
+        return f"http://{host}:{port}"
+
+    @property
+    def openai_base_url(self):
+        return f"{self.url}/v1"
+
+    def start(self):
+        self._thread = threading.Thread(target=self.httpd.serve_forever, daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self):
+        self.httpd.shutdown()
+        self.httpd.server_close()
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, *exc):
+        self.stop()
+
+    # ---- behavior -------------------------------------------------------------
+
+    def _random(self):
+        with self._rng_lock:
+            return self._rng.random(), self._rng.gauss(0, 1)
+
+    def _allow_request(self):
+        if not self.config.rate_limit_rps:
+            return True
+        with self._bucket_lock:
+            now = time.monotonic()
+            self._bucket_tokens = min(self.config.burst,
+                                      self._bucket_tokens + (now - self._bucket_time) * self.config.rate_limit_rps)
+            self._bucket_time = now
+            if self._bucket_tokens >= 1:
+                self._bucket_tokens -= 1
+                return True
+            return False
+
+    def _sleep(self, completion_tokens=0):
+        _, gauss = self._random()
+        delay_ms = max(0.0, self.config.latency_ms + gauss * self.config.jitter_ms)
+        delay_ms += completion_tokens * self.config.ms_per_token
+        time.sleep(delay_ms / 1000)
+
+    def _count(self, route):
+        with self._rng_lock:
+            self.request_counts[route] = self.request_counts.get(route, 0) + 1
+
+    # ---- OpenAI ---------------------------------------------------------------
+
+    @staticmethod
+    def _num_tokens(text):
+        return max(1, len(text) // 4)
+
+    def _chat_completion(self, body):
+        messages = body.get("messages", [])
+        prompt_text = json.dumps(messages)
+        response_format = (body.get("response_format") or {}).get("type", "text")
+        if response_format == "json_object":
+            content = json.dumps(self._json_answer(messages))
+        else:
+            content = " ".join(["lorem"] * self.config.completion_tokens)
+        usage = {
+            "prompt_tokens": self._num_tokens(prompt_text),
+            "completion_tokens": self.config.completion_tokens,
+            "total_tokens": self._num_tokens(prompt_text) + self.config.completion_tokens,
+            "prompt_tokens_details": {"cached_tokens": self._cached_tokens(messages)},
+        }
+        return {
+            "id": f"chatcmpl-mock{int(time.time() * 1000)}",
+            "object": "chat.completion",
+            "created": int(time.time()),
+            "model": body.get("model", "mock"),
+            "choices": [{"index": 0, "message": {"role": "assistant", "content": content},
+                         "logprobs": None, "finish_reason": "stop"}],
+            "usage": usage,
+        }
+
+    def _cached_tokens(self, messages):
+        # Like the OpenAI cache: leading system messages seen before count as cached,
+        # in 128-token increments once the prefix reaches 1024 tokens
+        prefix = []
+        for message in messages:
+            if message.get("role") != "system":
+                break
+            prefix.append(message)
+        prefix_text = json.dumps(prefix)
+        prefix_tokens = self._num_tokens(prefix_text)
+        with self._rng_lock:
+            seen = prefix_text in self._seen_prefixes
+            self._seen_prefixes.add(prefix_text)
+        if not seen or prefix_tokens < 1024:
+            return 0
+        return prefix_tokens - prefix_tokens % 128
+
+    @staticmethod
+    def _json_answer(messages):
+        # Answer summary-script requests with a script over the clip paths found in the prompt
+        clip_paths = []
+        for message in messages:
+            content = message.get("content")
+            if not isinstance(content, str):
+                continue
+            for match in CLIP_PATH_PATTERN.findall(content):
+                clip_paths.append(json.loads(f'"{match}"'))  # unescape JSON string
+        clip_paths = list(dict.fromkeys(clip_paths))
+        if any('"clip_paths"' in str(m.get("content")) for m in messages if m.get("role") == "system"):
+            # Window summary of the hierarchical summary script
+            return {"summary": f"A section with {len(clip_paths)} clips.", "clip_paths": clip_paths[:2]}
+        return {"script": [{"clip_path": path, "narration": f"Narration for {path}."} for path in clip_paths]}
+
+    def _embedding(self, body):
+        inputs = body.get("input", "")
+        inputs = inputs if isinstance(inputs, list) else [inputs]
+        data = []
+        for index, text in enumerate(inputs):
+            seed = int.from_bytes(hashlib.sha256(str(text).encode("utf-8")).digest()[:8], "little")
+            rng = random.Random(seed)
+            data.append({"object": "embedding", "index": index,
+                         "embedding": [rng.uniform(-1, 1) for _ in range(self.config.embedding_dim)]})
+        tokens = sum(self._num_tokens(str(t)) for t in inputs)
+        return {"object": "list", "data": data, "model": body.get("model", "mock"),
+                "usage": {"prompt_tokens": tokens, "total_tokens": tokens}}
+
+    def _image(self, body):
+        return {"created": int(time.time()),
+                "data": [{"url": f"{self.url}/mock-image.png", "revised_prompt": body.get("prompt", "")}
+                         for _ in range(int(body.get("n", 1)))]}
+
+    # ---- ElevenLabs convai ------------------------------------------------------
+
+    def _conversation_summary(self, agent_id, i):
+        start = 1_700_000_000 + i * 3600
+        return {"agent_id": agent_id, "agent_name": self._agents.get(agent_id, {}).get("name"),
+                "conversation_id": f"conv_{agent_id}_{i}", "start_time_unix_secs": start,
+                "call_duration_secs": 60 + i, "message_count": 4, "status": "done",
+                "call_successful": "success"}
+
+    def _conversations(self, query):
+        agent_id = query.get("agent_id", ["agent_0"])[0]
+        cursor = int(query.get("cursor", ["0"])[0] or 0)
+        page_size = int(query.get("page_size", ["10"])[0])
+        total = self.config.num_conversations
+        end = min(cursor + page_size, total)
+        return {"conversations": [self._conversation_summary(agent_id, i) for i in range(cursor, end)],
+                "has_more": end < total, "next_cursor": str(end) if end < total else None}
+
+    def _conversation(self, conversation_id):
+        match = re.match(r"conv_(.+)_(\d+)$", conversation_id)
+        agent_id, i = (match.group(1), int(match.group(2))) if match else ("agent_0", 0)
+        summary = self._conversation_summary(agent_id, i)
+        return {
+            "agent_id": agent_id,
+            "conversation_id": conversation_id,
+            "status": "done",
+            "transcript": [
+                {"role": "agent", "message": "Hi! How can I help?", "time_in_call_secs": 0},
+                {"role": "user", "message": "Tell me about the course.", "time_in_call_secs": 3},
+            ],
+            "metadata": {"start_time_unix_secs": summary["start_time_unix_secs"],
+                         "call_duration_secs": summary["call_duration_secs"]},
+            "analysis": {"call_successful": "success", "transcript_summary": "The user asked about the course.",
+                         "evaluation_criteria_results": {}, "data_collection_results": {}},
+        }
+
+    def _agent(self, agent_id):
+        agent = self._agents.get(agent_id)
+        if agent is None:
+            return None
+        return {
+            "agent_id": agent["agent_id"],
+            "name": agent["name"],
+            "conversation_config": {
+                "agent": {"first_message": agent["first_message"], "language": "en",
+                          "prompt": {"prompt": agent["prompt"], "llm": agent["llm"]}},
+                "conversation": {"max_duration_seconds": agent["max_duration_seconds"]},
+            },
+            "metadata": {"created_at_unix_secs": 1_700_000_000},
+            "platform_settings": {},
+        }
+
+
+def _make_handler(server):
+
+    class Handler(BaseHTTPRequestHandler):
+        protocol_version = "HTTP/1.1"
+
+        def log_message(self, format, *args):
+            pass  # keep benchmark output clean
+
+        def _send_json(self, status, payload, headers=None):
+            body = json.dumps(payload).encode("utf-8")
+            self.send_response(status)
+            self.send_header("Content-Type", "application/json")
+            self.send_header("Content-Length", str(len(body)))
+            for key, value in (headers or {}).items():
+                self.send_header(key, value)
+            self.end_headers()
+            self.wfile.write(body)
+
+        def _send_bytes(self, content, content_type):
+            self.send_response(200)
+            self.send_header("Content-Type", content_type)
+            self.send_header("Content-Length", str(len(content)))
+            self.end_headers()
+            self.wfile.write(content)
+
+        def _send_stream(self, payload, body, chunk_chars=16):
+            # Server-sent events like the OpenAI streaming API: time to first token is the
+            # base latency, then each chunk takes `ms_per_token` per (4-character) token
+            self.send_response(200)
+            self.send_header("Content-Type", "text/event-stream")
+            self.send_header("Connection", "close")
+            self.end_headers()
+            self.close_connection = True
+            server._sleep()
+            content = payload["choices"][0]["message"]["content"]
+            base = {key: payload[key] for key in ("id", "created", "model")}
+            base["object"] = "chat.completion.chunk"
+            for start in range(0, len(content), chunk_chars):
+                piece = content[start:start + chunk_chars]
+                time.sleep(server._num_tokens(piece) * server.config.ms_per_token / 1000)
+                chunk = dict(base, choices=[{"index": 0, "delta": {"content": piece}, "finish_reason": None}])
+                self.wfile.write(f"data: {json.dumps(chunk)}\n\n".encode("utf-8"))
+                self.wfile.flush()
+            chunk = dict(base, choices=[{"index": 0, "delta": {}, "finish_reason": "stop"}])
+            self.wfile.write(f"data: {json.dumps(chunk)}\n\n".encode("utf-8"))
+            if (body.get("stream_options") or {}).get("include_usage"):
+                chunk = dict(base, choices=[], usage=payload["usage"])
+                self.wfile.write(f"data: {json.dumps(chunk)}\n\n".encode("utf-8"))
+            self.wfile.write(b"data: [DONE]\n\n")
+            self.wfile.flush()
+
+        def _read_body(self):
+            length = int(self.headers.get("Content-Length", 0) or 0)
+            return self.rfile.read(length) if length else b""
+
+        def _json_body(self, raw):
+            try:
+                return json.loads(raw or b"{}")
+            except json.JSONDecodeError:
+                return {}
+
+        def _inject_failures(self, route):
+            server._count(route)
+            if not server._allow_request():
+                self._send_json(429, {"error": {"message": "Rate limit reached (mock)", "type": "rate_limit_error",
+                                                "code": "rate_limit_exceeded"}},
+                                headers={"Retry-After": "0.1", "x-should-retry": "true"})
+                return True
+            roll, _ = server._random()
+            if roll < server.config.error_rate:
+                server._sleep()
+                self._send_json(500, {"error": {"message": "Internal error (mock)", "type": "server_error"}})
+                return True
+            return False
+
+        def do_GET(self):
+            parsed = urlparse(self.path)
+            path, query = parsed.path.rstrip("/"), parse_qs(parsed.query)
+            if path == "/mock-image.png":
+                return self._send_bytes(b"\x89PNG\r\n\x1a\n" + b"\x00" * 1024, "image/png")
+            if self._inject_failures("GET " + ID_SUFFIX_PATTERN.sub("/{id}", path)):
+                return
+            server._sleep()
+            if path == "/v1/convai/agents":
+                agents = [{"agent_id": a["agent_id"], "name": a["name"], "created_at_unix_secs": 1_700_000_000,
+                           "access_info": {"is_creator": True, "creator_name": "mock", "creator_email": "mock@example.com",
+                                           "role": "admin"}}
+                          for a in server._agents.values()]
+                return self._send_json(200, {"agents": agents, "has_more": False, "next_cursor": None})
+            match = re.match(r"^/v1/convai/agents/([^/]+)$", path)
+            if match:
+                agent = server._agent(match.group(1))
+                return self._send_json(200, agent) if agent else self._send_json(404, {"detail": "Agent not found"})
+            if path == "/v1/convai/conversations":
+                return self._send_json(200, server._conversations(query))
+            match = re.match(r"^/v1/convai/conversations/([^/]+)$", path)
+            if match:
+                return self._send_json(200, server._conversation(match.group(1)))
+            self._send_json(404, {"error": {"message": f"Unknown route GET {path}"}})
+
+        def do_PATCH(self):
+            path = urlparse(self.path).path.rstrip("/")
+            body = self._json_body(self._read_body())
+            if self._inject_failures("PATCH /v1/convai/agents/{id}"):
+                return
+            server._sleep()
+            match = re.match(r"^/v1/convai/agents/([^/]+)$", path)
+            if match and match.group(1) in server._agents:
+                agent = server._agents[match.group(1)]
+                config = body.get("conversation_config", {})
+                agent["name"] = body.get("name", agent["name"])
+                agent["first_message"] = config.get("agent", {}).get("first_message", agent["first_message"])
+                prompt = config.get("agent", {}).get("prompt", {})
+                agent["prompt"] = prompt.get("prompt", agent["prompt"])
+                agent["llm"] = prompt.get("llm", agent["llm"])
+                agent["max_duration_seconds"] = config.get("conversation", {}).get(
+                    "max_duration_seconds", agent["max_duration_seconds"])
+                return self._send_json(200, server._agent(match.group(1)))
+            self._send_json(404, {"detail": "Agent not found"})
+
+        def do_POST(self):
+            path = urlparse(self.path).path.rstrip("/")
+            raw = self._read_body()
+            if self._inject_failures(f"POST {path}"):
+                return
+            if path == "/v1/chat/completions":
+                body = self._json_body(raw)
+                payload = server._chat_completion(body)
+                if body.get("stream"):
+                    return self._send_stream(payload, body)
+                server._sleep(payload["usage"]["completion_tokens"])
+                return self._send_json(200, payload)
+            server._sleep()
+            if path == "/v1/embeddings":
+                return self._send_json(200, server._embedding(self._json_body(raw)))
+            if path == "/v1/images/generations":
+                return self._send_json(200, server._image(self._json_body(raw)))
+            if path == "/v1/audio/speech":
+                text = self._json_body(raw).get("input", "")
+                # Roughly the size of a 64 kbit/s MP3 at 15 characters per second of speech
+                return self._send_bytes(b"\xff\xfb\x90\x00" * max(1, len(text) * 133), "audio/mpeg")
+            if path == "/v1/audio/transcriptions":
+                return self._send_json(200, {"text": f"Mock transcription of {len(raw)} bytes of audio."})
+            self._send_json(404, {"error": {"message": f"Unknown route POST {path}"}})
+
+    return Handler
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Run the mock OpenAI/ElevenLabs server.")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8089)
+    parser.add_argument("--latency-ms", type=float, default=100.0)
+    parser.add_argument("--jitter-ms", type=float, default=10.0)
+    parser.add_argument("--ms-per-token", type=float, default=0.0)
+    parser.add_argument("--error-rate", type=float, default=0.0)
+    parser.add_argument("--rate-limit-rps", type=float, default=None)
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    config = MockConfig(latency_ms=args.latency_ms, jitter_ms=args.jitter_ms, ms_per_token=args.ms_per_token,
+                        error_rate=args.error_rate, rate_limit_rps=args.rate_limit_rps, seed=args.seed)
+    server = MockServer(config, host=args.host, port=args.port)
+    print(f"Mock server listening on {server.url} (OpenAI base URL {server.openai_base_url})")
+    try:
+        server.httpd.serve_forever()
+    except KeyboardInterrupt:
+        server.stop()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,115 @@
+"""
+Insert and read throughput of `MongoStore` on synthetic tweets and embeddings.
+
+Compares per-row `update_one` upserts with `bulk_write` upserts of several batch sizes,
+then streams the tweets back with several chunk sizes. Runs against a local mongod, or
+in memory with mongomock (`pip install mongomock`) when no server is available. The
+benchmark database is dropped at the end.
+
+Run from the `main` directory:
+
+    python benchmarks/mongo_throughput.py --uri mongodb://localhost:27017 --rows 100000
+    python benchmarks/mongo_throughput.py --mongomock --rows 20000
+"""
+import os
+import sys
+import json
+import time
+import argparse
+
+import numpy as np
+import pandas as pd
+
+MAIN_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, MAIN_DIR)
+
+from scripts.storage import MongoStore  # noqa: E402
+
+DB_NAME = "genai_benchmark"
+
+
+def synthetic_tweets(rows, accounts=20, seed=0):
+    rng = np.random.default_rng(seed)
+    return pd.DataFrame({
+        "tweet_id": np.arange(1_800_000_000_000_000_000, 1_800_000_000_000_000_000 + rows, dtype="int64"),
+        "screen_name": [f"account_{i}" for i in rng.integers(0, accounts, rows)],
+        "text": [f"Tweet number {i} about #topic{i % 50}" for i in range(rows)],
+        "created_at": pd.Timestamp("2024-01-01") + pd.to_timedelta(rng.integers(0, 365 * 86400, rows), unit="s"),
+        "favorite_count": pd.array(rng.integers(0, 10_000, rows), dtype="Int64"),
+        "retweet_count": pd.array(rng.integers(0, 1_000, rows), dtype="Int64"),
+    })
+
+
+def timed(fn):
+    tstart = time.perf_counter()
+    result = fn()
+    return result, time.perf_counter() - tstart
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark MongoStore bulk upserts and chunked reads.")
+    parser.add_argument("--uri", default="mongodb://localhost:27017")
+    parser.add_argument("--mongomock", action="store_true", help="Use an in-memory mongomock client.")
+    parser.add_argument("--rows", type=int, default=20_000)
+    parser.add_argument("--per-row-rows", type=int, default=2_000, help="Rows upserted one at a time (baseline).")
+    parser.add_argument("--batch-sizes", type=int, nargs="+", default=[100, 1000, 5000])
+    parser.add_argument("--chunk-sizes", type=int, nargs="+", default=[1000, 10_000])
+    parser.add_argument("--embeddings", type=int, default=5_000)
+    parser.add_argument("--embedding-dim", type=int, default=1536)
+    parser.add_argument("--output", default=None, help="JSON report path (default: print only).")
+    args = parser.parse_args()
+
+    if args.mongomock:
+        import mongomock
+        client = mongomock.MongoClient()
+    else:
+        from pymongo import MongoClient
+        client = MongoClient(args.uri)
+
+    df = synthetic_tweets(args.rows)
+    report = {"rows": args.rows, "backend": "mongomock" if args.mongomock else args.uri, "insert": {}, "read": {}}
+    try:
+        client.drop_database(DB_NAME)
+        store = MongoStore(client=client, db_name=DB_NAME)
+
+        documents = store.to_documents(df.head(args.per_row_rows))
+        _, seconds = timed(lambda: [store.db["tweets"].update_one({"tweet_id": d["tweet_id"]}, {"$set": d}, upsert=True)
+                                    for d in documents])
+        report["insert"]["per_row"] = {"rows": len(documents), "rows_per_s": len(documents) / seconds}
+
+        for batch_size in args.batch_sizes:
+            store.db["tweets"].delete_many({})
+            store.batch_size = batch_size
+            _, seconds = timed(lambda: store.upsert_tweets(df))
+            report["insert"][f"bulk_{batch_size}"] = {"rows": args.rows, "rows_per_s": args.rows / seconds}
+        _, seconds = timed(lambda: store.upsert_tweets(df))
+        report["insert"]["bulk_reupsert"] = {"rows": args.rows, "rows_per_s": args.rows / seconds}
+
+        for chunk_size in args.chunk_sizes:
+            rows, seconds = timed(lambda: sum(len(chunk) for chunk in store.iter_tweets(chunk_size=chunk_size)))
+            report["read"][f"tweets_chunk_{chunk_size}"] = {"rows": rows, "rows_per_s": rows / seconds}
+
+        rng = np.random.default_rng(0)
+        df_embeddings = pd.DataFrame({
+            "tweet_id": df["tweet_id"].head(args.embeddings),
+            "embedding": list(rng.standard_normal((min(args.embeddings, args.rows), args.embedding_dim),
+                                                  dtype=np.float32)),
+        })
+        _, seconds = timed(lambda: store.upsert_embeddings(df_embeddings))
+        report["insert"]["embeddings"] = {"rows": len(df_embeddings), "rows_per_s": len(df_embeddings) / seconds}
+        rows, seconds = timed(lambda: sum(len(keys) for keys, _ in store.iter_embeddings()))
+        report["read"]["embeddings"] = {"rows": rows, "rows_per_s": rows / seconds}
+    finally:
+        client.drop_database(DB_NAME)
+
+    for kind in ("insert", "read"):
+        for name, result in report[kind].items():
+            print(f"✅ {kind} {name}: {result['rows_per_s']:,.0f} rows/s ({result['rows']:,} rows)")
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump(report, f, indent=2)
+        print(f"Saved report to {args.output}")
+
+
+if __name__ == "__main__":
+    main()
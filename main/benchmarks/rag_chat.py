@@ -0,0 +1,99 @@
+"""
+Per-turn prompt size and latency of a grounded chat agent: whole documents pasted into
+the instructions (the Lecture 13 pattern) versus retrieval of the top-k chunks from a
+precomputed `SearchIndex` (`generate_chat_response(context_index=...)`).
+
+Runs against the local mock API (`benchmarks/mock_server.py`), which counts prompt
+tokens like the real API; the mock's embeddings are random, so only sizes and timings
+are meaningful, not the relevance of the chunks.
+
+Run from the `main` directory:
+
+    python benchmarks/rag_chat.py --documents data/DieHard_script.pdf data/Terminator_script.pdf --turns 10
+"""
+import os
+import sys
+import json
+import time
+import shutil
+import argparse
+import tempfile
+
+import numpy as np
+
+MAIN_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, MAIN_DIR)
+
+from benchmarks.mock_server import MockServer, MockConfig  # noqa: E402
+from scripts.genai import GenAI  # noqa: E402
+from scripts.search import SearchIndex  # noqa: E402
+from scripts.instrumentation import MetricsRegistry  # noqa: E402
+
+INSTRUCTIONS = "You are a movie expert. Answer questions about the scripts you are given."
+QUESTIONS = [
+    "Who is the villain?", "Where does the story take place?", "How does the hero get the detonators?",
+    "What happens on the roof?", "Who helps the hero from outside?", "How does the movie end?",
+]
+
+
+def chat_turns(jarvis, metrics, instructions, turns, **retrieval):
+    history = []
+    for turn in range(turns):
+        jarvis.generate_chat_response(history, QUESTIONS[turn % len(QUESTIONS)], instructions, **retrieval)
+    records = [r for r in metrics.records if r.name == "chat.completions"]
+    retrievals = [r.duration_s for r in metrics.records if r.name.startswith("retrieval.")]
+    report = {
+        "prompt_tokens_per_turn": float(np.mean([r.prompt_tokens for r in records])),
+        "latency_s_per_turn": float(np.mean([r.duration_s for r in records])),
+    }
+    if retrievals:
+        report["retrieval_ms_p50"] = float(np.percentile(retrievals, 50) * 1000)
+        report["retrieval_ms_p95"] = float(np.percentile(retrievals, 95) * 1000)
+    return report
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark document stuffing vs retrieval for chat agents.")
+    parser.add_argument("--documents", nargs="+", default=[os.path.join("data", "DieHard_script.pdf")])
+    parser.add_argument("--turns", type=int, default=10)
+    parser.add_argument("--k", type=int, default=5)
+    parser.add_argument("--latency-ms", type=float, default=100.0)
+    parser.add_argument("--output", default=None, help="JSON report path (default: print only).")
+    args = parser.parse_args()
+
+    os.chdir(MAIN_DIR)
+    index_dir = tempfile.mkdtemp(prefix="rag_bench_")
+    report = {"documents": args.documents, "turns": args.turns, "k": args.k}
+    try:
+        with MockServer(MockConfig(latency_ms=args.latency_ms)) as server:
+            documents = "\n\n".join(SearchIndex.read_document(path) for path in args.documents)
+            metrics = MetricsRegistry()
+            jarvis = GenAI("sk-test", metrics=metrics, base_url=server.openai_base_url)
+            report["stuffed"] = chat_turns(jarvis, metrics, f"{INSTRUCTIONS}\n\n{documents}", args.turns)
+
+            tstart = time.perf_counter()
+            index = SearchIndex(index_dir, genai=jarvis)
+            for path in args.documents:
+                index.add_files(path, passage_words=200, overlap=40)
+            report["index_build_s"] = time.perf_counter() - tstart
+
+            for mode in ("bm25", "hybrid"):
+                metrics.new_run()
+                report[mode] = chat_turns(jarvis, metrics, INSTRUCTIONS, args.turns, context_index=index,
+                                          k=args.k, retrieval_mode=mode)
+    finally:
+        shutil.rmtree(index_dir, ignore_errors=True)
+
+    for name in ("stuffed", "bm25", "hybrid"):
+        result = report[name]
+        retrieval = f", retrieval p50 {result['retrieval_ms_p50']:.1f} ms" if "retrieval_ms_p50" in result else ""
+        print(f"✅ {name}: {result['prompt_tokens_per_turn']:,.0f} prompt tokens/turn, "
+              f"{result['latency_s_per_turn']:.2f} s/turn{retrieval}")
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump(report, f, indent=2)
+        print(f"Saved report to {args.output}")
+
+
+if __name__ == "__main__":
+    main()
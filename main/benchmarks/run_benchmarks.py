@@ -0,0 +1,227 @@
+"""
+Offline throughput and latency benchmarks for GenAI, MovieAI and ElevenLabsAPI.
+
+Starts the local mock server (`benchmarks/mock_server.py`), runs each workload with a
+fixed number of calls and concurrency, and writes a JSON report that can be compared
+across commits. No API keys or network access are needed.
+
+Run from the `main` directory:
+
+    python benchmarks/run_benchmarks.py
+    python benchmarks/run_benchmarks.py --workloads genai.generate_text genai.get_embedding \
+        --calls 500 --concurrency 32 --latency-ms 150 --error-rate 0.02 \
+        --output benchmarks/results/baseline.json
+"""
+import os
+import sys
+import json
+import time
+import shutil
+import platform
+import argparse
+import tempfile
+import subprocess
+from concurrent.futures import ThreadPoolExecutor
+
+MAIN_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, MAIN_DIR)
+
+from benchmarks.mock_server import MockServer, MockConfig  # noqa: E402
+from scripts.instrumentation import MetricsRegistry  # noqa: E402
+
+API_KEY = "sk-mock"
+SAMPLE_IMAGE = os.path.join(MAIN_DIR, "data", "photos", "ronaldo_euro.jpg")
+SAMPLE_TWEET = "Can't believe how good the new album is 🔥 https://t.co/abc #music"
+
+
+def _percentile(values, q):
+    if not values:
+        return None
+    values = sorted(values)
+    k = (len(values) - 1) * q
+    lower, upper = int(k), min(int(k) + 1, len(values) - 1)
+    return values[lower] + (values[upper] - values[lower]) * (k - lower)
+
+
+def run_workload(name, call, calls, concurrency, metrics):
+    """
+    Runs `call(i)` for i in range(calls) with `concurrency` worker threads.
+
+    Returns:
+    -------
+    dict
+        Throughput, latency percentiles (ms), error count and the transport metrics
+        (retries, bytes, tokens) recorded by the clients.
+    """
+    metrics.new_run(name)
+    latencies = []
+    errors = []
+
+    def timed(i):
+        tstart = time.perf_counter()
+        try:
+            call(i)
+            latencies.append(time.perf_counter() - tstart)
+        except Exception as e:
+            errors.append(f"{type(e).__name__}: {e}")
+
+    tstart = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=concurrency) as executor:
+        list(executor.map(timed, range(calls)))
+    elapsed = time.perf_counter() - tstart
+
+    records = list(metrics.records)
+    latencies_ms = [1000 * x for x in latencies]
+    return {
+        "calls": calls,
+        "concurrency": concurrency,
+        "seconds": elapsed,
+        "throughput_per_s": len(latencies) / elapsed if elapsed else None,
+        "latency_ms": {
+            "mean": sum(latencies_ms) / len(latencies_ms) if latencies_ms else None,
+            "p50": _percentile(latencies_ms, 0.50),
+            "p95": _percentile(latencies_ms, 0.95),
+            "p99": _percentile(latencies_ms, 0.99),
+            "max": max(latencies_ms) if latencies_ms else None,
+        },
+        "errors": len(errors),
+        "error_samples": errors[:5],
+        "api_calls": len(records),
+        "retries": sum(r.retries for r in records),
+        "request_bytes": sum(r.request_bytes for r in records),
+        "response_bytes": sum(r.response_bytes for r in records),
+        "prompt_tokens": sum(r.prompt_tokens for r in records),
+        "completion_tokens": sum(r.completion_tokens for r in records),
+    }
+
+
+def build_workloads(server, metrics, work_dir):
+    """
+    Returns a dict of workload name -> callable(i), or a string explaining why a workload
+    is unavailable in this environment.
+    """
+    from scripts.genai import GenAI
+
+    workloads = {}
+    jarvis = GenAI(API_KEY, metrics=metrics, base_url=server.openai_base_url)
+
+    workloads["genai.generate_text"] = lambda i: jarvis.generate_text(
+        f"Classify the sentiment of tweet {i}: {SAMPLE_TWEET}",
+        instructions="You are a sentiment classifier. Answer with a number from -1 to 1.",
+    )
+    workloads["genai.get_embedding"] = lambda i: jarvis.get_embedding(f"{SAMPLE_TWEET} ({i})")
+    workloads["genai.generate_audio"] = lambda i: jarvis.generate_audio(
+        f"Narration number {i} for the summary video.", os.path.join(work_dir, f"narration_{i}.mp3")
+    )
+    if os.path.exists(SAMPLE_IMAGE):
+        workloads["genai.generate_image_description"] = lambda i: jarvis.generate_image_description(
+            SAMPLE_IMAGE, "Describe this image in one sentence."
+        )
+    else:
+        workloads["genai.generate_image_description"] = f"sample image not found: {SAMPLE_IMAGE}"
+
+    ffmpeg_path = shutil.which("ffmpeg")
+    if ffmpeg_path:
+        import pandas as pd
+        from scripts.movieai import MovieAI
+
+        movie = MovieAI(API_KEY, ffmpeg_path=ffmpeg_path, metrics=metrics, base_url=server.openai_base_url)
+        df_clips = pd.DataFrame({
+            "clip_path": [os.path.join(work_dir, f"clip_{k:03d}.mp4") for k in range(20)],
+            "description": [f"Scene {k}: the hero walks into the room and looks around." for k in range(20)],
+        })
+
+        def summary_and_narrations(i):
+            df_script = movie.generate_summary_script(df_clips, "Pick the 5 best clips for a trailer. ")
+            if df_script is False:
+                raise RuntimeError("summary script failed")
+            movie.generate_audio_narrations(df_script.head(5), output_dir=os.path.join(work_dir, f"run_{i}"))
+
+        workloads["movieai.summary_script_and_narrations"] = summary_and_narrations
+    else:
+        workloads["movieai.summary_script_and_narrations"] = "ffmpeg not found (MovieAI requires it)"
+
+    try:
+        from scripts.elevenlabs_client import ElevenLabsAPI
+        from datetime import datetime
+
+        eleven = ElevenLabsAPI(API_KEY, metrics=metrics, base_url=server.url)
+        workloads["elevenlabs.get_conversation_summaries"] = lambda i: eleven.get_conversation_summaries_string(
+            "agent_0", datetime(2023, 1, 1), 0
+        )
+    except ImportError as e:
+        workloads["elevenlabs.get_conversation_summaries"] = f"elevenlabs not installed ({e})"
+
+    return workloads
+
+
+def environment():
+    try:
+        commit = subprocess.run(["git", "rev-parse", "HEAD"], cwd=MAIN_DIR, stdout=subprocess.PIPE,
+                                stderr=subprocess.DEVNULL, text=True).stdout.strip() or None
+    except OSError:
+        commit = None
+    return {
+        "python": sys.version.split()[0],
+        "platform": platform.platform(),
+        "cpu_count": os.cpu_count(),
+        "git_commit": commit,
+        "timestamp": time.strftime("%Y-%m-%dT%H:%M:%S"),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Run offline benchmarks against the mock API server.")
+    parser.add_argument("--workloads", nargs="*", default=None, help="Workload names (default: all).")
+    parser.add_argument("--calls", type=int, default=200)
+    parser.add_argument("--concurrency", type=int, default=16)
+    parser.add_argument("--latency-ms", type=float, default=100.0)
+    parser.add_argument("--jitter-ms", type=float, default=10.0)
+    parser.add_argument("--ms-per-token", type=float, default=0.0)
+    parser.add_argument("--error-rate", type=float, default=0.0)
+    parser.add_argument("--rate-limit-rps", type=float, default=None)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--output", default=None, help="JSON report path (default: print only).")
+    args = parser.parse_args()
+
+    config = MockConfig(latency_ms=args.latency_ms, jitter_ms=args.jitter_ms, ms_per_token=args.ms_per_token,
+                        error_rate=args.error_rate, rate_limit_rps=args.rate_limit_rps, seed=args.seed)
+    metrics = MetricsRegistry()
+    work_dir = tempfile.mkdtemp(prefix="genai_bench_")
+    report = {"config": config.to_dict(), "calls": args.calls, "concurrency": args.concurrency,
+              "environment": environment(), "workloads": {}}
+
+    try:
+        with MockServer(config) as server:
+            workloads = build_workloads(server, metrics, work_dir)
+            names = args.workloads or list(workloads)
+            for name in names:
+                workload = workloads.get(name, f"unknown workload (available: {', '.join(workloads)})")
+                if isinstance(workload, str):
+                    print(f"⚠️ Skipping {name}: {workload}")
+                    report["workloads"][name] = {"skipped": workload}
+                    continue
+                result = run_workload(name, workload, args.calls, args.concurrency, metrics)
+                report["workloads"][name] = result
+                latency = result["latency_ms"]
+                if latency["p50"] is None:
+                    print(f"❌ {name}: all {result['errors']} calls failed, e.g. {result['error_samples'][:1]}")
+                    continue
+                print(f"✅ {name}: {result['throughput_per_s']:.1f} calls/s, "
+                      f"p50 {latency['p50']:.0f} ms, p95 {latency['p95']:.0f} ms, "
+                      f"{result['errors']} errors, {result['retries']} retries")
+            report["server_request_counts"] = server.request_counts
+    finally:
+        shutil.rmtree(work_dir, ignore_errors=True)
+
+    if args.output:
+        os.makedirs(os.path.dirname(os.path.abspath(args.output)), exist_ok=True)
+        with open(args.output, "w") as f:
+            json.dump(report, f, indent=2)
+        print(f"Saved report to {args.output}")
+    else:
+        print(json.dumps(report, indent=2))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,105 @@
+"""
+Query latency of `SearchIndex` (BM25) compared with a pandas `.str.contains` scan over
+the lecture transcripts, the debate transcript and the TwExportly tweets.
+
+The index is built in a temporary directory (or `--index-dir`); a second build shows the
+cost of an incremental update when nothing changed. No API call is made.
+
+Run from the `main` directory:
+
+    python benchmarks/search_latency.py --queries "border security" "inflation" "\\"artificial intelligence\\""
+"""
+import os
+import sys
+import json
+import time
+import shutil
+import argparse
+import tempfile
+
+import numpy as np
+import pandas as pd
+
+MAIN_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, MAIN_DIR)
+
+from scripts.search import SearchIndex, PHRASE_PATTERN  # noqa: E402
+from scripts.twexportly import TwExportlyLoader  # noqa: E402
+
+DEFAULT_QUERIES = ["border security", "inflation economy", '"social media"', "climate change", "taxes"]
+
+
+def build(index_dir, tweets):
+    index = SearchIndex(index_dir)
+    added = index.add_files(os.path.join("data", "lecture_transcripts", "*.txt"))
+    added += index.add_csv(os.path.join("data", "debate_biden_trump.csv"), metadata_columns=["speaker"])
+    added += index.add_dataframe(tweets, "tweets", id_column="tweet_id", metadata_columns=["screen_name", "created_at"])
+    return index, added
+
+
+def scan(corpus, query):
+    # Baseline: rows containing every query word (or phrase), case-insensitive
+    phrases = PHRASE_PATTERN.findall(query)
+    words = PHRASE_PATTERN.sub(" ", query).split()
+    mask = pd.Series(True, index=corpus.index)
+    for needle in phrases + words:
+        mask &= corpus.str.contains(needle, case=False, regex=False)
+    return corpus[mask]
+
+
+def percentiles(seconds):
+    ms = np.array(seconds) * 1000
+    return {"p50_ms": float(np.percentile(ms, 50)), "p95_ms": float(np.percentile(ms, 95))}
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark SearchIndex queries against a pandas scan.")
+    parser.add_argument("--queries", nargs="+", default=DEFAULT_QUERIES)
+    parser.add_argument("--repeats", type=int, default=20)
+    parser.add_argument("--index-dir", default=None, help="Keep the index here (default: temporary directory).")
+    parser.add_argument("--output", default=None, help="JSON report path (default: print only).")
+    args = parser.parse_args()
+
+    os.chdir(MAIN_DIR)
+    tweets = TwExportlyLoader().read_directory("data/TwExportly")
+    index_dir = args.index_dir or tempfile.mkdtemp(prefix="search_bench_")
+    try:
+        tstart = time.perf_counter()
+        index, added = build(index_dir, tweets)
+        build_s = time.perf_counter() - tstart
+        tstart = time.perf_counter()
+        _, readded = build(index_dir, tweets)
+        update_s = time.perf_counter() - tstart
+
+        corpus = index.docs["text"]
+        bm25, baseline = [], []
+        for query in args.queries:
+            for _ in range(args.repeats):
+                tstart = time.perf_counter()
+                index.search(query, k=10)
+                bm25.append(time.perf_counter() - tstart)
+                tstart = time.perf_counter()
+                scan(corpus, query)
+                baseline.append(time.perf_counter() - tstart)
+    finally:
+        if args.index_dir is None:
+            shutil.rmtree(index_dir, ignore_errors=True)
+
+    report = {
+        "documents": int(len(index.docs)),
+        "build": {"documents": added, "seconds": build_s},
+        "unchanged_update": {"documents": readded, "seconds": update_s},
+        "bm25": percentiles(bm25),
+        "pandas_scan": percentiles(baseline),
+    }
+    print(f"✅ Indexed {added:,} documents in {build_s:.1f} s (no-op update: {update_s:.2f} s)")
+    print(f"✅ BM25 p50 {report['bm25']['p50_ms']:.2f} ms, p95 {report['bm25']['p95_ms']:.2f} ms; "
+          f"pandas scan p50 {report['pandas_scan']['p50_ms']:.2f} ms")
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump(report, f, indent=2)
+        print(f"Saved report to {args.output}")
+
+
+if __name__ == "__main__":
+    main()
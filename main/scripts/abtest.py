@@ -0,0 +1,318 @@
+import os
+from itertools import combinations
+from concurrent.futures import ProcessPoolExecutor
+import numpy as np
+import pandas as pd
+
+
+
+ENGAGEMENT_COLUMNS = ["favorite_count", "retweet_count", "view_count"]
+
+# Upper bound on the number of entries of a (resamples x support) block of counts, so
+# memory stays around 40 MB whatever the number of resamples.
+MAX_BLOCK_ENTRIES = 5_000_000
+
+
+def compress(x, max_unique=20_000):
+    """
+    Summarizes a sample as sorted distinct values and their counts.
+
+    Engagement counts repeat a lot, so 10M rows usually have a few thousand distinct
+    values, and resampling the counts is exact and much cheaper than resampling rows.
+    Samples with more than `max_unique` distinct values are binned into `max_unique`
+    quantile bins represented by their mean, which keeps the sum (and the mean) exact.
+
+    Returns:
+    -------
+    tuple
+        (values, counts) as float64 and int64 arrays.
+    """
+    x = np.asarray(x, dtype=np.float64)
+    x = x[~np.isnan(x)]
+    values, counts = np.unique(x, return_counts=True)
+    if len(values) <= max_unique:
+        return values, counts
+    edges = np.quantile(x, np.linspace(0, 1, max_unique + 1))[1:-1]
+    bins = np.searchsorted(edges, x, side="right")
+    counts = np.bincount(bins, minlength=max_unique)
+    sums = np.bincount(bins, weights=x, minlength=max_unique)
+    keep = counts > 0
+    return sums[keep] / counts[keep], counts[keep]
+
+
+def _statistic(counts, values, n, statistic):
+    """Mean or (lower) median of each row of a resampled counts matrix."""
+    if statistic == "mean":
+        return counts @ values / n
+    position = np.argmax(np.cumsum(counts, axis=1) >= (n + 1) // 2, axis=1)
+    return values[position]
+
+
+def _block_sizes(n_resamples, support):
+    block = max(1, MAX_BLOCK_ENTRIES // max(1, support))
+    return [min(block, n_resamples - start) for start in range(0, n_resamples, block)]
+
+
+def bootstrap_diff(values_a, counts_a, values_b, counts_b, rng, n_resamples=2_000, statistic="mean"):
+    """
+    Bootstrap distribution of statistic(b) - statistic(a). Each resample of a group is
+    one multinomial draw of its counts (sampling its rows with replacement).
+    """
+    n_a, n_b = counts_a.sum(), counts_b.sum()
+    p_a, p_b = counts_a / n_a, counts_b / n_b
+    diffs = []
+    for size in _block_sizes(n_resamples, max(len(values_a), len(values_b))):
+        stat_a = _statistic(rng.multinomial(n_a, p_a, size=size), values_a, n_a, statistic)
+        stat_b = _statistic(rng.multinomial(n_b, p_b, size=size), values_b, n_b, statistic)
+        diffs.append(stat_b - stat_a)
+    return np.concatenate(diffs)
+
+
+def permutation_diffs(values_a, counts_a, values_b, counts_b, rng, n_resamples=2_000, statistic="mean"):
+    """
+    Permutation distribution of statistic(b) - statistic(a) under the null hypothesis of
+    no difference. Each permutation assigns n_a of the pooled rows to group a without
+    replacement, i.e. one multivariate hypergeometric draw of the pooled counts.
+    """
+    values, inverse = np.unique(np.concatenate([values_a, values_b]), return_inverse=True)
+    pooled = np.bincount(inverse, weights=np.concatenate([counts_a, counts_b]), minlength=len(values)).astype(np.int64)
+    n_a, n_b = int(counts_a.sum()), int(counts_b.sum())
+    diffs = []
+    for size in _block_sizes(n_resamples, len(values)):
+        sample_a = rng.multivariate_hypergeometric(pooled, n_a, size=size, method="marginals")
+        sample_b = pooled - sample_a
+        diffs.append(_statistic(sample_b, values, n_b, statistic) - _statistic(sample_a, values, n_a, statistic))
+    return np.concatenate(diffs)
+
+
+def adjust_pvalues(pvalues):
+    """
+    Benjamini-Hochberg adjusted p-values (false discovery rate). NaN p-values (e.g. a
+    group without data for a metric) stay NaN and do not count as tests.
+    """
+    pvalues = np.asarray(pvalues, dtype=np.float64)
+    result = np.full(len(pvalues), np.nan)
+    finite = np.flatnonzero(np.isfinite(pvalues))
+    n = len(finite)
+    if n == 0:
+        return result
+    order = finite[np.argsort(pvalues[finite])]
+    ranked = pvalues[order] * n / np.arange(1, n + 1)
+    result[order] = np.minimum(1.0, np.minimum.accumulate(ranked[::-1])[::-1])
+    return result
+
+
+def _compare_task(task):
+    """One (metric, pair) comparison. Module level so it can run in a process pool."""
+    (values_a, counts_a), (values_b, counts_b), statistic, n_resamples, confidence, seed = task
+    rng = np.random.default_rng(seed)
+    n_a, n_b = counts_a.sum(), counts_b.sum()
+    if n_a == 0 or n_b == 0:
+        return {"diff": np.nan, "ci_low": np.nan, "ci_high": np.nan, "p_value": np.nan}
+    observed = (_statistic(counts_b[None, :], values_b, n_b, statistic)[0]
+                - _statistic(counts_a[None, :], values_a, n_a, statistic)[0])
+    boot = bootstrap_diff(values_a, counts_a, values_b, counts_b, rng, n_resamples, statistic)
+    null = permutation_diffs(values_a, counts_a, values_b, counts_b, rng, n_resamples, statistic)
+    tail = (1 - confidence) / 2
+    return {
+        "diff": observed,
+        "ci_low": np.quantile(boot, tail),
+        "ci_high": np.quantile(boot, 1 - tail),
+        "p_value": (1 + np.sum(np.abs(null) >= abs(observed) - 1e-12)) / (n_resamples + 1),
+    }
+
+
+
+class ABTester:
+    """
+    Vectorized A/B statistics for engagement metrics of TwExportly data.
+
+    `compare` computes, for every metric and pair of variants at once, the difference of
+    a statistic (mean or median) with a bootstrap confidence interval, a permutation test
+    p-value and Benjamini-Hochberg adjusted p-values. Each group is first compressed to
+    its distinct values and counts (see `compress`); resamples are then drawn as
+    multinomial / hypergeometric count vectors in NumPy blocks, so the cost depends on the
+    number of distinct values and not on the number of rows. Pairs can be spread over a
+    process pool, and results are reproducible for a given seed whatever `n_jobs` is.
+
+    `sequential` runs an always-valid mixture sequential probability ratio test (mSPRT)
+    over time, so an experiment can be checked continuously and stopped early without
+    inflating the false positive rate.
+
+    Example:
+    -------
+    >>> tester = ABTester(seed=0)
+    >>> tester.compare(df, group_column="screen_name", control="AmericanAir")
+
+    Attributes:
+    ----------
+    n_resamples : int
+        Bootstrap and permutation resamples per comparison.
+    confidence : float
+        Level of the bootstrap confidence intervals.
+    alpha : float
+        Significance level of the `significant` columns.
+    seed : int
+        Seed of all resampling.
+    """
+
+    def __init__(self, n_resamples=2_000, confidence=0.95, alpha=0.05, statistic="mean", seed=0, n_jobs=1,
+                 max_unique=20_000):
+        """
+        Parameters:
+        ----------
+        n_resamples : int, optional (default=2_000)
+            Bootstrap and permutation resamples per comparison.
+        confidence : float, optional (default=0.95)
+            Level of the bootstrap confidence intervals.
+        alpha : float, optional (default=0.05)
+            Significance level.
+        statistic : str, optional (default="mean")
+            "mean" or "median".
+        seed : int, optional (default=0)
+            Seed of all resampling.
+        n_jobs : int, optional (default=1)
+            Number of worker processes for `compare` (-1 uses all CPUs).
+        max_unique : int, optional (default=20_000)
+            Distinct values kept per group before binning (see `compress`).
+        """
+        if statistic not in ("mean", "median"):
+            raise ValueError(f"Unknown statistic: {statistic}")
+        self.n_resamples = n_resamples
+        self.confidence = confidence
+        self.alpha = alpha
+        self.statistic = statistic
+        self.seed = seed
+        self.n_jobs = n_jobs
+        self.max_unique = max_unique
+
+    @staticmethod
+    def _pairs(groups, pairs=None, control=None):
+        if pairs is not None:
+            return list(pairs)
+        if control is not None:
+            return [(control, group) for group in groups if group != control]
+        return list(combinations(groups, 2))
+
+    def compare(self, df, group_column, metric_columns=None, pairs=None, control=None):
+        """
+        Compares variants on one or more metrics.
+
+        Parameters:
+        ----------
+        df : pd.DataFrame
+            One row per post, e.g. from `TwExportlyLoader.load`.
+        group_column : str
+            Column with the variant of each row (e.g. screen_name or a keyword flag).
+        metric_columns : list of str, optional
+            Metrics to compare. Defaults to the `ENGAGEMENT_COLUMNS` present in `df`.
+        pairs : list of tuple, optional
+            (a, b) variant pairs. Defaults to every variant against `control`, or all pairs.
+        control : optional
+            Reference variant.
+
+        Returns:
+        -------
+        pd.DataFrame
+            One row per (metric, a, b): n_a, n_b, stat_a, stat_b, diff (b - a), ci_low,
+            ci_high, p_value (permutation), p_adjusted (Benjamini-Hochberg over all rows)
+            and significant.
+        """
+        metric_columns = metric_columns or [c for c in ENGAGEMENT_COLUMNS if c in df.columns]
+        groups = list(pd.unique(df[group_column].dropna()))
+        pairs = self._pairs(groups, pairs, control)
+
+        # Each group is compressed once per metric and reused by all of its pairs
+        compressed = {}
+        for metric in metric_columns:
+            for group, values in df.groupby(group_column, sort=False)[metric]:
+                compressed[metric, group] = compress(values.to_numpy(dtype=np.float64, na_value=np.nan),
+                                                     self.max_unique)
+
+        keys = [(metric, a, b) for metric in metric_columns for a, b in pairs]
+        seeds = np.random.SeedSequence(self.seed).spawn(len(keys))
+        tasks = [(compressed[metric, a], compressed[metric, b], self.statistic, self.n_resamples, self.confidence, seed)
+                 for (metric, a, b), seed in zip(keys, seeds)]
+        if self.n_jobs == 1 or len(tasks) < 2:
+            results = [_compare_task(task) for task in tasks]
+        else:
+            max_workers = os.cpu_count() if self.n_jobs in (None, -1) else self.n_jobs
+            with ProcessPoolExecutor(max_workers=max_workers) as executor:
+                results = list(executor.map(_compare_task, tasks))
+
+        rows = []
+        for (metric, a, b), result in zip(keys, results):
+            (values_a, counts_a), (values_b, counts_b) = compressed[metric, a], compressed[metric, b]
+            rows.append(dict(
+                metric=metric, group_a=a, group_b=b, n_a=int(counts_a.sum()), n_b=int(counts_b.sum()),
+                stat_a=_statistic(counts_a[None, :], values_a, counts_a.sum(), self.statistic)[0] if len(values_a) else np.nan,
+                stat_b=_statistic(counts_b[None, :], values_b, counts_b.sum(), self.statistic)[0] if len(values_b) else np.nan,
+                **result,
+            ))
+        df_results = pd.DataFrame(rows, columns=["metric", "group_a", "group_b", "n_a", "n_b", "stat_a", "stat_b",
+                                                 "diff", "ci_low", "ci_high", "p_value"])
+        df_results["p_adjusted"] = adjust_pvalues(df_results["p_value"])
+        df_results["significant"] = df_results["p_adjusted"] <= self.alpha
+        return df_results
+
+    def sequential(self, df, group_column, metric, a, b, time_column="created_at", tau=None, n_looks=100):
+        """
+        Always-valid sequential test of mean(b) - mean(a) as the posts arrive over time.
+
+        The mixture SPRT compares the running difference of means, with variance
+        V = var_a / n_a + var_b / n_b, against a normal mixture of effects with standard
+        deviation `tau`. Its p-values stay valid however often the test is checked, so
+        the experiment can be stopped at the first look where p <= alpha.
+
+        Parameters:
+        ----------
+        df : pd.DataFrame
+            One row per post.
+        group_column, metric : str
+            Variant and metric columns.
+        a, b :
+            The variants compared.
+        time_column : str, optional (default="created_at")
+            Arrival order of the posts.
+        tau : float, optional
+            Standard deviation of the effect mixture, ideally the size of effect worth
+            detecting. Defaults to 10% of the metric's standard deviation.
+        n_looks : int, optional (default=100)
+            Number of evenly spaced looks reported.
+
+        Returns:
+        -------
+        pd.DataFrame
+            One row per look: time, n_a, n_b, diff, p_value (always valid) and significant.
+        """
+        d = df.loc[df[group_column].isin([a, b]), [time_column, group_column, metric]].dropna()
+        d = d.sort_values(time_column, kind="stable")
+        x = d[metric].to_numpy(dtype=np.float64)
+        is_b = (d[group_column] == b).to_numpy()
+        columns = ["time", "n_a", "n_b", "diff", "p_value", "significant"]
+        if len(x) == 0:
+            return pd.DataFrame(columns=columns)
+
+        n_b = np.cumsum(is_b)
+        n_a = np.arange(1, len(x) + 1) - n_b
+        sum_b, sum_a = np.cumsum(x * is_b), np.cumsum(x * ~is_b)
+        sq_b, sq_a = np.cumsum(x * x * is_b), np.cumsum(x * x * ~is_b)
+        looks = np.unique(np.linspace(0, len(x) - 1, n_looks).astype(np.int64))
+        looks = looks[(n_a[looks] >= 2) & (n_b[looks] >= 2)]
+        if len(looks) == 0:
+            return pd.DataFrame(columns=columns)
+
+        na, nb = n_a[looks], n_b[looks]
+        mean_a, mean_b = sum_a[looks] / na, sum_b[looks] / nb
+        var_a = np.maximum(sq_a[looks] - na * mean_a ** 2, 0) / (na - 1)
+        var_b = np.maximum(sq_b[looks] - nb * mean_b ** 2, 0) / (nb - 1)
+        variance = np.maximum(var_a / na + var_b / nb, 1e-12)
+        tau2 = (tau if tau is not None else 0.1 * x.std()) ** 2 or 1e-12
+        diff = mean_b - mean_a
+        log_lr = 0.5 * np.log(variance / (variance + tau2)) + diff ** 2 * tau2 / (2 * variance * (variance + tau2))
+        p_value = np.minimum.accumulate(np.minimum(1.0, np.exp(-log_lr)))
+        return pd.DataFrame({
+            "time": d[time_column].to_numpy()[looks],
+            "n_a": na, "n_b": nb, "diff": diff, "p_value": p_value,
+            "significant": p_value <= self.alpha,
+        })
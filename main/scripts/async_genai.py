@@ -0,0 +1,679 @@
+import os
+import shutil
+import asyncio
+import tempfile
+import traceback
+import openai
+from scripts.genai import GenAI, MAX_VISION_REQUEST_BYTES  # Import base class
+from scripts.instrumentation import default_registry, async_http_event_hooks
+from scripts.prompt_cache import PromptLayout
+from scripts.movieai import MovieAI, SEGMENT_LIST_NAME
+from scripts.structured_output import StructuredOutput, JSONListStream, parse_json_response
+
+
+
+class AsyncGenAI(GenAI):
+    """
+    An asyncio version of GenAI for use inside event loops (e.g. an async web service).
+
+    The API methods have the same names and parameters as in GenAI but are coroutines
+    built on `openai.AsyncClient`. Blocking work (frame extraction, image encoding, PDF and
+    DOCX parsing) runs in a thread pool so it never blocks the event loop. Helpers that
+    do no I/O (`remove_urls`, `display_tweet`, ...) are inherited unchanged.
+
+    Attributes:
+    ----------
+    client : openai.AsyncClient
+        An instance of the async OpenAI client initialized with the API key.
+    executor : concurrent.futures.Executor or None
+        Executor for blocking work. `None` uses the event loop's default thread pool.
+    metrics : MetricsRegistry
+        Registry where every API call is recorded.
+    """
+
+    def __init__(self, openai_api_key, executor=None, metrics=None, base_url=None):
+        """
+        Initializes the AsyncGenAI class with the provided OpenAI API key.
+
+        Parameters:
+        ----------
+        openai_api_key : str
+            The API key for accessing OpenAI's services.
+        executor : concurrent.futures.Executor, optional
+            Executor used for blocking work. Defaults to the event loop's thread pool.
+        metrics : MetricsRegistry, optional
+            Registry that records every API call. Defaults to the shared registry.
+        base_url : str, optional
+            Alternative API endpoint (see `GenAI`).
+        """
+        self.metrics = metrics if metrics is not None else default_registry
+        self.client = openai.AsyncClient(
+            api_key=openai_api_key,
+            base_url=base_url,
+            http_client=openai.DefaultAsyncHttpxClient(event_hooks=async_http_event_hooks()),
+        )
+        self.openai_api_key = openai_api_key
+        self.executor = executor
+        self.prompt_layout = PromptLayout()
+
+    async def _run_blocking(self, func, *args):
+        """Runs a blocking function in the executor and awaits its result."""
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(self.executor, func, *args)
+
+    async def generate_text(self, prompt, instructions='You are a helpful AI named Jarvis', model="gpt-4o-mini", output_type='text', temperature =1,
+                            context=None, cache_key=None):
+        """
+        Generates a text completion using the OpenAI API. See `GenAI.generate_text`.
+        """
+        messages, cache_options = self._cached_messages(prompt, instructions, context, cache_key, model)
+        with self.metrics.track(type(self).__name__, "chat.completions", model=model) as call:
+            completion = await self.client.chat.completions.create(
+                model=model,
+                temperature=temperature,
+                response_format={"type": output_type},
+                messages=messages,
+                **cache_options
+            )
+            call.set_usage(completion.usage)
+        if cache_key is not None:
+            self.prompt_layout.record_usage(cache_key, completion.usage)
+        response = completion.choices[0].message.content
+        return self._clean_response(response)
+
+    async def generate_chat_response(self, chat_history, user_message, instructions, model="gpt-4o-mini", output_type='text', cache_key=None,
+                                     context_index=None, k=5, retrieval_mode="bm25"):
+        """
+        Generates a chatbot-like response based on the conversation history. See `GenAI.generate_chat_response`.
+        Retrieval runs in a worker thread; for "vector" and "hybrid" retrieval, `context_index` must embed
+        queries with a (synchronous) GenAI, otherwise a ValueError is raised.
+        """
+        chat_history.append({"role": "user", "content": user_message})
+        messages, cache_options = self._cached_messages(None, instructions, cache_key=cache_key, model=model,
+                                                        history=chat_history)
+        if context_index is not None:
+            content = await self._run_blocking(self._grounded_message, user_message, context_index, k, retrieval_mode)
+            messages[-1] = {"role": "user", "content": content}
+
+        with self.metrics.track(type(self).__name__, "chat.completions", model=model) as call:
+            completion = await self.client.chat.completions.create(
+                model=model,
+                response_format={"type": output_type},
+                messages=messages,
+                **cache_options
+            )
+            call.set_usage(completion.usage)
+        if cache_key is not None:
+            self.prompt_layout.record_usage(cache_key, completion.usage)
+
+        bot_response = completion.choices[0].message.content
+        chat_history.append({"role": "assistant", "content": bot_response})
+        return bot_response
+
+    async def generate_image(self, prompt, model="dall-e-3", size="1024x1024", quality="standard", n=1):
+        """
+        Generates an image from a text prompt using the OpenAI DALL-E API. See `GenAI.generate_image`.
+        """
+        with self.metrics.track(type(self).__name__, "images.generate", model=model):
+            response_img = await self.client.images.generate(
+                model=model,
+                prompt=prompt,
+                size=size,
+                quality=quality,
+                n=n,
+            )
+        await asyncio.sleep(1)
+        image_url = response_img.data[0].url
+        revised_prompt = response_img.data[0].revised_prompt
+
+        return image_url, revised_prompt
+
+    async def generate_image_description(self, image_paths, instructions, model = 'gpt-4o-mini'):
+        """
+        Generates a description for one or more images. See `GenAI.generate_image_description`.
+        """
+        if isinstance(image_paths, str):
+            image_paths = [image_paths]
+
+        base64_images = await asyncio.gather(*[self._run_blocking(self.encode_image, path) for path in image_paths])
+        image_urls = [f"data:image/jpeg;base64,{base64_image}" for base64_image in base64_images]
+        return await self.generate_image_url_description(image_urls, instructions, model=model)
+
+    async def generate_image_url_description(self, image_urls, instructions, model='gpt-4o-mini', max_tokens=1000):
+        """
+        Generates a description for one or more image URLs. See `GenAI.generate_image_url_description`.
+        """
+        if isinstance(image_urls, str):
+            image_urls = [image_urls]
+
+        params = {
+            "model": model,
+            "messages": self._vision_messages(instructions, image_urls),
+            "max_tokens": max_tokens,
+        }
+
+        with self.metrics.track(type(self).__name__, "chat.completions.vision", model=model) as call:
+            completion = await self.client.chat.completions.create(**params)
+            call.set_usage(completion.usage)
+        response = completion.choices[0].message.content
+        return self._clean_response(response)
+
+    async def extract_frames(self, fname_video, max_samples = 15):
+        """
+        Extracts frames from a video file in a worker thread. See `GenAI.extract_frames`.
+        """
+        return await self._run_blocking(super().extract_frames, fname_video, max_samples)
+
+    async def generate_video_description(self, fname_video, instructions, max_samples=15, model='gpt-4o-mini', frames=None,
+                                         max_request_bytes=MAX_VISION_REQUEST_BYTES):
+        """
+        Generates a textual description of a video by analyzing sampled frames. See `GenAI.generate_video_description`.
+        """
+        if frames is None:
+            image_urls, nframes, fps = await self._run_blocking(self._video_frame_urls, fname_video, max_samples,
+                                                                max_request_bytes)
+        else:
+            base64Frames_samples, nframes, fps = frames
+            image_urls = [f"data:image/jpeg;base64,{base64_image}" for base64_image in base64Frames_samples]
+
+        params = {
+            "model": model,
+            "messages": self._vision_messages(instructions, image_urls),
+            "max_tokens": 1000,
+        }
+
+        with self.metrics.track(type(self).__name__, "chat.completions.vision", model=model) as call:
+            completion = await self.client.chat.completions.create(**params)
+            call.set_usage(completion.usage)
+        response = completion.choices[0].message.content
+        return self._clean_response(response)
+
+    async def generate_audio(self, text, file_path, model='tts-1', voice='nova', speed=1.0):
+        """
+        Generates an audio file from the given text using OpenAI's text-to-speech model. See `GenAI.generate_audio`.
+        """
+        with self.metrics.track(type(self).__name__, "audio.speech", model=model):
+            async with self.client.audio.speech.with_streaming_response.create(
+                model=model,
+                voice=voice,
+                input=text,
+                speed=speed
+            ) as response:
+                await response.stream_to_file(file_path)
+
+        return True
+
+    async def recognize_speech(self, audio_filename, model = 'whisper-1'):
+        """
+        Transcribes an audio file with OpenAI's speech-to-text model. See `GenAI.recognize_speech`.
+        """
+        try:
+            with open(audio_filename, "rb") as audio_file:
+                with self.metrics.track(type(self).__name__, "audio.transcriptions", model=model):
+                    transcription = await self.client.audio.transcriptions.create(
+                        model=model,
+                        file=audio_file
+                    )
+            return transcription.text
+        except Exception:
+            traceback.print_exc()
+            return None
+
+    async def read_pdf(self, file_path):
+        """
+        Extracts the text of a PDF file in a worker thread. See `GenAI.read_pdf`.
+        """
+        return await self._run_blocking(super().read_pdf, file_path)
+
+    async def read_docx(self, file_path):
+        """
+        Extracts the text of a DOCX file in a worker thread. See `GenAI.read_docx`.
+        """
+        return await self._run_blocking(super().read_docx, file_path)
+
+    async def get_embedding(self, text, model='text-embedding-3-small'):
+        """
+        Generates an embedding vector for a given text. See `GenAI.get_embedding`.
+        """
+        text = text.replace("\n", " ")
+        with self.metrics.track(type(self).__name__, "embeddings", model=model) as call:
+            response = await self.client.embeddings.create(
+                input=text,
+                model=model
+            )
+            call.set_usage(response.usage)
+        return response.data[0].embedding
+
+    async def get_embeddings(self, texts, model='text-embedding-3-small', batch_size=256):
+        """
+        Generates the embedding vectors of many texts. See `GenAI.get_embeddings`.
+        """
+        embeddings = []
+        for start in range(0, len(texts), batch_size):
+            batch = [text.replace("\n", " ") for text in texts[start:start + batch_size]]
+            with self.metrics.track(type(self).__name__, "embeddings", model=model, batch_size=len(batch)) as call:
+                response = await self.client.embeddings.create(input=batch, model=model)
+                call.set_usage(response.usage)
+            embeddings.extend(item.embedding for item in sorted(response.data, key=lambda item: item.index))
+        return embeddings
+
+
+
+class AsyncMovieAI(AsyncGenAI):
+    """
+    An asyncio version of MovieAI. FFmpeg runs through `asyncio.create_subprocess_exec`
+    and independent steps (narrations, per-clip muxing) run concurrently.
+    """
+
+    def __init__(self, openai_api_key, ffmpeg_path="ffmpeg.exe", executor=None, max_ffmpeg_processes=None, metrics=None, base_url=None):
+        """
+        Initializes AsyncMovieAI as an extension of AsyncGenAI.
+
+        Parameters:
+        ----------
+        openai_api_key : str
+            The API key for accessing OpenAI's services.
+        ffmpeg_path : str, optional (default="ffmpeg.exe")
+            The path to the FFmpeg executable, used for video processing.
+        executor : concurrent.futures.Executor, optional
+            Executor used for blocking work. Defaults to the event loop's thread pool.
+        max_ffmpeg_processes : int, optional
+            Maximum number of concurrent FFmpeg processes (default: number of CPUs).
+        metrics : MetricsRegistry, optional
+            Registry that records API calls and FFmpeg runs. Defaults to the shared registry.
+        base_url : str, optional
+            Alternative API endpoint (see `GenAI`).
+        """
+        super().__init__(openai_api_key, executor=executor, metrics=metrics, base_url=base_url)
+        self.ffmpeg_path = ffmpeg_path
+        self.max_ffmpeg_processes = max_ffmpeg_processes or os.cpu_count() or 1
+        self._ffmpeg_semaphore = None
+
+        # Check if FFmpeg is accessible
+        if not shutil.which(self.ffmpeg_path):
+            raise FileNotFoundError(
+                f"FFmpeg not found at '{self.ffmpeg_path}'. Please ensure FFmpeg is installed and available in PATH."
+            )
+
+    async def _run_ffmpeg(self, command, name="ffmpeg"):
+        """
+        Runs an FFmpeg command without blocking the event loop and records it as `name`.
+
+        Returns:
+        -------
+        tuple
+            (returncode, stderr as str)
+        """
+        # Created lazily so it binds to the running event loop
+        if self._ffmpeg_semaphore is None:
+            self._ffmpeg_semaphore = asyncio.Semaphore(self.max_ffmpeg_processes)
+        async with self._ffmpeg_semaphore:
+            with self.metrics.track(type(self).__name__, name) as call:
+                process = await asyncio.create_subprocess_exec(
+                    *command,
+                    stdout=asyncio.subprocess.PIPE,
+                    stderr=asyncio.subprocess.PIPE,
+                )
+                _, stderr = await process.communicate()
+                if process.returncode != 0:
+                    call.status = "error"
+        return process.returncode, stderr.decode("utf-8", errors="replace")
+
+    async def split_video(self, file_path: str, output_directory: str, segment_time: int = 60) -> None:
+        """
+        Splits a video file into clips of `segment_time` seconds. See `MovieAI.split_video`.
+        """
+        if not os.path.exists(file_path):
+            raise FileNotFoundError(f"❌ Error: The input file '{file_path}' does not exist.")
+
+        await self._run_blocking(MovieAI._clear_directory, output_directory)
+        command = MovieAI._split_command(self.ffmpeg_path, file_path, output_directory, segment_time,
+                                         os.path.join(output_directory, SEGMENT_LIST_NAME))
+
+        print(f"🎬 Splitting video into {segment_time}-second clips...")
+        returncode, stderr = await self._run_ffmpeg(command, "ffmpeg.split")
+        if returncode == 0:
+            print(f"✅ Video successfully split into clips at '{output_directory}'.")
+        else:
+            print(f"❌ Error: FFmpeg encountered an issue.\n{stderr}")
+
+    async def sample_clip_frames(self, file_path, output_directory, max_samples=10, max_width=None, max_workers=None,
+                                 max_request_bytes=MAX_VISION_REQUEST_BYTES):
+        """
+        Samples the frames of all clips in one decoding pass of the source video. See `MovieAI.sample_clip_frames`.
+        """
+        return await self._run_blocking(MovieAI.sample_clip_frames, self, file_path, output_directory,
+                                        max_samples, max_width, max_workers, max_request_bytes)
+
+    async def generate_clip_descriptions(self, clip_paths, instructions_base="", model = 'gpt-4o-mini', verbose = False, concurrent=False,
+                                         frame_samples=None):
+        """
+        Generates a detailed description of each movie clip. See `MovieAI.generate_clip_descriptions`.
+
+        Parameters:
+        ----------
+        concurrent : bool, optional (default=False)
+            By default each clip's prompt includes the previous clip's description, so the
+            clips are described one after another. With `True` all clips are described at
+            once without that context.
+        frame_samples : dict, optional
+            Frames sampled beforehand by `sample_clip_frames` (see `MovieAI.generate_clip_descriptions`).
+
+        Returns:
+        -------
+        pd.DataFrame or bool
+            Columns ["clip_path", "description"], or `False` if no clip was processed.
+        """
+        import pandas as pd
+
+        async def describe(clip_path, previous):
+            instructions = f"""{instructions_base} Generate a detailed description of this clip from a longer video.
+                                 The previous clip in the sequence had a description:{previous}"""
+            frames = frame_samples.get(os.path.normpath(clip_path)) if frame_samples else None
+            description = await self.generate_video_description(clip_path, instructions, max_samples=10, model=model,
+                                                                frames=frames)
+            if verbose:
+                print(f"📝 Description for {clip_path}: {description}")
+            return description
+
+        dict_list = []
+        if concurrent:
+            results = await asyncio.gather(
+                *[describe(clip_path, "Not available.") for clip_path in clip_paths],
+                return_exceptions=True,
+            )
+            for clip_path, result in zip(clip_paths, results):
+                if isinstance(result, Exception):
+                    print(f"❌ Error processing {clip_path}: {result}")
+                    continue
+                dict_list.append({"clip_path": clip_path, "description": result})
+        else:
+            description = "This is the first clip, so no previous scene."
+            for clip_path in clip_paths:
+                try:
+                    print(f"Processing: {clip_path}")
+                    description = await describe(clip_path, description)
+                    dict_list.append({"clip_path": clip_path, "description": description})
+                except Exception as e:
+                    print(f"❌ Error processing {clip_path}: {e}")
+
+        return pd.DataFrame(dict_list) if dict_list else False
+
+    async def generate_summary_script(self, df_clips, instructions, model='gpt-4o-mini', window_size=None,
+                                      clips_per_window=5, max_workers=8, max_fix_calls=2):
+        """
+        Generates a script for a summary video based on clip descriptions. See `MovieAI.generate_summary_script`.
+        """
+        try:
+            if window_size and len(df_clips) > window_size:
+                return await self._generate_sectioned_summary_script(df_clips, instructions, model, window_size,
+                                                                     clips_per_window, max_workers, max_fix_calls)
+
+            prompt, system_instructions, clips_string, cache_key = MovieAI._summary_script_prompt(df_clips, instructions)
+            print(f"Generating script for summary video using {model}...\n")
+            records = await StructuredOutput(self, max_fix_calls=max_fix_calls).agenerate(
+                prompt=prompt,
+                instructions=system_instructions,
+                schema=MovieAI._summary_script_schema(df_clips),
+                context=clips_string,
+                cache_key=cache_key,
+                model=model,
+            )
+            return MovieAI._script_dataframe(records)
+
+        except Exception as e:
+            print(f"❌ Unexpected error: {e}")
+
+        return False
+
+    async def _generate_sectioned_summary_script(self, df_clips, instructions, model, window_size, clips_per_window, max_workers,
+                                                 max_fix_calls=2):
+        """Hierarchical mode of `generate_summary_script`, with the windows summarized concurrently."""
+        windows = MovieAI._windows(df_clips, window_size)
+        semaphore = asyncio.Semaphore(max_workers)
+        print(f"Summarizing {len(df_clips)} clips in {len(windows)} windows using {model}...")
+
+        async def summarize(df_window):
+            prompt, system_instructions, context = MovieAI._window_summary_prompt(df_window, instructions, clips_per_window)
+            async with semaphore:
+                response = await self.generate_text(prompt=prompt, instructions=system_instructions, context=context,
+                                                    model=model, output_type="json_object")
+            return MovieAI._parse_window_summary(response, df_window, clips_per_window)
+
+        results = await asyncio.gather(*[summarize(df_window) for df_window in windows])  # gather keeps window order
+
+        summaries = [summary for summary, _ in results]
+        candidates = [path for _, clip_paths in results for path in clip_paths]
+        df_candidates = df_clips[df_clips["clip_path"].isin(candidates)]
+
+        print(f"Generating script from {len(df_candidates)} shortlisted clips using {model}...\n")
+        prompt, system_instructions, context = MovieAI._sectioned_script_prompt(df_candidates, summaries, instructions)
+        records = await StructuredOutput(self, max_fix_calls=max_fix_calls).agenerate(
+            prompt=prompt, instructions=system_instructions, schema=MovieAI._summary_script_schema(df_candidates),
+            context=context, model=model)
+        return MovieAI._script_dataframe(records)
+
+    async def generate_audio_narrations(self, df_summary_script, voice="nova", output_dir=None):
+        """
+        Generates the audio narrations of all clips concurrently. See `MovieAI.generate_audio_narrations`.
+        """
+        required_columns = {"clip_path", "narration"}
+        if not required_columns.issubset(df_summary_script.columns):
+            print(f"❌ Error: DataFrame must contain columns: {required_columns}")
+            return False
+
+        async def narrate(clip_path, narration):
+            try:
+                audio_path = MovieAI._narration_audio_path(clip_path, output_dir)
+                if await self.generate_audio(narration, audio_path, voice=voice):
+                    print(f"✅ Audio narration created: {audio_path}")
+                    return True
+                print(f"❌ Failed to generate audio for {clip_path}")
+            except Exception as e:
+                print(f"❌ Error processing {clip_path}: {e}")
+            return False
+
+        results = await asyncio.gather(*[
+            narrate(row["clip_path"], row["narration"]) for _, row in df_summary_script.iterrows()
+        ])
+        return any(results)
+
+    async def generate_summary_video(self, df_summary_script, file_path: str):
+        """
+        Muxes narrations into the clips concurrently and concatenates them into the final
+        video. See `MovieAI.generate_summary_video`.
+        """
+        final_video_dir = os.path.dirname(os.path.abspath(file_path))
+        os.makedirs(final_video_dir, exist_ok=True)
+
+        async def mux(index, clip_path):
+            video_path = os.path.abspath(clip_path)
+            audio_path = video_path.replace(".mp4", ".mp3")
+            if not os.path.exists(video_path):
+                print(f"❌ Missing video file: {video_path}, skipping...")
+                return None
+            if not os.path.exists(audio_path):
+                print(f"❌ Missing audio file: {audio_path}, skipping...")
+                return None
+
+            processed_clip = os.path.join(final_video_dir, f"processed_clip_{index:03d}.mp4")
+            command = MovieAI._mux_command(self.ffmpeg_path, video_path, audio_path, processed_clip)
+            returncode, stderr = await self._run_ffmpeg(command, "ffmpeg.mux")
+            if returncode != 0:
+                print(f"❌ Error processing {video_path}: {stderr}")
+                return None
+            print(f"✅ Processed: {processed_clip}")
+            return processed_clip, audio_path
+
+        results = await asyncio.gather(*[
+            mux(index, row["clip_path"]) for index, row in df_summary_script.iterrows()
+        ])
+        results = [r for r in results if r is not None]  # gather keeps script order
+        if not results:
+            print("❌ No valid clips processed. Cannot create summary video.")
+            return False
+        processed_clips = [clip for clip, _ in results]
+        processed_audios = [audio for _, audio in results]
+        return await self._concat_clips(processed_clips, processed_audios, file_path)
+
+    async def _concat_clips(self, processed_clips, processed_audios, file_path):
+        """Concatenates the processed clips into `file_path`, then deletes them and their audio."""
+        with tempfile.NamedTemporaryFile(delete=False, mode="w", suffix=".txt") as concat_list_file:
+            concat_list_path = concat_list_file.name
+            for clip in processed_clips:
+                concat_list_file.write(f"file '{clip.replace(os.sep, '/')}'\n")
+
+        try:
+            returncode, stderr = await self._run_ffmpeg(
+                MovieAI._concat_command(self.ffmpeg_path, concat_list_path, file_path), "ffmpeg.concat"
+            )
+            if returncode != 0:
+                print(f"❌ Error concatenating videos: {stderr}")
+                return False
+            print(f"🎬 Final movie created: {file_path}")
+
+            for path in processed_clips + processed_audios:
+                try:
+                    os.remove(path)
+                    print(f"🗑️ Deleted: {path}")
+                except Exception as e:
+                    print(f"⚠️ Failed to delete {path}: {e}")
+            return True
+
+        finally:
+            os.remove(concat_list_path)
+
+    async def generate_summary_video_streaming(self, df_clips, instructions, file_path, voice="nova", output_dir=None,
+                                               model='gpt-4o-mini', max_fix_calls=1):
+        """
+        Generates the summary script, narrations and summary video as one pipeline.
+
+        The script is streamed from the model and parsed incrementally. As soon as an entry
+        of the script is complete, its narration is synthesized, and as soon as the narration
+        is saved, it is muxed into its clip. LLM, TTS and FFmpeg latency therefore overlap
+        instead of adding up; only the final concatenation waits for all clips. Entries that
+        fail validation (see `MovieAI.generate_summary_script`) are corrected with up to
+        `max_fix_calls` follow-up requests after the stream ends.
+
+        Parameters:
+        ----------
+        df_clips : pd.DataFrame
+            Clip descriptions, with a "clip_path" column (see `generate_summary_script`).
+        instructions : str
+            Additional guidance for selecting clips and structuring the summary video.
+        file_path : str
+            The path for the final output summary video.
+        voice : str, optional (default="nova")
+            Voice of the narrations (see `generate_audio_narrations`).
+        output_dir : str, optional
+            Directory of the narration audio files. If `None`, audio is saved next to the clips.
+        model : str, optional (default='gpt-4o-mini')
+            The OpenAI model used for the script.
+        max_fix_calls : int, optional (default=1)
+            Maximum number of requests that correct invalid script entries.
+
+        Returns:
+        -------
+        pd.DataFrame or bool
+            The summary script (["clip_path", "narration"]) if the video was created, otherwise `False`.
+        """
+        schema = MovieAI._summary_script_schema(df_clips)
+        prompt, system_instructions, clips_string, cache_key = MovieAI._summary_script_prompt(df_clips, instructions)
+        messages, cache_options = self._cached_messages(prompt, system_instructions, clips_string, cache_key, model)
+        final_video_dir = os.path.dirname(os.path.abspath(file_path))
+        os.makedirs(final_video_dir, exist_ok=True)
+
+        entries = {}
+        jobs = {}
+        failures = []
+
+        async def narrate_and_mux(position, entry):
+            video_path = os.path.abspath(entry["clip_path"])
+            audio_path = MovieAI._narration_audio_path(entry["clip_path"], output_dir)
+            try:
+                if not await self.generate_audio(entry["narration"], audio_path, voice=voice):
+                    print(f"❌ Failed to generate audio for {entry['clip_path']}")
+                    return None
+            except Exception as e:
+                print(f"❌ Error processing {entry['clip_path']}: {e}")
+                return None
+            if not os.path.exists(video_path):
+                print(f"❌ Missing video file: {video_path}, skipping...")
+                return None
+
+            processed_clip = os.path.join(final_video_dir, f"processed_clip_{position:03d}.mp4")
+            command = MovieAI._mux_command(self.ffmpeg_path, video_path, audio_path, processed_clip)
+            returncode, stderr = await self._run_ffmpeg(command, "ffmpeg.mux")
+            if returncode != 0:
+                print(f"❌ Error processing {video_path}: {stderr}")
+                return None
+            print(f"✅ Processed: {processed_clip}")
+            return processed_clip, audio_path
+
+        def start(position, item):
+            if position in jobs:
+                return
+            entry, error = schema.check_item(item)
+            if error is not None:
+                failures.append((position, item, error))
+                return
+            entries[position] = entry
+            jobs[position] = asyncio.create_task(narrate_and_mux(position, entry))
+
+        print(f"Streaming script for summary video using {model}...\n")
+        stream_parser = JSONListStream(schema.key)
+        position = 0
+        try:
+            with self.metrics.track(type(self).__name__, "chat.completions.stream", model=model) as call:
+                stream = await self.client.chat.completions.create(
+                    model=model,
+                    response_format={"type": "json_object"},
+                    messages=messages,
+                    stream=True,
+                    stream_options={"include_usage": True},
+                    **cache_options
+                )
+                async for chunk in stream:
+                    if getattr(chunk, "usage", None) is not None:
+                        call.set_usage(chunk.usage)
+                    if not chunk.choices or not chunk.choices[0].delta.content:
+                        continue
+                    for item in stream_parser.feed(chunk.choices[0].delta.content):
+                        start(position, item)
+                        position += 1
+
+            # Entries the incremental parser could not see (e.g. malformed JSON) are recovered
+            # from the full response with local repair
+            items = schema.items(parse_json_response(stream_parser.text)) or []
+            for k, item in enumerate(items[position:], start=position):
+                start(k, item)
+
+            fix_calls = 0
+            while failures and fix_calls < max_fix_calls:
+                fix_calls += 1
+                print(f"Fixing {len(failures)} invalid script entries...")
+                response = await self.generate_text(prompt=schema.fix_prompt(failures), instructions=system_instructions,
+                                                    context=clips_string, cache_key=cache_key, model=model,
+                                                    output_type="json_object")
+                fixed, positions = StructuredOutput._fixed_items(schema, parse_json_response(response), failures)
+                failures = [f for f in failures if f[0] not in positions]
+                for k, item in zip(positions, fixed):
+                    start(k, item)
+            for k, _, error in failures:
+                print(f"⚠️ Dropping script entry {k}: {error}")
+
+            results = await asyncio.gather(*[jobs[k] for k in sorted(jobs)])  # script order
+
+        except Exception as e:
+            print(f"❌ Unexpected error: {e}")
+            for job in jobs.values():
+                job.cancel()
+            return False
+
+        results = [r for r in results if r is not None]
+        if not results:
+            print("❌ No valid clips processed. Cannot create summary video.")
+            return False
+        if not await self._concat_clips([clip for clip, _ in results], [audio for _, audio in results], file_path):
+            return False
+        return MovieAI._script_dataframe([entries[k] for k in sorted(entries)])
@@ -0,0 +1,447 @@
+import io
+import os
+import json
+import time
+import uuid
+import hashlib
+from types import SimpleNamespace
+from scripts.genai import GenAI
+
+
+
+# Batch API endpoints. A batch file may only target one endpoint, so requests are
+# grouped by endpoint and submitted as one or more batches each.
+CHAT_ENDPOINT = "/v1/chat/completions"
+EMBEDDINGS_ENDPOINT = "/v1/embeddings"
+
+# Batch API limits per input file. Larger jobs are split into several files and batches.
+MAX_BATCH_REQUESTS = 50_000
+MAX_BATCH_BYTES = 200 * 1000 * 1000
+
+FINAL_STATUSES = {"completed", "failed", "expired", "cancelled"}
+
+
+
+class GenAIBatch:
+    """
+    Offline bulk generation with the OpenAI Batch API.
+
+    Calls that would normally go through `GenAI.generate_text`, `GenAI.get_embedding` or
+    `GenAI.generate_image_description` are queued with the matching `add_*` method, written
+    to JSONL batch files, submitted, polled until done, and their results mapped back to
+    the caller's IDs (e.g. DataFrame index values). Batch requests are billed at a
+    discount and have no per-call overhead, which suits overnight labeling jobs.
+
+    Each endpoint's requests are split into files of at most `max_requests` requests and
+    `max_bytes` bytes (the Batch API limits), submitted as one batch each, and their
+    results merged, so e.g. captioning a large image folder with base64-embedded images
+    does not exceed the 200 MB file limit.
+
+    Results are parsed from the batch objects alone (the endpoint and response body say
+    whether a result is text or an embedding), so a job can be resumed from another
+    process with `attach` and the IDs returned by `submit`.
+
+    Attributes:
+    ----------
+    client : openai.Client or LocalBatchClient
+        Client used for file upload and batch calls.
+    requests : dict
+        Maps endpoint to the list of queued request lines.
+    batches : dict
+        Maps batch ID to the submitted batch object.
+    """
+
+    def __init__(self, genai, client=None, work_dir="batch_jobs", max_requests=MAX_BATCH_REQUESTS,
+                 max_bytes=MAX_BATCH_BYTES):
+        """
+        Initializes the batch job.
+
+        Parameters:
+        ----------
+        genai : GenAI
+            GenAI instance whose client submits the batches (and whose `encode_image` is used).
+        client : optional
+            Client to use instead of `genai.client`, e.g. a `LocalBatchClient` for testing.
+        work_dir : str, optional (default="batch_jobs")
+            Directory where the JSONL input and output files are written.
+        max_requests : int, optional (default=MAX_BATCH_REQUESTS)
+            Maximum number of requests per input file.
+        max_bytes : int, optional (default=MAX_BATCH_BYTES)
+            Maximum size in bytes of an input file.
+        """
+        self.genai = genai
+        self.client = client if client is not None else genai.client
+        self.work_dir = work_dir
+        self.max_requests = max_requests
+        self.max_bytes = max_bytes
+        self.requests = {}
+        self.batches = {}
+        self._custom_ids = set()
+
+    def _add(self, endpoint, custom_id, body):
+        custom_id = str(custom_id)
+        if custom_id in self._custom_ids:
+            raise ValueError(f"Duplicate custom_id: {custom_id}")
+        self._custom_ids.add(custom_id)
+        self.requests.setdefault(endpoint, []).append({
+            "custom_id": custom_id,
+            "method": "POST",
+            "url": endpoint,
+            "body": body,
+        })
+
+    def add_text(self, custom_id, prompt, instructions='You are a helpful AI named Jarvis', model="gpt-4o-mini", output_type='text', temperature=1,
+                 context=None):
+        """
+        Queues a `generate_text` call.
+
+        Parameters:
+        ----------
+        custom_id : str or int
+            ID used to map the result back, e.g. a DataFrame index value or tweet_id.
+        prompt, instructions, model, output_type, temperature, context
+            Same as `GenAI.generate_text`.
+        """
+        messages, _ = self.genai.prompt_layout.build(prompt, instructions, context=context)
+        body = {
+            "model": model,
+            "temperature": temperature,
+            "response_format": {"type": output_type},
+            "messages": messages,
+        }
+        self._add(CHAT_ENDPOINT, custom_id, body)
+
+    def add_embedding(self, custom_id, text, model='text-embedding-3-small'):
+        """
+        Queues a `get_embedding` call.
+
+        Parameters:
+        ----------
+        custom_id : str or int
+            ID used to map the result back.
+        text, model
+            Same as `GenAI.get_embedding`.
+        """
+        body = {"model": model, "input": text.replace("\n", " ")}
+        self._add(EMBEDDINGS_ENDPOINT, custom_id, body)
+
+    def add_image_description(self, custom_id, image_paths, instructions, model='gpt-4o-mini'):
+        """
+        Queues a `generate_image_description` call. Images are embedded as base64 data URLs.
+
+        Parameters:
+        ----------
+        custom_id : str or int
+            ID used to map the result back, e.g. the image path.
+        image_paths, instructions, model
+            Same as `GenAI.generate_image_description`.
+        """
+        if isinstance(image_paths, str):
+            image_paths = [image_paths]
+        image_urls = [f"data:image/jpeg;base64,{self.genai.encode_image(path)}" for path in image_paths]
+        body = {
+            "model": model,
+            "messages": GenAI._vision_messages(instructions, image_urls),
+            "max_tokens": 1000,
+        }
+        self._add(CHAT_ENDPOINT, custom_id, body)
+
+    def write_jsonl(self):
+        """
+        Writes the queued requests to JSONL input files in `work_dir`, one or more per
+        endpoint, each within `max_requests` requests and `max_bytes` bytes.
+
+        Returns:
+        -------
+        list of tuple
+            (endpoint, path, number of requests) of each input file.
+
+        Raises:
+        ------
+        ValueError
+            If a single request is larger than `max_bytes`.
+        """
+        os.makedirs(self.work_dir, exist_ok=True)
+        files = []
+        for endpoint, lines in self.requests.items():
+            name = endpoint.strip("/").replace("/", "_")
+            parts, part, size = [], [], 0
+            for line in lines:
+                encoded = (json.dumps(line, ensure_ascii=False) + "\n").encode("utf-8")
+                if len(encoded) > self.max_bytes:
+                    raise ValueError(f"Request {line['custom_id']} is {len(encoded):,} bytes, more than the "
+                                     f"{self.max_bytes:,} bytes allowed per batch file.")
+                if part and (len(part) >= self.max_requests or size + len(encoded) > self.max_bytes):
+                    parts.append(part)
+                    part, size = [], 0
+                part.append(encoded)
+                size += len(encoded)
+            if part:
+                parts.append(part)
+            for i, part in enumerate(parts):
+                path = os.path.join(self.work_dir, f"batch_input_{name}_{i:03d}.jsonl")
+                with open(path, "wb") as f:
+                    f.writelines(part)
+                files.append((endpoint, path, len(part)))
+        return files
+
+    def submit(self, completion_window="24h", metadata=None):
+        """
+        Uploads the batch files and creates one batch per file.
+
+        Parameters:
+        ----------
+        completion_window : str, optional (default="24h")
+            Time frame in which the batch should be processed.
+        metadata : dict, optional
+            Metadata attached to the batches, e.g. {"job": "tweet-labels"}.
+
+        Returns:
+        -------
+        dict
+            Maps batch ID to its endpoint.
+        """
+        # All files are written first, so a request over the size limit fails before any upload
+        for endpoint, path, n_requests in self.write_jsonl():
+            with open(path, "rb") as f:
+                input_file = self.client.files.create(file=f, purpose="batch")
+            kwargs = {"metadata": metadata} if metadata else {}
+            batch = self.client.batches.create(
+                input_file_id=input_file.id,
+                endpoint=endpoint,
+                completion_window=completion_window,
+                **kwargs,
+            )
+            self.batches[batch.id] = batch
+            print(f"📤 Submitted batch {batch.id} with {n_requests} requests to {endpoint}")
+        return {batch_id: batch.endpoint for batch_id, batch in self.batches.items()}
+
+    def attach(self, batch_ids):
+        """
+        Attaches batches submitted earlier, e.g. by another process, so `wait`, `results`
+        and `map_results` can be called on a fresh instance.
+
+        Parameters:
+        ----------
+        batch_ids : str or iterable
+            Batch ID(s), e.g. the keys of the dict returned by `submit`.
+
+        Returns:
+        -------
+        dict
+            Maps batch ID to its current status.
+        """
+        if isinstance(batch_ids, str):
+            batch_ids = [batch_ids]
+        for batch_id in batch_ids:
+            self.batches[batch_id] = self.client.batches.retrieve(batch_id)
+        return {batch_id: batch.status for batch_id, batch in self.batches.items()}
+
+    def wait(self, poll_interval=60, timeout=None):
+        """
+        Polls the submitted batches until every one has finished.
+
+        Parameters:
+        ----------
+        poll_interval : float, optional (default=60)
+            Seconds between status checks.
+        timeout : float, optional
+            Give up after this many seconds. Waits indefinitely if `None`.
+
+        Returns:
+        -------
+        dict
+            Maps batch ID to the final batch status ("completed", "failed", ...).
+        """
+        tstart = time.time()
+        while True:
+            for batch_id, batch in self.batches.items():
+                if batch.status not in FINAL_STATUSES:
+                    self.batches[batch_id] = self.client.batches.retrieve(batch_id)
+            statuses = {batch_id: batch.status for batch_id, batch in self.batches.items()}
+            if all(status in FINAL_STATUSES for status in statuses.values()):
+                return statuses
+            if timeout is not None and time.time() - tstart > timeout:
+                print(f"⚠️ Timed out waiting for batches: {statuses}")
+                return statuses
+            time.sleep(poll_interval)
+
+    def results(self):
+        """
+        Downloads the output files of the completed batches and parses them.
+
+        The results of all batches (of every endpoint and input file) are merged. Text
+        results are cleaned like `generate_text` output and embedding results are the
+        embedding vectors. Requests that failed map to `None`.
+
+        Returns:
+        -------
+        dict
+            Maps custom_id (str) to the result.
+        """
+        results = {}
+        for batch in self.batches.values():
+            for file_id in (batch.output_file_id, getattr(batch, "error_file_id", None)):
+                if not file_id:
+                    continue
+                content = self.client.files.content(file_id).text
+                name = batch.endpoint.strip("/").replace("/", "_")
+                with open(os.path.join(self.work_dir, f"batch_output_{name}_{file_id}.jsonl"), "w", encoding="utf-8") as f:
+                    f.write(content)
+                for line in content.splitlines():
+                    if line.strip():
+                        record = json.loads(line)
+                        results[record["custom_id"]] = self._parse_record(record, batch.endpoint)
+        return results
+
+    @staticmethod
+    def _parse_record(record, endpoint):
+        response = record.get("response") or {}
+        if record.get("error") or response.get("status_code") != 200:
+            print(f"❌ Request {record['custom_id']} failed: {record.get('error') or response.get('body')}")
+            return None
+        body = response["body"]
+        if endpoint == EMBEDDINGS_ENDPOINT or body.get("object") == "list":
+            return body["data"][0]["embedding"]
+        return GenAI._clean_response(body["choices"][0]["message"]["content"])
+
+    def map_results(self, keys):
+        """
+        Returns the results in the order of `keys`, e.g. to assign a DataFrame column:
+        `df["label"] = batch.map_results(df.index)`.
+
+        Parameters:
+        ----------
+        keys : iterable
+            The custom IDs used when queuing the requests.
+
+        Returns:
+        -------
+        list
+            One result (or `None` if missing or failed) per key.
+        """
+        results = self.results()
+        return [results.get(str(key)) for key in keys]
+
+    def run(self, poll_interval=60, timeout=None, completion_window="24h"):
+        """
+        Submits the batches, waits for them and returns the parsed results.
+
+        Returns:
+        -------
+        dict
+            Maps custom_id (str) to the result.
+        """
+        self.submit(completion_window=completion_window)
+        self.wait(poll_interval=poll_interval, timeout=timeout)
+        return self.results()
+
+
+
+class LocalBatchClient:
+    """
+    A local stand-in for the file and batch endpoints of the OpenAI client.
+
+    Batches are processed synchronously when created: each JSONL input line is passed to
+    `handler(endpoint, body)` and the returned response body is written to an output file
+    in the same JSONL format as the Batch API. This lets batch jobs run without network
+    access or API keys.
+    """
+
+    def __init__(self, handler=None, storage_dir="batch_jobs/_local"):
+        """
+        Parameters:
+        ----------
+        handler : callable, optional
+            Function (endpoint, body) -> response body dict. Raise an exception to make a
+            request fail. Defaults to `echo_handler`.
+        storage_dir : str, optional
+            Directory where uploaded and output files are stored.
+        """
+        self.handler = handler if handler is not None else echo_handler
+        self.storage_dir = storage_dir
+        self.files = SimpleNamespace(create=self._create_file, content=self._file_content)
+        self.batches = SimpleNamespace(create=self._create_batch, retrieve=self._retrieve_batch)
+        self._files = {}
+        self._batches = {}
+        os.makedirs(storage_dir, exist_ok=True)
+
+    def _store(self, content):
+        file_id = f"file-{uuid.uuid4().hex[:24]}"
+        path = os.path.join(self.storage_dir, f"{file_id}.jsonl")
+        with open(path, "wb") as f:
+            f.write(content)
+        self._files[file_id] = path
+        return file_id
+
+    def _create_file(self, file, purpose="batch"):
+        content = file.read()
+        if isinstance(content, str):
+            content = content.encode("utf-8")
+        return SimpleNamespace(id=self._store(content), purpose=purpose)
+
+    def _file_content(self, file_id):
+        with open(self._files[file_id], "rb") as f:
+            content = f.read()
+        return SimpleNamespace(text=content.decode("utf-8"), content=content)
+
+    def _create_batch(self, input_file_id, endpoint, completion_window="24h", metadata=None):
+        batch_id = f"batch_{uuid.uuid4().hex[:24]}"
+        outputs, errors = io.StringIO(), io.StringIO()
+        counts = {"total": 0, "completed": 0, "failed": 0}
+
+        for line in self._file_content(input_file_id).text.splitlines():
+            if not line.strip():
+                continue
+            request = json.loads(line)
+            counts["total"] += 1
+            record = {"id": f"batch_req_{uuid.uuid4().hex[:24]}", "custom_id": request["custom_id"]}
+            try:
+                body = self.handler(request["url"], request["body"])
+                record["response"] = {"status_code": 200, "request_id": uuid.uuid4().hex, "body": body}
+                record["error"] = None
+                outputs.write(json.dumps(record) + "\n")
+                counts["completed"] += 1
+            except Exception as e:
+                record["response"] = None
+                record["error"] = {"code": type(e).__name__, "message": str(e)}
+                errors.write(json.dumps(record) + "\n")
+                counts["failed"] += 1
+
+        batch = SimpleNamespace(
+            id=batch_id,
+            endpoint=endpoint,
+            input_file_id=input_file_id,
+            completion_window=completion_window,
+            metadata=metadata,
+            status="completed",
+            output_file_id=self._store(outputs.getvalue().encode("utf-8")) if counts["completed"] else None,
+            error_file_id=self._store(errors.getvalue().encode("utf-8")) if counts["failed"] else None,
+            request_counts=SimpleNamespace(**counts),
+        )
+        self._batches[batch_id] = batch
+        return batch
+
+    def _retrieve_batch(self, batch_id):
+        return self._batches[batch_id]
+
+
+def echo_handler(endpoint, body):
+    """
+    Default `LocalBatchClient` handler. Chat requests are answered with the last message's
+    text and embedding requests with a small deterministic vector.
+    """
+    if endpoint == EMBEDDINGS_ENDPOINT:
+        digest = hashlib.sha256(body["input"].encode("utf-8")).digest()
+        vector = [byte / 255.0 for byte in digest[:8]]
+        return {"object": "list", "data": [{"object": "embedding", "index": 0, "embedding": vector}], "model": body["model"]}
+
+    content = body["messages"][-1]["content"]
+    if isinstance(content, list):
+        content = " ".join(part.get("text", "") for part in content if part.get("type") == "text")
+    return {
+        "object": "chat.completion",
+        "model": body["model"],
+        "choices": [{"index": 0, "message": {"role": "assistant", "content": content}, "finish_reason": "stop"}],
+        "usage": {"prompt_tokens": 0, "completion_tokens": 0, "total_tokens": 0},
+    }
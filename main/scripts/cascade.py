@@ -0,0 +1,262 @@
+import re
+import math
+import time
+import threading
+from types import SimpleNamespace
+from collections import Counter
+from concurrent.futures import ThreadPoolExecutor
+from scripts.genai import GenAI
+
+
+
+class Tier:
+    """
+    One model of a `CascadeRouter`.
+
+    Attributes:
+    ----------
+    name : str
+        Tier name used in the metrics (defaults to the model).
+    model : str or None
+        OpenAI model of the tier. `None` for a local tier (see `predict`).
+    threshold : float or None
+        Minimum confidence (0-1) for an answer to be accepted. `None` accepts every
+        answer, as the last tier does.
+    confidence : str
+        "logprobs": probability of the answer from its token logprobs.
+        "consistency": share of `samples` answers (sampled at `temperature`) that agree
+        with the majority answer. Only meaningful for short answers, e.g. labels.
+    predict : callable, optional
+        Local model: `predict(prompt, instructions)` returns (answer, confidence). Used
+        instead of an API call, e.g. a `SentimentScorer` or a keyword rule.
+    """
+
+    def __init__(self, model=None, threshold=0.9, confidence="logprobs", samples=5, temperature=1.0,
+                 name=None, predict=None, max_tokens=None):
+        if confidence not in ("logprobs", "consistency"):
+            raise ValueError(f"Unknown confidence signal: {confidence}")
+        if model is None and predict is None:
+            raise ValueError("A tier needs a model or a predict function.")
+        self.model = model
+        self.threshold = threshold
+        self.confidence = confidence
+        self.samples = samples
+        self.temperature = temperature
+        self.name = name or model or getattr(predict, "__name__", "local")
+        self.predict = predict
+        self.max_tokens = max_tokens
+
+    def __repr__(self):
+        return f"Tier({self.name!r}, threshold={self.threshold}, confidence={self.confidence!r})"
+
+
+
+class CascadeRouter:
+    """
+    Cheap-first model cascade for high-volume classification and generation.
+
+    Each item is sent to the first tier. Its answer is accepted when its confidence
+    reaches the tier's threshold; otherwise the item escalates to the next tier. The last
+    tier (threshold `None`) accepts every answer, so only uncertain items reach the large
+    model. A failed call also escalates.
+
+    API calls go through `GenAI.chat_completion` under the name "cascade.<tier>", so the
+    latency and cost of each tier also appear in `metrics.summary()`. `report()` adds the
+    acceptance and escalation rates used to tune the thresholds.
+
+    Example:
+    -------
+    >>> router = CascadeRouter(jarvis, [Tier("gpt-4o-mini", threshold=0.95), Tier("gpt-4o", threshold=None)])
+    >>> df = router.classify_dataframe(df_complaints, "text", instructions, labels=["billing", "outage", "other"])
+    >>> router.report()
+
+    Attributes:
+    ----------
+    genai : GenAI
+        Client used for the API tiers.
+    tiers : list of Tier
+        Tiers in the order they are tried.
+    """
+
+    def __init__(self, genai, tiers=None, max_workers=8):
+        """
+        Parameters:
+        ----------
+        genai : GenAI
+            Client used for the API tiers. Its metrics registry prices the calls.
+        tiers : list of Tier, optional
+            Defaults to gpt-4o-mini (logprobs, threshold 0.9) then gpt-4o.
+        max_workers : int, optional (default=8)
+            Threads used by `route_many` and `classify_dataframe`.
+        """
+        self.genai = genai
+        self.tiers = tiers or [Tier("gpt-4o-mini", threshold=0.9), Tier("gpt-4o", threshold=None)]
+        self.max_workers = max_workers
+        self._lock = threading.Lock()
+        self.reset_stats()
+
+    def reset_stats(self):
+        """Clears the per-tier counters of `report`."""
+        with self._lock:
+            self.stats = {tier.name: {"calls": 0, "accepted": 0, "escalated": 0, "errors": 0,
+                                      "total_s": 0.0, "cost_usd": 0.0} for tier in self.tiers}
+
+    @staticmethod
+    def _normalize(answer):
+        return re.sub(r"[^\w\s-]", "", answer).strip().lower()
+
+    @classmethod
+    def match_label(cls, answer, labels):
+        """Label matching the answer (ignoring case and punctuation), or None."""
+        normalized = cls._normalize(answer)
+        for label in labels:
+            if cls._normalize(label) == normalized:
+                return label
+        return None
+
+    def _ask(self, tier, prompt, instructions, labels):
+        """Asks one tier. Returns (answer, confidence, usage)."""
+        if tier.predict is not None:
+            answer, confidence = tier.predict(prompt, instructions)
+            return answer, confidence, None
+
+        messages, _ = self.genai.prompt_layout.build(prompt, instructions)
+        params = {"max_tokens": tier.max_tokens} if tier.max_tokens else {}
+        if tier.confidence == "logprobs":
+            params.update(logprobs=True, temperature=0)
+        else:
+            params.update(n=tier.samples, temperature=tier.temperature)
+        completion = self.genai.chat_completion(messages, tier.model, name=f"cascade.{tier.name}", **params)
+
+        answers = [GenAI._clean_response(choice.message.content or "").strip() for choice in completion.choices]
+        if labels is not None:
+            answers = [self.match_label(answer, labels) for answer in answers]
+
+        if tier.confidence == "logprobs":
+            answer = answers[0]
+            tokens = getattr(completion.choices[0].logprobs, "content", None) or []
+            # Probability of the whole answer for labels, mean per-token probability for free text
+            total = sum(token.logprob for token in tokens)
+            confidence = math.exp(total if labels is not None else total / max(1, len(tokens))) if tokens else 0.0
+        else:
+            votes = Counter(answer for answer in answers if answer is not None)
+            answer, count = votes.most_common(1)[0] if votes else (None, 0)
+            confidence = count / len(answers)
+        if answer is None:
+            confidence = 0.0  # not one of the labels
+        return answer, confidence, completion.usage
+
+    def route(self, prompt, instructions='You are a helpful AI named Jarvis', labels=None):
+        """
+        Answers one item with the cheapest tier that is confident enough.
+
+        Parameters:
+        ----------
+        prompt : str
+            The item, e.g. the text of a tweet.
+        instructions : str, optional
+            System instructions, the same for every tier.
+        labels : list of str, optional
+            For classification: the allowed answers. The instructions are extended to ask
+            for exactly one of them, and an answer outside the list has confidence 0.
+
+        Returns:
+        -------
+        dict
+            answer, tier (name of the accepting tier), model, confidence and escalations
+            (number of tiers that passed the item on).
+        """
+        if labels is not None:
+            instructions = f"{instructions}\nAnswer with exactly one of: {', '.join(labels)}."
+        answer, confidence = None, 0.0
+        for level, tier in enumerate(self.tiers):
+            last = level == len(self.tiers) - 1
+            tstart = time.perf_counter()
+            try:
+                answer, confidence, usage = self._ask(tier, prompt, instructions, labels)
+                error = False
+            except Exception as e:
+                print(f"⚠️ Cascade tier '{tier.name}' failed: {e}")
+                answer, confidence, usage, error = None, 0.0, None, True
+            duration = time.perf_counter() - tstart
+            accepted = not error and (tier.threshold is None or confidence >= tier.threshold)
+            self._record(tier, duration, usage, accepted, error, last)
+            if accepted:
+                return {"answer": answer, "tier": tier.name, "model": tier.model,
+                        "confidence": confidence, "escalations": level}
+        return {"answer": answer, "tier": None, "model": None, "confidence": confidence,
+                "escalations": len(self.tiers) - 1}
+
+    def _record(self, tier, duration, usage, accepted, error, last):
+        cost = 0.0
+        if usage is not None:
+            record = SimpleNamespace(model=tier.model, prompt_tokens=getattr(usage, "prompt_tokens", 0) or 0,
+                                     completion_tokens=getattr(usage, "completion_tokens", 0) or 0)
+            cost = self.genai.metrics.cost(record)
+        with self._lock:
+            stats = self.stats.setdefault(tier.name, {"calls": 0, "accepted": 0, "escalated": 0, "errors": 0,
+                                                      "total_s": 0.0, "cost_usd": 0.0})
+            stats["calls"] += 1
+            stats["accepted"] += accepted
+            stats["escalated"] += not accepted and not last
+            stats["errors"] += error
+            stats["total_s"] += duration
+            stats["cost_usd"] += cost
+
+    def route_many(self, prompts, instructions='You are a helpful AI named Jarvis', labels=None, max_workers=None):
+        """
+        Routes many items on a thread pool.
+
+        Returns:
+        -------
+        list of dict
+            The `route` result of each prompt, in order.
+        """
+        with ThreadPoolExecutor(max_workers=max_workers or self.max_workers) as executor:
+            return list(executor.map(lambda prompt: self.route(prompt, instructions, labels), prompts))
+
+    def classify_dataframe(self, df, text_column, instructions, labels=None, output_column="label", max_workers=None):
+        """
+        Routes every row of `df` (e.g. the complaints of `data/tweet_complaints_att.csv`).
+
+        Returns:
+        -------
+        pd.DataFrame
+            A copy of `df` with `output_column`, "tier" and "confidence" columns.
+        """
+        results = self.route_many(df[text_column].astype(str).tolist(), instructions, labels, max_workers)
+        df = df.copy()
+        df[output_column] = [result["answer"] for result in results]
+        df["tier"] = [result["tier"] for result in results]
+        df["confidence"] = [result["confidence"] for result in results]
+        return df
+
+    def report(self):
+        """
+        Per-tier counters since the last `reset_stats`.
+
+        Returns:
+        -------
+        pd.DataFrame
+            One row per tier: calls, accepted, escalated, errors, acceptance_rate,
+            escalation_rate, mean_s, cost_usd and cost_per_call_usd. The last row ("total")
+            sums the tiers; its `cost_per_call_usd` is the cost per item routed.
+        """
+        import pandas as pd
+
+        with self._lock:
+            df = pd.DataFrame([dict(tier=name, **stats) for name, stats in self.stats.items()])
+        if df.empty:
+            return df
+        items = df["calls"].iloc[0]
+        total = df.sum(numeric_only=True)
+        total["tier"] = "total"
+        df = pd.concat([df, total.to_frame().T], ignore_index=True)
+        calls = df["calls"].astype(float).where(df["calls"] > 0)
+        df["acceptance_rate"] = df["accepted"] / calls
+        df["escalation_rate"] = df["escalated"] / calls
+        df["mean_s"] = df["total_s"] / calls
+        df["cost_per_call_usd"] = df["cost_usd"] / calls
+        if items:
+            df.loc[df["tier"] == "total", "cost_per_call_usd"] = total["cost_usd"] / items
+        return df
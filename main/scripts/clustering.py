@@ -0,0 +1,241 @@
+import os
+import numpy as np
+import pandas as pd
+from tqdm.auto import tqdm  # Ensures compatibility in Jupyter and Colab
+
+
+
+def embeddings_to_npy(embeddings, file_path, dtype=np.float32):
+    """
+    Writes a column of embedding vectors (e.g. lists returned by `GenAI.get_embedding`)
+    to a .npy file that can be memory-mapped with `load_embeddings`.
+
+    Parameters:
+    ----------
+    embeddings : pd.Series or list of list of float
+        The embedding vectors. All vectors must have the same length.
+    file_path : str
+        Output .npy path.
+    dtype : numpy dtype, optional (default=np.float32)
+        Storage dtype. float32 halves the size of the default float64.
+
+    Returns:
+    -------
+    str
+        The path of the written file.
+    """
+    embeddings = list(embeddings)
+    dim = len(embeddings[0]) if embeddings else 0
+    os.makedirs(os.path.dirname(os.path.abspath(file_path)), exist_ok=True)
+    array = np.lib.format.open_memmap(file_path, mode="w+", dtype=dtype, shape=(len(embeddings), dim))
+    for i, vector in enumerate(embeddings):
+        array[i] = vector
+    array.flush()
+    return file_path
+
+
+def load_embeddings(file_path):
+    """
+    Memory-maps a .npy embedding matrix so it can be processed in chunks without
+    loading it into RAM.
+
+    Parameters:
+    ----------
+    file_path : str
+        Path to the .npy file.
+
+    Returns:
+    -------
+    np.memmap
+        Read-only (n_items x dim) array.
+    """
+    return np.load(file_path, mmap_mode="r")
+
+
+
+class EmbeddingClusterer:
+    """
+    Scalable clustering of embedding vectors with incremental PCA and mini-batch k-means.
+
+    Both models are fitted with `partial_fit` over chunks of a (possibly memory-mapped)
+    embedding matrix, so the full matrix never has to fit in memory. Chunks are visited in
+    a random order for several epochs, and the k-means centers are initialized from rows
+    sampled across the whole matrix, so data stored in order (e.g. one account's tweets
+    after another's) does not bias the clusters toward the first chunk. Labels for new items
+    come from `predict` without refitting, and `update` folds new items into the cluster
+    centers. Fitted models are saved with `save` and restored with `load`, so a daily
+    refresh only has to transform and assign the new embeddings.
+
+    Attributes:
+    ----------
+    pca : sklearn.decomposition.IncrementalPCA
+        Dimensionality reduction applied before clustering.
+    kmeans : sklearn.cluster.MiniBatchKMeans
+        The clustering model.
+    """
+
+    def __init__(self, n_clusters=10, n_components=50, chunk_size=10_000, random_state=0, n_epochs=3):
+        """
+        Initializes the clusterer.
+
+        Parameters:
+        ----------
+        n_clusters : int, optional (default=10)
+            Number of k-means clusters.
+        n_components : int, optional (default=50)
+            Number of PCA components used for clustering. The first two are also returned
+            as `pca_x` and `pca_y` for plotting.
+        chunk_size : int, optional (default=10_000)
+            Number of rows processed at a time. Must be at least `n_components` and `n_clusters`.
+        random_state : int, optional (default=0)
+            Seed for reproducible clusters.
+        n_epochs : int, optional (default=3)
+            Number of passes of mini-batch k-means over the chunks.
+        """
+        from sklearn.cluster import MiniBatchKMeans
+        from sklearn.decomposition import IncrementalPCA
+
+        self.n_clusters = n_clusters
+        self.n_components = n_components
+        self.chunk_size = max(chunk_size, n_components, n_clusters)
+        self.random_state = random_state
+        self.n_epochs = n_epochs
+        self.pca = IncrementalPCA(n_components=n_components)
+        self.kmeans = MiniBatchKMeans(n_clusters=n_clusters, random_state=random_state, n_init=3)
+
+    def _chunk_bounds(self, n):
+        bounds = []
+        for start in range(0, n, self.chunk_size):
+            end = min(start + self.chunk_size, n)
+            # Merge a short final chunk into the previous one so partial_fit always
+            # sees at least n_components rows
+            if n - end < max(self.n_components, self.n_clusters) and end < n:
+                bounds.append((start, n))
+                break
+            bounds.append((start, end))
+        return bounds
+
+    def _chunks(self, X, desc=None, verbose=False, rng=None):
+        """Contiguous chunks of `X`, in a random order if `rng` is given."""
+        bounds = self._chunk_bounds(X.shape[0])
+        if rng is not None:
+            bounds = [bounds[i] for i in rng.permutation(len(bounds))]
+        for start, end in tqdm(bounds, desc=desc, unit="chunk", disable=not verbose):
+            yield np.asarray(X[start:end], dtype=np.float32)
+
+    def _sample_rows(self, X, rng):
+        """Up to `chunk_size` rows drawn uniformly from all of `X` (sorted for memmap reads)."""
+        n = X.shape[0]
+        rows = np.sort(rng.choice(n, size=min(n, self.chunk_size), replace=False))
+        return np.asarray(X[rows], dtype=np.float32)
+
+    def fit(self, X, verbose=False):
+        """
+        Fits incremental PCA and then mini-batch k-means over chunks of `X`.
+
+        Parameters:
+        ----------
+        X : np.ndarray or np.memmap
+            (n_items x dim) embedding matrix, e.g. from `load_embeddings`.
+        verbose : bool, optional (default=False)
+            Whether to show progress bars.
+
+        Returns:
+        -------
+        EmbeddingClusterer
+            The fitted clusterer.
+        """
+        rng = np.random.default_rng(self.random_state)
+        for chunk in self._chunks(X, "Fitting PCA", verbose, rng):
+            self.pca.partial_fit(chunk)
+        # The first partial_fit places the centers (k-means++), so it gets a sample of all rows
+        self.kmeans.partial_fit(self.pca.transform(self._sample_rows(X, rng)))
+        for epoch in range(self.n_epochs):
+            for chunk in self._chunks(X, f"Fitting k-means (epoch {epoch + 1})", verbose, rng):
+                self.kmeans.partial_fit(self.pca.transform(chunk))
+        return self
+
+    def update(self, X_new, verbose=False):
+        """
+        Updates the cluster centers with new items. The PCA projection is kept fixed so
+        that existing coordinates and labels stay comparable.
+
+        Parameters:
+        ----------
+        X_new : np.ndarray or np.memmap
+            (n_new x dim) embedding matrix of new items.
+        verbose : bool, optional (default=False)
+            Whether to show a progress bar.
+
+        Returns:
+        -------
+        EmbeddingClusterer
+            The updated clusterer.
+        """
+        for chunk in self._chunks(X_new, "Updating k-means", verbose):
+            self.kmeans.partial_fit(self.pca.transform(chunk))
+        return self
+
+    def predict(self, X, verbose=False):
+        """
+        Projects items with the fitted PCA and assigns them to the nearest cluster.
+
+        Parameters:
+        ----------
+        X : np.ndarray or np.memmap
+            (n_items x dim) embedding matrix.
+        verbose : bool, optional (default=False)
+            Whether to show a progress bar.
+
+        Returns:
+        -------
+        pd.DataFrame
+            Columns ["pca_x", "pca_y", "kmeans_label"], one row per item.
+        """
+        coords = []
+        labels = []
+        for chunk in self._chunks(X, "Assigning clusters", verbose):
+            reduced = self.pca.transform(chunk)
+            coords.append(reduced[:, :2])
+            labels.append(self.kmeans.predict(reduced))
+        if not coords:
+            return pd.DataFrame(columns=["pca_x", "pca_y", "kmeans_label"])
+        coords = np.vstack(coords)
+        return pd.DataFrame({
+            "pca_x": coords[:, 0],
+            "pca_y": coords[:, 1] if coords.shape[1] > 1 else 0.0,
+            "kmeans_label": np.concatenate(labels),
+        })
+
+    def save(self, file_path):
+        """
+        Saves the fitted models to disk.
+
+        Parameters:
+        ----------
+        file_path : str
+            Output path, e.g. "data/models/tweet_clusters.joblib".
+        """
+        import joblib
+
+        os.makedirs(os.path.dirname(os.path.abspath(file_path)), exist_ok=True)
+        joblib.dump(self, file_path)
+
+    @classmethod
+    def load(cls, file_path):
+        """
+        Loads a clusterer saved with `save`.
+
+        Parameters:
+        ----------
+        file_path : str
+            Path of the saved clusterer.
+
+        Returns:
+        -------
+        EmbeddingClusterer
+            The fitted clusterer.
+        """
+        import joblib
+
+        return joblib.load(file_path)
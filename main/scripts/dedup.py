@@ -0,0 +1,338 @@
+import re
+import zlib
+import numpy as np
+from concurrent.futures import ThreadPoolExecutor
+from scripts.textclean import TextCleaner
+
+# Pillow and scipy are imported inside the image hashing methods.
+
+
+# MinHash permutations are h -> (a * h + b) mod MINHASH_PRIME on 32-bit shingle hashes,
+# which stays below 2**64 so it can be computed in uint64 NumPy arrays.
+MINHASH_PRIME = 4294967311
+RETWEET_PATTERN = re.compile(r"^rt\s*:?\s*")
+
+
+def fan_out(items, labels, fn, max_workers=8):
+    """
+    Calls `fn` once per cluster, on its representative, and returns the result for every item.
+
+    Parameters:
+    ----------
+    items : list
+        The items (texts, image paths, ...).
+    labels : array-like of int
+        For each item, the index of its cluster representative (see `cluster` methods).
+    fn : callable
+        Function of one item, e.g. `lambda text: jarvis.generate_text(text, instructions)`.
+    max_workers : int, optional (default=8)
+        Number of representatives processed concurrently.
+
+    Returns:
+    -------
+    list
+        `fn(items[labels[i]])` for each item i.
+    """
+    representatives = sorted(set(int(label) for label in labels))
+    with ThreadPoolExecutor(max_workers=max_workers) as executor:
+        results = dict(zip(representatives, executor.map(lambda i: fn(items[i]), representatives)))
+    return [results[int(label)] for label in labels]
+
+
+def cluster_sizes(labels):
+    """Counts of items, clusters and saved calls of a clustering."""
+    clusters = len(set(int(label) for label in labels))
+    return {"items": len(labels), "clusters": clusters, "calls_saved": len(labels) - clusters}
+
+
+class _UnionFind:
+    def __init__(self, n):
+        self.parent = np.arange(n)
+
+    def find(self, i):
+        root = i
+        while self.parent[root] != root:
+            root = self.parent[root]
+        while self.parent[i] != root:
+            self.parent[i], i = root, self.parent[i]
+        return root
+
+    def union(self, i, j):
+        ri, rj = self.find(i), self.find(j)
+        if ri != rj:
+            # The smallest index stays the root, so the first occurrence represents a cluster
+            self.parent[max(ri, rj)] = min(ri, rj)
+
+    def labels(self):
+        return np.array([self.find(i) for i in range(len(self.parent))], dtype=np.int64)
+
+
+
+class TextDeduplicator:
+    """
+    Near-duplicate clustering of short texts (tweets, replies) with MinHash and LSH.
+
+    Texts are normalized (URLs, mentions and a leading "RT" removed, lowercased), split
+    into character shingles and summarized by a MinHash signature whose agreement rate
+    estimates the Jaccard similarity of two texts. Signatures are cut into bands and hashed
+    into buckets; only texts sharing a bucket are compared, so clustering takes roughly
+    linear time instead of comparing every pair. Exact duplicates (retweets) are merged
+    before hashing.
+
+    Example:
+    -------
+    >>> dedup = TextDeduplicator(threshold=0.8)
+    >>> labels = dedup.cluster(df["text"])
+    >>> df["reply"] = fan_out(df["text"].tolist(), labels, lambda text: jarvis.generate_text(text, instructions))
+
+    Attributes:
+    ----------
+    threshold : float
+        Minimum estimated Jaccard similarity of near-duplicates.
+    num_perm : int
+        Length of the MinHash signatures.
+    bands : int
+        Number of LSH bands (chosen from `threshold` if not given).
+    shingle_size : int
+        Characters per shingle.
+    """
+
+    def __init__(self, threshold=0.8, num_perm=128, bands=None, shingle_size=5, seed=0):
+        self.threshold = threshold
+        self.num_perm = num_perm
+        self.bands = bands or self._choose_bands(num_perm, threshold)
+        self.rows = num_perm // self.bands
+        self.shingle_size = shingle_size
+        rng = np.random.default_rng(seed)
+        self._a = rng.integers(1, 2 ** 32, num_perm, dtype=np.uint64)
+        self._b = rng.integers(0, 2 ** 32, num_perm, dtype=np.uint64)
+        self._cleaner = TextCleaner(urls=True, mentions=True, whitespace=True)
+
+    @staticmethod
+    def _choose_bands(num_perm, threshold):
+        """
+        Number of bands whose LSH threshold (1 / bands) ** (1 / rows) is closest to, and
+        not above, `threshold`, so near-duplicates are rarely missed.
+        """
+        options = [b for b in range(1, num_perm + 1) if num_perm % b == 0]
+        below = [b for b in options if (1 / b) ** (b / num_perm) <= threshold] or options
+        return min(below, key=lambda b: threshold - (1 / b) ** (b / num_perm))
+
+    def normalize(self, texts):
+        """Normalized texts used for shingling."""
+        cleaned = self._cleaner.clean(list(texts)).fillna("").str.lower()
+        return [RETWEET_PATTERN.sub("", text) for text in cleaned]
+
+    def _shingle_hashes(self, text):
+        k = self.shingle_size
+        shingles = {text[i:i + k] for i in range(max(1, len(text) - k + 1))}
+        return np.fromiter((zlib.crc32(s.encode("utf-8")) for s in shingles), dtype=np.uint64, count=len(shingles))
+
+    def signatures(self, texts):
+        """
+        MinHash signatures of normalized texts.
+
+        Returns:
+        -------
+        np.ndarray
+            (len(texts), num_perm) uint64 matrix.
+        """
+        signatures = np.empty((len(texts), self.num_perm), dtype=np.uint64)
+        for i, text in enumerate(texts):
+            hashes = self._shingle_hashes(text)
+            signatures[i] = ((hashes[:, None] * self._a + self._b) % np.uint64(MINHASH_PRIME)).min(axis=0)
+        return signatures
+
+    def cluster(self, texts):
+        """
+        Clusters near-duplicate texts.
+
+        Parameters:
+        ----------
+        texts : list of str or pd.Series
+            The texts.
+
+        Returns:
+        -------
+        np.ndarray
+            For each text, the position of its cluster representative (its first
+            occurrence), e.g. `labels[i] == i` for texts that have no earlier duplicate.
+            Texts shorter than `shingle_size` once normalized (e.g. URL-only or
+            mention-only tweets) carry no content to compare and stay singletons.
+        """
+        normalized = self.normalize(texts)
+        # Exact duplicates after normalization are merged without hashing
+        first = {}
+        unique = []
+        uf = _UnionFind(len(normalized))
+        for i, text in enumerate(normalized):
+            if len(text.strip()) < self.shingle_size:
+                continue
+            if text not in first:
+                first[text] = i
+                unique.append(i)
+            uf.union(first[text], i)
+        if not unique:
+            return uf.labels()
+
+        signatures = self.signatures([normalized[i] for i in unique])
+        for band in range(self.bands):
+            buckets = {}
+            band_slice = signatures[:, band * self.rows:(band + 1) * self.rows]
+            for position, key in enumerate(map(bytes, band_slice)):
+                buckets.setdefault(key, []).append(position)
+            for members in buckets.values():
+                # Members are compared with the first one only: other bands link the rest
+                head = members[0]
+                for position in members[1:]:
+                    if np.mean(signatures[head] == signatures[position]) >= self.threshold:
+                        uf.union(unique[head], unique[position])
+        return uf.labels()
+
+    def apply(self, texts, fn, max_workers=8):
+        """`fn` applied to one text per near-duplicate cluster and fanned out to all (see `fan_out`)."""
+        texts = list(texts)
+        return fan_out(texts, self.cluster(texts), fn, max_workers)
+
+
+
+class BKTree:
+    """
+    Burkhard-Keller tree of integer hashes under the Hamming distance. `search` only
+    visits the subtrees that can contain a hash within the radius.
+    """
+
+    def __init__(self):
+        self.root = None
+        self.size = 0
+
+    @staticmethod
+    def distance(a, b):
+        return bin(a ^ b).count("1")
+
+    def add(self, key, value):
+        node = [key, value, {}]
+        self.size += 1
+        if self.root is None:
+            self.root = node
+            return
+        current = self.root
+        while True:
+            d = self.distance(key, current[0])
+            child = current[2].get(d)
+            if child is None:
+                current[2][d] = node
+                return
+            current = child
+
+    def search(self, key, radius):
+        """
+        Returns:
+        -------
+        list of tuple
+            (distance, value) of every entry within `radius` of `key`, closest first.
+        """
+        if self.root is None:
+            return []
+        matches = []
+        stack = [self.root]
+        while stack:
+            node_key, value, children = stack.pop()
+            d = self.distance(key, node_key)
+            if d <= radius:
+                matches.append((d, value))
+            stack.extend(child for dist, child in children.items() if d - radius <= dist <= d + radius)
+        return sorted(matches, key=lambda match: match[0])
+
+
+
+class ImageDeduplicator:
+    """
+    Near-duplicate clustering of images (e.g. `data/image_compressed_*`) with perceptual
+    hashes and a BK-tree.
+
+    Each image is reduced to a 64-bit (for `hash_size=8`) difference or DCT hash that
+    changes little under resizing, recompression or small edits. Images are visited in
+    order; an image within `max_distance` bits of an earlier representative joins its
+    cluster, otherwise it becomes a representative. The BK-tree of representatives makes
+    each lookup sub-linear.
+
+    Attributes:
+    ----------
+    max_distance : int
+        Maximum Hamming distance between near-duplicate hashes.
+    hash_size : int
+        The hash has hash_size ** 2 bits.
+    method : str
+        "dhash" (difference hash) or "phash" (DCT hash, more robust, needs scipy).
+    """
+
+    def __init__(self, max_distance=6, hash_size=8, method="dhash", max_workers=8):
+        if method not in ("dhash", "phash"):
+            raise ValueError(f"Unknown hash method: {method}")
+        self.max_distance = max_distance
+        self.hash_size = hash_size
+        self.method = method
+        self.max_workers = max_workers
+
+    @staticmethod
+    def _bits_to_int(bits):
+        return int("".join("1" if bit else "0" for bit in bits.flatten()), 2)
+
+    def hash_image(self, image_path):
+        """Perceptual hash of an image file as an int."""
+        from PIL import Image
+
+        with Image.open(image_path) as image:
+            gray = image.convert("L")
+            if self.method == "dhash":
+                pixels = np.asarray(gray.resize((self.hash_size + 1, self.hash_size), Image.LANCZOS), dtype=np.int16)
+                return self._bits_to_int(pixels[:, 1:] > pixels[:, :-1])
+            from scipy.fft import dct
+
+            size = self.hash_size * 4
+            pixels = np.asarray(gray.resize((size, size), Image.LANCZOS), dtype=np.float64)
+        coefficients = dct(dct(pixels, axis=0, norm="ortho"), axis=1, norm="ortho")[:self.hash_size, :self.hash_size]
+        return self._bits_to_int(coefficients > np.median(coefficients.flatten()[1:]))
+
+    def _safe_hash(self, image_path):
+        try:
+            return self.hash_image(image_path)
+        except Exception as e:
+            print(f"⚠️ Could not hash {image_path}: {e}")
+            return None
+
+    def hashes(self, image_paths):
+        """Hashes of the images, computed on a thread pool (None for unreadable images)."""
+        with ThreadPoolExecutor(max_workers=self.max_workers) as executor:
+            return list(executor.map(self._safe_hash, image_paths))
+
+    def cluster(self, image_paths):
+        """
+        Clusters near-duplicate images.
+
+        Returns:
+        -------
+        np.ndarray
+            For each image, the position of its cluster representative. Unreadable images
+            are their own representative.
+        """
+        tree = BKTree()
+        labels = np.arange(len(image_paths))
+        for i, image_hash in enumerate(self.hashes(image_paths)):
+            if image_hash is None:
+                continue
+            matches = tree.search(image_hash, self.max_distance)
+            if matches:
+                labels[i] = matches[0][1]
+            else:
+                tree.add(image_hash, i)
+        return labels
+
+    def apply(self, image_paths, fn, max_workers=8):
+        """
+        `fn` applied to one image per near-duplicate cluster and fanned out to all, e.g.
+        `lambda path: jarvis.generate_image_description(path, instructions)`.
+        """
+        image_paths = list(image_paths)
+        return fan_out(image_paths, self.cluster(image_paths), fn, max_workers)
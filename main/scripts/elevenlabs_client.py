@@ -1,7 +1,10 @@
 import requests
 import time
+import json
+import httpx
 from datetime import datetime
 from elevenlabs import ElevenLabs
+from scripts.instrumentation import default_registry, http_event_hooks
 
 class ElevenLabsAPI:
     """
@@ -13,16 +16,22 @@ class ElevenLabsAPI:
     - Retrieve past conversations and filter them
     """
 
-    def __init__(self, api_key):
+    def __init__(self, api_key, metrics=None, base_url="https://api.elevenlabs.io"):
         """
         Initialize the ElevenLabs API client.
 
         Args:
             api_key (str): The ElevenLabs API key for authentication.
+            metrics (MetricsRegistry, optional): Registry that records the latency and payload
+                size of every API call. Defaults to the shared registry in scripts.instrumentation.
+            base_url (str, optional): API host, e.g. the local mock server in
+                benchmarks/mock_server.py. Defaults to the ElevenLabs API.
         """
         self.api_key = api_key
-        self.base_url = "https://api.elevenlabs.io/v1/convai"
-        self.client = ElevenLabs(api_key = api_key)
+        self.base_url = f"{base_url.rstrip('/')}/v1/convai"
+        self.metrics = metrics if metrics is not None else default_registry
+        # The event hooks attribute request bytes and retries to the call being tracked
+        self.client = ElevenLabs(api_key = api_key, base_url=base_url, httpx_client=httpx.Client(event_hooks=http_event_hooks()))
         self.AGENT_IDS_PROTECTED = []
 
     def get_agents(self):
@@ -32,7 +41,8 @@ class ElevenLabsAPI:
         Returns:
             list: A list of agent dictionaries containing "agent_id" and "name".
         """
-        agents = self.client.conversational_ai.get_agents().agents
+        with self.metrics.track(type(self).__name__, "convai.get_agents"):
+            agents = self.client.conversational_ai.get_agents().agents
         agents = [agent for agent in agents if agent.agent_id not in self.AGENT_IDS_PROTECTED ]
         #agents =  [agent for agent in agents ]
         return agents
@@ -54,7 +64,8 @@ class ElevenLabsAPI:
         """
 
         try:
-            agent = self.client.conversational_ai.get_agent(agent_id)
+            with self.metrics.track(type(self).__name__, "convai.get_agent"):
+                agent = self.client.conversational_ai.get_agent(agent_id)
 
             return agent
 
@@ -128,7 +139,13 @@ class ElevenLabsAPI:
 
         # Perform the PATCH request
         #print(f"Payload: {payload}")
-        response = requests.patch(url, json=payload, headers=headers)
+        with self.metrics.track(type(self).__name__, "convai.update_agent") as call:
+            call.request_bytes = len(json.dumps(payload).encode("utf-8"))
+            call.attempts = 1
+            response = requests.patch(url, json=payload, headers=headers)
+            call.response_bytes = len(response.content)
+            if response.status_code != 200:
+                call.status = "error"
         return response.status_code == 200
 
 
@@ -149,10 +166,11 @@ class ElevenLabsAPI:
 
         while has_more:
             # Make API call with or without cursor
-            if cursor:
-                response = self.client.conversational_ai.get_conversations(agent_id=agent_id, cursor=cursor)
-            else:
-                response = self.client.conversational_ai.get_conversations(agent_id=agent_id)
+            with self.metrics.track(type(self).__name__, "convai.get_conversations"):
+                if cursor:
+                    response = self.client.conversational_ai.get_conversations(agent_id=agent_id, cursor=cursor)
+                else:
+                    response = self.client.conversational_ai.get_conversations(agent_id=agent_id)
 
             # Append retrieved conversations
             all_conversations.extend(response.conversations)
@@ -176,7 +194,8 @@ class ElevenLabsAPI:
         Returns:
             dict: The conversation details.
         """
-        response = self.client.conversational_ai.get_conversation(conversation_id)
+        with self.metrics.track(type(self).__name__, "convai.get_conversation"):
+            response = self.client.conversational_ai.get_conversation(conversation_id)
         return response
     def get_most_recent_conversation(self, agent_id):
         """
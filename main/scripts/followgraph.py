@@ -0,0 +1,340 @@
+import os
+import re
+import glob
+import numpy as np
+import pandas as pd
+import scipy.sparse as sp
+
+
+
+# TwFollow_{screen_name}_following[_{suffix}].csv (screen names may contain underscores)
+FILENAME_PATTERN = re.compile(r"TwFollow_(?P<screen_name>.+?)_following(?:_.*)?\.csv$")
+
+
+
+class FollowGraph:
+    """
+    A sparse directed "follows" graph built from TwFollow exports (`data/TwFollow/*_following.csv`).
+
+    Every account is mapped to a dense integer ID and edges are stored as a SciPy CSR
+    matrix, where row i holds the accounts followed by account i. Overlap, Jaccard,
+    co-following counts, degrees and PageRank are computed with sparse matrix operations
+    rather than per-node Python loops, and new exports can be merged in incrementally.
+
+    Accounts are keyed by their `userId`. An account that is only known as the owner of
+    an export (TwFollow files list who an account follows, not its own userId) is keyed
+    as "@screen_name" until its userId shows up in another export.
+
+    Attributes:
+    ----------
+    node_ids : dict
+        Maps account key (userId or "@screen_name") to dense integer ID.
+    usernames : list of str
+        Username of each node, indexed by dense ID.
+    """
+
+    def __init__(self):
+        """
+        Initializes an empty graph.
+        """
+        self.node_ids = {}
+        self.usernames = []
+        self.names = []
+        self.followers_counts = []
+        self._username_index = {}   # lower-case username -> dense ID
+        self._following = {}        # source dense ID -> np.ndarray of target dense IDs
+        self._source_mtimes = {}    # export path -> mtime when merged
+        self._adjacency = None
+
+    @property
+    def num_nodes(self):
+        return len(self.usernames)
+
+    @staticmethod
+    def parse_filename(file_path):
+        """
+        Extracts the screen name of the account that owns a TwFollow export.
+
+        Parameters:
+        ----------
+        file_path : str
+            Path to a TwFollow CSV export.
+
+        Returns:
+        -------
+        str or None
+            The screen name, or `None` if the file name does not match.
+        """
+        match = FILENAME_PATTERN.search(os.path.basename(file_path))
+        return match.group("screen_name") if match else None
+
+    def _add_node(self, key, username, name=None, followers_count=None):
+        username_lower = username.lower() if isinstance(username, str) else None
+
+        # Promote a placeholder "@screen_name" node once its real userId is known
+        if key not in self.node_ids and username_lower and f"@{username_lower}" in self.node_ids:
+            node = self.node_ids.pop(f"@{username_lower}")
+            self.node_ids[key] = node
+
+        if key in self.node_ids:
+            node = self.node_ids[key]
+            if name is not None:
+                self.names[node] = name
+            if followers_count is not None:
+                self.followers_counts[node] = followers_count
+            return node
+
+        node = len(self.usernames)
+        self.node_ids[key] = node
+        self.usernames.append(username)
+        self.names.append(name)
+        self.followers_counts.append(followers_count)
+        if username_lower:
+            self._username_index[username_lower] = node
+        return node
+
+    def _source_node(self, screen_name):
+        node = self._username_index.get(screen_name.lower())
+        if node is not None:
+            return node
+        return self._add_node(f"@{screen_name.lower()}", screen_name)
+
+    def add_following(self, screen_name, df_following):
+        """
+        Adds (or replaces) the following list of one account.
+
+        Parameters:
+        ----------
+        screen_name : str
+            Screen name of the account whose following list this is.
+        df_following : pd.DataFrame
+            A TwFollow export with at least the columns "userId" and "username".
+
+        Returns:
+        -------
+        int
+            Dense ID of the source account.
+        """
+        source = self._source_node(screen_name)
+
+        user_ids = df_following["userId"].astype(str).str.strip("'\" ")
+        usernames = df_following["username"].tolist()
+        names = df_following["name"].tolist() if "name" in df_following.columns else [None] * len(df_following)
+        followers = (df_following["followers_count"].tolist() if "followers_count" in df_following.columns
+                     else [None] * len(df_following))
+
+        targets = np.fromiter(
+            (self._add_node(uid, uname, name, fc) for uid, uname, name, fc in zip(user_ids, usernames, names, followers)),
+            dtype=np.int64,
+            count=len(df_following),
+        )
+        self._following[source] = np.unique(targets)
+        self._adjacency = None
+        return source
+
+    def read_following(self, file_path):
+        """
+        Reads one TwFollow export and merges it into the graph.
+
+        Parameters:
+        ----------
+        file_path : str
+            Path to the CSV export.
+
+        Returns:
+        -------
+        int
+            Dense ID of the account that owns the export.
+        """
+        screen_name = self.parse_filename(file_path)
+        if screen_name is None:
+            raise ValueError(f"❌ Error: '{file_path}' is not a TwFollow following export.")
+        df = pd.read_csv(file_path, encoding="utf-8-sig", dtype={"userId": "string", "username": "string"})
+        source = self.add_following(screen_name, df)
+        self._source_mtimes[os.path.abspath(file_path)] = os.path.getmtime(file_path)
+        return source
+
+    def merge_directory(self, directory="data/TwFollow", pattern="TwFollow_*_following*.csv", verbose=False):
+        """
+        Merges every new or modified TwFollow export in a directory into the graph.
+
+        Exports already merged with the same modification time are skipped, so this can
+        be called again after new exports are downloaded.
+
+        Parameters:
+        ----------
+        directory : str, optional (default="data/TwFollow")
+            Directory containing the CSV exports.
+        pattern : str, optional
+            Glob pattern used to select the exports.
+        verbose : bool, optional
+            Whether to print which exports were merged.
+
+        Returns:
+        -------
+        list of str
+            Paths of the exports that were merged.
+        """
+        merged = []
+        for file_path in sorted(glob.glob(os.path.join(directory, pattern))):
+            key = os.path.abspath(file_path)
+            if self._source_mtimes.get(key) == os.path.getmtime(file_path):
+                continue
+            self.read_following(file_path)
+            merged.append(file_path)
+            if verbose:
+                print(f"✅ Merged {file_path}")
+        return merged
+
+    @property
+    def adjacency(self):
+        """
+        The (num_nodes x num_nodes) CSR adjacency matrix. Row i lists who node i follows.
+        """
+        if self._adjacency is None or self._adjacency.shape[0] != self.num_nodes:
+            n = self.num_nodes
+            sources = sorted(self._following)
+            rows = np.concatenate([np.full(len(self._following[s]), s, dtype=np.int64) for s in sources]) if sources else np.array([], dtype=np.int64)
+            cols = np.concatenate([self._following[s] for s in sources]) if sources else np.array([], dtype=np.int64)
+            data = np.ones(len(rows), dtype=np.float32)
+            self._adjacency = sp.csr_matrix((data, (rows, cols)), shape=(n, n))
+        return self._adjacency
+
+    def _resolve(self, accounts):
+        if accounts is None:
+            return sorted(self._following)
+        nodes = []
+        for account in accounts:
+            node = self._username_index.get(str(account).lower(), self.node_ids.get(str(account)))
+            if node is None:
+                raise KeyError(f"Unknown account: {account}")
+            nodes.append(node)
+        return nodes
+
+    def following_overlap(self, accounts=None):
+        """
+        Computes the number of shared followed accounts and the Jaccard similarity
+        between every pair of accounts.
+
+        Parameters:
+        ----------
+        accounts : list of str, optional
+            Screen names (or userIds) to compare. Defaults to every account with an export.
+
+        Returns:
+        -------
+        tuple of pd.DataFrame
+            (overlap, jaccard), both square DataFrames indexed by username.
+        """
+        nodes = self._resolve(accounts)
+        A = self.adjacency[nodes]
+        overlap = (A @ A.T).toarray()
+        degree = np.asarray(A.sum(axis=1)).ravel()
+        union = degree[:, None] + degree[None, :] - overlap
+        with np.errstate(divide="ignore", invalid="ignore"):
+            jaccard = np.where(union > 0, overlap / union, 0.0)
+
+        labels = [self.usernames[n] for n in nodes]
+        return (pd.DataFrame(overlap.astype(np.int64), index=labels, columns=labels),
+                pd.DataFrame(jaccard, index=labels, columns=labels))
+
+    def co_following_counts(self, accounts=None, min_count=2):
+        """
+        Counts, for every followed account, how many of the given accounts follow it.
+
+        Parameters:
+        ----------
+        accounts : list of str, optional
+            Screen names (or userIds) of the followers. Defaults to every account with an export.
+        min_count : int, optional (default=2)
+            Only return accounts followed by at least this many of `accounts`.
+
+        Returns:
+        -------
+        pd.DataFrame
+            Columns ["username", "name", "count"], sorted by count (descending).
+        """
+        nodes = self._resolve(accounts)
+        counts = np.asarray(self.adjacency[nodes].sum(axis=0)).ravel()
+        keep = np.flatnonzero(counts >= min_count)
+        df = pd.DataFrame({
+            "username": [self.usernames[i] for i in keep],
+            "name": [self.names[i] for i in keep],
+            "count": counts[keep].astype(np.int64),
+        })
+        return df.sort_values("count", ascending=False, ignore_index=True)
+
+    def degree_stats(self):
+        """
+        Computes the in-degree (followers within the graph) and out-degree (following) of every node.
+
+        Returns:
+        -------
+        pd.DataFrame
+            Columns ["username", "in_degree", "out_degree", "followers_count"].
+        """
+        A = self.adjacency
+        return pd.DataFrame({
+            "username": self.usernames,
+            "in_degree": np.asarray(A.sum(axis=0)).ravel().astype(np.int64),
+            "out_degree": np.asarray(A.sum(axis=1)).ravel().astype(np.int64),
+            "followers_count": self.followers_counts,
+        })
+
+    def pagerank(self, alpha=0.85, tol=1e-8, max_iter=100):
+        """
+        Computes PageRank by power iteration on the sparse adjacency matrix.
+
+        Parameters:
+        ----------
+        alpha : float, optional (default=0.85)
+            Damping factor.
+        tol : float, optional (default=1e-8)
+            Convergence tolerance on the L1 change between iterations.
+        max_iter : int, optional (default=100)
+            Maximum number of iterations.
+
+        Returns:
+        -------
+        pd.DataFrame
+            Columns ["username", "pagerank"], sorted by PageRank (descending).
+        """
+        A = self.adjacency
+        n = A.shape[0]
+        if n == 0:
+            return pd.DataFrame(columns=["username", "pagerank"])
+
+        out_degree = np.asarray(A.sum(axis=1)).ravel()
+        dangling = out_degree == 0
+        inv_degree = np.divide(1.0, out_degree, out=np.zeros(n), where=~dangling)
+        # Row-normalized transition matrix, transposed so rank flows along edges
+        P_T = (sp.diags(inv_degree) @ A).T.tocsr()
+
+        rank = np.full(n, 1.0 / n)
+        for _ in range(max_iter):
+            new_rank = alpha * (P_T @ rank + rank[dangling].sum() / n) + (1 - alpha) / n
+            if np.abs(new_rank - rank).sum() < tol:
+                rank = new_rank
+                break
+            rank = new_rank
+
+        df = pd.DataFrame({"username": self.usernames, "pagerank": rank})
+        return df.sort_values("pagerank", ascending=False, ignore_index=True)
+
+    def to_networkx(self):
+        """
+        Converts the graph to a networkx DiGraph (requires networkx).
+
+        Returns:
+        -------
+        networkx.DiGraph
+            Nodes are usernames with "name" and "followers_count" attributes.
+        """
+        import networkx as nx
+
+        G = nx.DiGraph()
+        for node, username in enumerate(self.usernames):
+            G.add_node(username, name=self.names[node], followers_count=self.followers_counts[node])
+        rows, cols = self.adjacency.nonzero()
+        G.add_edges_from((self.usernames[r], self.usernames[c]) for r, c in zip(rows, cols))
+        return G
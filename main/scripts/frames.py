@@ -0,0 +1,251 @@
+import os
+import json
+import base64
+import tempfile
+import subprocess
+from concurrent.futures import ThreadPoolExecutor
+from scripts.instrumentation import default_registry
+
+# numpy and cv2 are imported inside the methods that use them (see scripts.genai).
+
+
+# JPEG qualities tried, in order, when an encoded frame exceeds its byte budget. If the
+# lowest quality is still too large, the frame is downscaled by RESIZE_FACTOR and retried.
+JPEG_QUALITY_STEPS = (95, 85, 75, 60, 45)
+RESIZE_FACTOR = 0.7
+MIN_FRAME_WIDTH = 160
+
+
+def base64_size(nbytes):
+    """Length of the base64 encoding of `nbytes` bytes."""
+    return 4 * ((nbytes + 2) // 3)
+
+
+def encode_jpeg(frame, quality=95, max_bytes=None):
+    """
+    JPEG-encodes a BGR frame. If `max_bytes` is given and the base64 encoding of the JPEG
+    would be larger, the quality is lowered step by step (`JPEG_QUALITY_STEPS`), then the
+    frame is downscaled, until it fits (or the frame is `MIN_FRAME_WIDTH` wide).
+
+    Returns:
+    -------
+    numpy.ndarray
+        The JPEG bytes (as returned by `cv2.imencode`).
+    """
+    import cv2
+
+    qualities = [quality] + [q for q in JPEG_QUALITY_STEPS if q < quality]
+    while True:
+        for q in qualities:
+            _, buffer = cv2.imencode(".jpg", frame, [cv2.IMWRITE_JPEG_QUALITY, q])
+            if max_bytes is None or base64_size(buffer.nbytes) <= max_bytes:
+                return buffer
+        height, width = frame.shape[:2]
+        if width <= MIN_FRAME_WIDTH:
+            return buffer
+        size = (max(MIN_FRAME_WIDTH, int(width * RESIZE_FACTOR)), max(1, int(height * RESIZE_FACTOR)))
+        frame = cv2.resize(frame, size, interpolation=cv2.INTER_AREA)
+
+
+def jpeg_data_url(buffer):
+    """Data URL of JPEG bytes, built with a single base64 copy."""
+    return "data:image/jpeg;base64," + base64.b64encode(buffer).decode("ascii")
+
+
+
+class FrameSampler:
+    """
+    Samples frames for many segments of a video (e.g. the clips written by
+    `MovieAI.split_video`) in a single decoding pass.
+
+    FFmpeg decodes the source once and pipes raw BGR frames (`-f rawvideo`) into a
+    preallocated NumPy ring buffer. Only the frames that are sampled are kept; they are
+    JPEG-encoded on a thread pool while decoding continues. A ring slot is reused only
+    after its frame has been encoded, so memory stays bounded by `buffer_frames` frames
+    regardless of the length of the video.
+
+    The frames of each segment are sampled like `GenAI.extract_frames`: every
+    `nframes // max_samples`-th frame of the segment, at most `max_samples` frames.
+
+    Attributes:
+    ----------
+    ffmpeg_path, ffprobe_path : str
+        FFmpeg and FFprobe executables.
+    max_width : int or None
+        Frames wider than this are downscaled (keeping the aspect ratio) by FFmpeg before
+        they are piped. `None` keeps the native resolution.
+    buffer_frames : int
+        Number of slots of the ring buffer.
+    jpeg_quality : int
+        JPEG quality (0-100) of the encoded frames.
+    max_frame_bytes : int or None
+        Byte budget of each base64-encoded frame (see `encode_jpeg`).
+    max_workers : int or None
+        Number of JPEG encoding threads.
+    """
+
+    def __init__(self, ffmpeg_path="ffmpeg", ffprobe_path=None, max_width=None, buffer_frames=32,
+                 jpeg_quality=95, max_frame_bytes=None, max_workers=None, metrics=None):
+        self.ffmpeg_path = ffmpeg_path
+        if ffprobe_path is None:
+            directory, name = os.path.split(ffmpeg_path)
+            ffprobe_path = os.path.join(directory, name.replace("ffmpeg", "ffprobe"))
+        self.ffprobe_path = ffprobe_path
+        self.max_width = max_width
+        self.buffer_frames = buffer_frames
+        self.jpeg_quality = jpeg_quality
+        self.max_frame_bytes = max_frame_bytes
+        self.max_workers = max_workers
+        self.metrics = metrics if metrics is not None else default_registry
+
+    def probe(self, file_path):
+        """
+        Reads the frame size, frame rate and duration of the first video stream with FFprobe.
+
+        Returns:
+        -------
+        dict
+            Keys: width, height (as decoded, i.e. after rotation), fps, duration (seconds).
+        """
+        command = [self.ffprobe_path, "-v", "error", "-select_streams", "v:0",
+                   "-show_streams", "-show_format", "-of", "json", file_path]
+        result = subprocess.run(command, check=True, stdout=subprocess.PIPE, stderr=subprocess.PIPE)
+        info = json.loads(result.stdout)
+        stream = info["streams"][0]
+
+        def rate(value):
+            num, _, den = str(value or "0/1").partition("/")
+            return float(num) / float(den or 1) if float(den or 1) else 0.0
+
+        fps = rate(stream.get("avg_frame_rate")) or rate(stream.get("r_frame_rate"))
+        rotation = stream.get("tags", {}).get("rotate", 0)
+        for side_data in stream.get("side_data_list", []):
+            rotation = side_data.get("rotation", rotation)
+        width, height = int(stream["width"]), int(stream["height"])
+        if abs(int(float(rotation))) % 180 == 90:
+            width, height = height, width  # FFmpeg autorotates when decoding
+        return {"width": width, "height": height, "fps": fps,
+                "duration": float(info.get("format", {}).get("duration") or 0.0)}
+
+    def _output_size(self, width, height):
+        if self.max_width and width > self.max_width:
+            height = round(height * self.max_width / width)
+            width = self.max_width
+        return width - width % 2, height - height % 2  # even sizes for the scaler
+
+    @staticmethod
+    def plan(boundaries, fps, max_samples):
+        """
+        Chooses the frames to sample for each (start, end) segment in seconds.
+
+        Returns:
+        -------
+        tuple
+            (wanted, nframes) where `wanted` maps a frame index of the source to
+            (segment, sample position) and `nframes` is the frame count of each segment.
+        """
+        wanted = {}
+        nframes = []
+        for segment, (start, end) in enumerate(boundaries):
+            first, last = round(start * fps), round(end * fps)
+            count = max(0, last - first)
+            nframes.append(count)
+            interval = max(1, int(count // max_samples))
+            indices = range(first, last, interval)
+            for position, index in enumerate(indices[:max_samples]):
+                wanted[index] = (segment, position)
+        return wanted, nframes
+
+    def _encode(self, frame):
+        buffer = encode_jpeg(frame, quality=self.jpeg_quality, max_bytes=self.max_frame_bytes)
+        return base64.b64encode(buffer).decode("utf-8")
+
+    @staticmethod
+    def _read_into(stream, view):
+        """Fills `view` from `stream`. Returns False at the end of the stream."""
+        filled = 0
+        while filled < len(view):
+            n = stream.readinto(view[filled:])
+            if not n:
+                return False
+            filled += n
+        return True
+
+    def sample(self, file_path, boundaries, max_samples=15):
+        """
+        Samples the frames of every segment of `file_path` in one decoding pass.
+
+        Parameters:
+        ----------
+        file_path : str
+            Source video.
+        boundaries : list of tuple
+            (start, end) of each segment in seconds, e.g. from `MovieAI.segment_boundaries`.
+        max_samples : int, optional (default=15)
+            Maximum number of frames sampled per segment.
+
+        Returns:
+        -------
+        list of tuple
+            One (base64 JPEG frames, nframes, fps) tuple per segment, like `GenAI.extract_frames`.
+        """
+        import numpy as np
+
+        info = self.probe(file_path)
+        fps = info["fps"]
+        width, height = self._output_size(info["width"], info["height"])
+        wanted, nframes = self.plan(boundaries, fps, max_samples)
+        futures = [[] for _ in boundaries]
+        if not wanted:
+            return [([], count, fps) for count in nframes]
+        last_wanted = max(wanted)
+
+        ring = np.empty((self.buffer_frames, height, width, 3), dtype=np.uint8)
+        scratch = np.empty((height, width, 3), dtype=np.uint8)
+        pending = [None] * self.buffer_frames
+        command = [
+            self.ffmpeg_path, "-v", "error", "-nostdin",
+            "-i", file_path,
+            "-an", "-sn",
+            "-vf", f"scale={width}:{height}",
+            "-f", "rawvideo", "-pix_fmt", "bgr24",
+            "-",
+        ]
+
+        with self.metrics.track("FrameSampler", "ffmpeg.decode") as call, \
+                tempfile.TemporaryFile() as stderr, \
+                ThreadPoolExecutor(max_workers=self.max_workers) as executor:
+            process = subprocess.Popen(command, stdout=subprocess.PIPE, stderr=stderr,
+                                       bufsize=4 * scratch.nbytes)
+            index = slot = 0
+            try:
+                while index <= last_wanted:
+                    sampled = wanted.get(index)
+                    if sampled is None:
+                        # Frames that are not sampled are read into a scratch frame and dropped
+                        if not self._read_into(process.stdout, memoryview(scratch).cast("B")):
+                            break
+                    else:
+                        if pending[slot] is not None:
+                            pending[slot].result()  # wait until the slot's previous frame is encoded
+                        if not self._read_into(process.stdout, memoryview(ring[slot]).cast("B")):
+                            break
+                        pending[slot] = executor.submit(self._encode, ring[slot])
+                        futures[sampled[0]].append(pending[slot])
+                        slot = (slot + 1) % self.buffer_frames
+                    index += 1
+            finally:
+                process.stdout.close()
+                if process.poll() is None:
+                    process.kill()  # every sampled frame has been read
+                process.wait()
+            call.response_bytes = index * scratch.nbytes
+
+            if index == 0:
+                stderr.seek(0)
+                call.status = "error"
+                print(f"❌ Error: FFmpeg could not decode '{file_path}'.\n{stderr.read().decode('utf-8', errors='replace')}")
+
+            samples = [[future.result() for future in segment_futures] for segment_futures in futures]
+
+        return [(frames, count, fps) for frames, count in zip(samples, nframes)]
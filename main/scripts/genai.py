@@ -1,16 +1,44 @@
 import os
+import inspect
 import openai
 import json
-import pandas as pd
 import base64
-import requests
 import time
-import cv2
-import PyPDF2
-from docx import Document
 import re
-import openai
-from IPython.display import display, Image, HTML, Audio
+import traceback
+from scripts.instrumentation import default_registry, http_event_hooks
+from scripts.prompt_cache import PromptLayout
+from scripts.frames import encode_jpeg, jpeg_data_url
+
+# Heavy or optional dependencies (cv2, PyPDF2, docx, pandas, requests, IPython) are
+# imported inside the methods that use them, so a process that only needs
+# generate_text does not pay for them at import time.
+
+
+URL_PATTERN = re.compile(r'https?://\S+|www\.\S+')
+
+# Default byte budget of the frames of one video description request. Frames are
+# re-encoded at a lower quality or resolution when they would exceed their share.
+MAX_VISION_REQUEST_BYTES = 8_000_000
+
+# User message of a retrieval-augmented chat turn (see `generate_chat_response`)
+GROUNDED_MESSAGE_TEMPLATE = (
+    "Use the following excerpts if they are relevant to my message.\n\n"
+    "{excerpts}\n\n"
+    "My message: {message}"
+)
+
+
+def show_html(html):
+    """
+    Renders an HTML string in a notebook. Does nothing in headless processes where
+    IPython is not installed, so the display helpers can run on a server.
+    """
+    try:
+        from IPython.display import display, HTML
+    except ImportError:
+        return
+    display(HTML(html))
 
 
 
@@ -23,8 +51,12 @@ class GenAI:
     ----------
     client : openai.Client
         An instance of the OpenAI client initialized with the API key.
+    metrics : MetricsRegistry
+        Registry where every API call and video decode is recorded.
+    prompt_layout : PromptLayout
+        Orders chat messages for prompt caching and tracks cached tokens per cache key.
     """
-    def __init__(self, openai_api_key):
+    def __init__(self, openai_api_key, metrics=None, base_url=None):
         """
         Initializes the GenAI class with the provided OpenAI API key.
 
@@ -32,11 +64,25 @@ class GenAI:
         ----------
         openai_api_key : str
             The API key for accessing OpenAI's services.
+        metrics : MetricsRegistry, optional
+            Registry that records the latency, tokens and payload size of every API call.
+            Defaults to the shared `scripts.instrumentation.default_registry`.
+        base_url : str, optional
+            Alternative API endpoint, e.g. the local mock server in `benchmarks/mock_server.py`.
+            Defaults to the OpenAI API.
         """
-        self.client = openai.Client(api_key=openai_api_key)
+        self.metrics = metrics if metrics is not None else default_registry
+        # The event hooks attribute request bytes and retries to the call being tracked
+        self.client = openai.Client(
+            api_key=openai_api_key,
+            base_url=base_url,
+            http_client=openai.DefaultHttpxClient(event_hooks=http_event_hooks()),
+        )
         self.openai_api_key = openai_api_key
+        self.prompt_layout = PromptLayout()
 
-    def generate_text(self, prompt, instructions='You are a helpful AI named Jarvis', model="gpt-4o-mini", output_type='text', temperature =1):
+    def generate_text(self, prompt, instructions='You are a helpful AI named Jarvis', model="gpt-4o-mini", output_type='text', temperature =1,
+                      context=None, cache_key=None):
         """
         Generates a text completion using the OpenAI API.
 
@@ -57,6 +103,15 @@ class GenAI:
         output_type : str, optional (default='text')
             The format of the output. Typically 'text', but can be customized for models that support different response formats.
 
+        context : str, optional
+            Large context shared by many calls (documents, clip descriptions, ...). It is sent
+            right after the instructions so both form a stable prefix for prompt caching.
+
+        cache_key : str, optional
+            Name of the shared prefix, e.g. "sentiment-v2". Calls with the same key are routed
+            to the same provider cache, report their cached tokens in `prompt_layout.report()`,
+            and print a warning if their instructions or context differ from the previous call.
+
         Returns:
         -------
         str
@@ -68,22 +123,99 @@ class GenAI:
         >>> print(response)
         "The weather today is sunny with a high of 75°F."
         """
-        completion = self.client.chat.completions.create(
-            model=model,
+        messages, cache_options = self._cached_messages(prompt, instructions, context, cache_key, model)
+        completion = self.chat_completion(
+            messages,
+            model,
+            cache_key=cache_key,
             temperature=temperature,
             response_format={"type": output_type},
-            messages=[
-                {"role": "system", "content": instructions},
-                {"role": "user", "content": prompt}
-            ]
+            **cache_options
         )
         response = completion.choices[0].message.content
-        response = response.replace("```html", "")
-        response = response.replace("```", "")
-        return response
+        return self._clean_response(response)
+
+    def chat_completion(self, messages, model, name="chat.completions", cache_key=None, **params):
+        """
+        Sends a chat completion request, records it in `metrics` as `name` (and its cached
+        tokens under `cache_key`), and returns the raw completion. The building block of
+        the other chat methods, for callers that need the full response object or the
+        unmodified message text.
 
+        Parameters:
+        ----------
+        messages : list
+            Chat messages, e.g. from `prompt_layout.build`.
+        model : str
+            The OpenAI model to use.
+        name : str, optional (default="chat.completions")
+            Name of the call in `metrics`.
+        cache_key : str, optional
+            Name of the shared prompt prefix whose cached tokens are recorded.
+        **params
+            Other request parameters (temperature, response_format, max_tokens, ...).
 
-    def generate_chat_response(self, chat_history, user_message, instructions, model="gpt-4o-mini", output_type='text'):
+        Returns:
+        -------
+        openai.types.chat.ChatCompletion
+            The completion.
+        """
+        with self.metrics.track(type(self).__name__, name, model=model) as call:
+            completion = self.client.chat.completions.create(model=model, messages=messages, **params)
+            call.set_usage(completion.usage)
+        if cache_key is not None:
+            self.prompt_layout.record_usage(cache_key, completion.usage)
+        return completion
+
+    def _cached_messages(self, prompt, instructions, context=None, cache_key=None, model=None, history=None):
+        """
+        Builds the messages with the stable prefix first and, for calls with a `cache_key`,
+        checks the prefix and returns the `prompt_cache_key` request option.
+        """
+        messages, prefix = self.prompt_layout.build(prompt, instructions, context=context, history=history)
+        if cache_key is None:
+            return messages, {}
+        self.prompt_layout.check(prefix, cache_key, model=model)
+        return messages, {"extra_body": {"prompt_cache_key": cache_key}}
+
+
+    def _grounded_message(self, user_message, context_index, k=5, retrieval_mode="bm25"):
+        """
+        Retrieves the `k` chunks of `context_index` most relevant to a message and returns
+        the message with the chunks prepended (`GROUNDED_MESSAGE_TEMPLATE`).
+        """
+        retrieval_mode = retrieval_mode or "bm25"
+        embed_query = getattr(context_index.genai, "get_embeddings", None)
+        if retrieval_mode != "bm25" and inspect.iscoroutinefunction(embed_query):
+            raise ValueError(f"retrieval_mode={retrieval_mode!r} embeds the query with the index's GenAI, "
+                             "which must be a GenAI, not an AsyncGenAI. Build the SearchIndex with a GenAI "
+                             "or use retrieval_mode='bm25'.")
+        with self.metrics.track(type(self).__name__, f"retrieval.{retrieval_mode}"):
+            results = context_index.search(user_message, k=k, mode=retrieval_mode)
+        if results.empty:
+            return user_message
+        excerpts = "\n\n".join(f"[{i}] {text}" for i, text in enumerate(results["text"], start=1))
+        return GROUNDED_MESSAGE_TEMPLATE.format(excerpts=excerpts, message=user_message)
+
+    @staticmethod
+    def _clean_response(response):
+        """Strips markdown code fences from a model response."""
+        return response.replace("```html", "").replace("```", "")
+
+    @staticmethod
+    def _vision_messages(instructions, image_urls):
+        """Builds a single user message with the instructions followed by the images."""
+        return [
+            {
+                "role": "user",
+                "content": [{"type": "text", "text": instructions}] +
+                           [{"type": "image_url", "image_url": {"url": url}} for url in image_urls],
+            },
+        ]
+
+
+    def generate_chat_response(self, chat_history, user_message, instructions, model="gpt-4o-mini", output_type='text', cache_key=None,
+                               context_index=None, k=5, retrieval_mode="bm25"):
         """
         Generates a chatbot-like response based on the conversation history.
 
@@ -99,6 +231,20 @@ class GenAI:
             The OpenAI model to use (default is 'gpt-4o-mini').
         output_type : str, optional
             The format of the output (default is 'text').
+        cache_key : str, optional
+            Name of the shared instructions prefix (see `generate_text`).
+        context_index : SearchIndex, optional
+            Precomputed index of the documents the chatbot is grounded on (see
+            `scripts.search.SearchIndex.add_files`), used instead of pasting whole documents
+            into `instructions`. The `k` chunks most relevant to `user_message` are added to
+            this turn's request only; `chat_history` keeps the plain message.
+        k : int, optional (default=5)
+            Number of chunks retrieved per turn.
+        retrieval_mode : str, optional (default="bm25")
+            "bm25", "vector" or "hybrid" (see `SearchIndex.search`). BM25 runs locally in a
+            few milliseconds; "vector" and "hybrid" need an index with embeddings and make
+            one embeddings API call per turn to embed the message, which adds its network
+            latency to every turn.
 
         Returns:
         -------
@@ -108,15 +254,16 @@ class GenAI:
         # Add the latest user message to the chat history
         chat_history.append({"role": "user", "content": user_message})
 
+        # System instructions first, then the history, so earlier turns stay a cacheable prefix
+        messages, cache_options = self._cached_messages(None, instructions, cache_key=cache_key, model=model,
+                                                        history=chat_history)
+        if context_index is not None:
+            messages[-1] = {"role": "user",
+                            "content": self._grounded_message(user_message, context_index, k, retrieval_mode)}
+
         # Call the OpenAI API to get a response
-        completion = self.client.chat.completions.create(
-            model=model,
-            response_format={"type": output_type},
-            messages=[
-                {"role": "system", "content": instructions},  # Add system instructions
-                *chat_history  # Unpack the chat history to include all previous messages
-            ]
-        )
+        completion = self.chat_completion(messages, model, cache_key=cache_key,
+                                           response_format={"type": output_type}, **cache_options)
 
         # Extract the bot's response from the API completion
         bot_response = completion.choices[0].message.content
@@ -157,20 +304,22 @@ class GenAI:
         -----
         This function introduces a short delay (`time.sleep(1)`) to ensure proper API response handling.
         """
-        response_img = self.client.images.generate(
-            model=model,
-            prompt=prompt,
-            size=size,
-            quality=quality,
-            n=n,
-        )
+        with self.metrics.track(type(self).__name__, "images.generate", model=model):
+            response_img = self.client.images.generate(
+                model=model,
+                prompt=prompt,
+                size=size,
+                quality=quality,
+                n=n,
+            )
         time.sleep(1)
         image_url = response_img.data[0].url
         revised_prompt = response_img.data[0].revised_prompt
 
         return image_url, revised_prompt
 
-    def display_image_url(self,image_url, width=256, height=256):
+    @staticmethod
+    def display_image_url(image_url, width=256, height=256):
         """
         Creates a static, embeddable HTML representation of an image from a given URL,
         ensuring the image remains viewable even if the original link becomes inactive.
@@ -200,6 +349,8 @@ class GenAI:
         if not isinstance(image_url, str) or not image_url.startswith(('http://', 'https://')):
             raise ValueError(f"Invalid image URL provided: {image_url}")
 
+        import requests
+
         response = requests.get(image_url)
         image_data = response.content
         # Encoding the image data as base64
@@ -209,7 +360,8 @@ class GenAI:
         
         return html_code
 
-    def encode_image(self,image_path):
+    @staticmethod
+    def encode_image(image_path):
         """
         Encodes an image file into a base64 string.
 
@@ -248,26 +400,36 @@ class GenAI:
             image_paths = [image_paths]
 
         image_urls = [f"data:image/jpeg;base64,{self.encode_image(image_path)}" for image_path in image_paths]
+        return self.generate_image_url_description(image_urls, instructions, model=model)
 
-        PROMPT_MESSAGES = [
-            {
-                "role": "user",
-                "content": [{"type": "text", "text": instructions},
-                            *map(lambda x: {"type": "image_url", "image_url": {"url": x}}, image_urls),
-                            ],
-            },
-        ]
-        params = {
-            "model": model,
-            "messages": PROMPT_MESSAGES,
-            "max_tokens": 1000,
-        }
+    def generate_image_url_description(self, image_urls, instructions, model='gpt-4o-mini', max_tokens=1000):
+        """
+        Generates a description for one or more images given by URL, e.g. images already
+        hosted online or base64 data URLs (see `generate_image_description` for local files).
+
+        Parameters:
+        ----------
+        image_urls : str or list
+            http(s) or data URL(s) of the image(s).
+        instructions : str
+            Instructions for the description.
+        model : str, optional
+            The OpenAI model to use (default is 'gpt-4o-mini').
+        max_tokens : int, optional
+            Maximum length of the description (default is 1000).
+
+        Returns:
+        -------
+        str
+            A textual description of the image(s).
+        """
+        if isinstance(image_urls, str):
+            image_urls = [image_urls]
 
-        completion = self.client.chat.completions.create(**params)
+        completion = self.chat_completion(self._vision_messages(instructions, image_urls), model,
+                                          name="chat.completions.vision", max_tokens=max_tokens)
         response = completion.choices[0].message.content
-        response = response.replace("```html", "")
-        response = response.replace("```", "")
-        return response
+        return self._clean_response(response)
 
     def extract_frames(self, fname_video, max_samples = 15):
         """
@@ -286,40 +448,89 @@ class GenAI:
             - Total number of frames in the video
             - Frames per second (FPS) of the video
         """
+        with self.metrics.track(type(self).__name__, "extract_frames"):
+            frames, nframes, fps = self.iter_frames(fname_video, max_samples)
+            base64Frames = [base64.b64encode(buffer).decode("utf-8") for buffer in frames]
+
+        return base64Frames, nframes, fps
+
+    @staticmethod
+    def iter_frames(fname_video, max_samples=15, max_frame_bytes=None):
+        """
+        Opens a video and samples its frames lazily, like `extract_frames`.
+
+        Only one decoded frame is in memory at a time: frames are decoded, JPEG-encoded and
+        handed out one by one, frames between samples are skipped without being converted,
+        and decoding stops after the last sample.
+
+        Parameters:
+        ----------
+        fname_video : str
+            Path to the video file.
+        max_samples : int, optional
+            Maximum number of frames to sample (default is 15).
+        max_frame_bytes : int, optional
+            Byte budget of each base64-encoded frame (see `scripts.frames.encode_jpeg`).
+
+        Returns:
+        -------
+        tuple
+            (frames, nframes, fps) where `frames` is a generator of JPEG buffers.
+        """
         if not os.path.exists(fname_video):
-            
-            return [], 0, 0
+            return iter(()), 0, 0
+
+        import cv2
 
         video = cv2.VideoCapture(fname_video)  # open the video file
         if not video.isOpened():
-            #logger.error(f"Failed to open video file: {fname_video}")
-            return [], 0, 0
+            return iter(()), 0, 0
 
         nframes = video.get(cv2.CAP_PROP_FRAME_COUNT)  # number of frames in video
         fps = video.get(cv2.CAP_PROP_FPS)  # frames per second in video
-
-        #logger.debug(f"{nframes} frames in video")
-        #logger.debug(f"{fps} frames per second")
-
-        base64Frames = []
-        
         frame_interval = max(1, int(nframes // max_samples))  # Calculate the interval at which to sample frames
 
-        current_frame = 0
-        while video.isOpened():
-            success, frame = video.read()
-            if not success:
-                break
-            if current_frame % frame_interval == 0 and len(base64Frames) < max_samples:
-                _, buffer = cv2.imencode(".jpg", frame)
-                base64Frames.append(base64.b64encode(buffer).decode("utf-8"))
-            current_frame += 1
-
-        video.release()
-
-        return base64Frames, nframes, fps
+        def frames():
+            try:
+                for current_frame in range(0, frame_interval * max_samples, frame_interval):
+                    # grab() decodes without converting the skipped frames to BGR
+                    for _ in range(frame_interval - 1 if current_frame else 0):
+                        if not video.grab():
+                            return
+                    success, frame = video.read()
+                    if not success:
+                        return
+                    yield encode_jpeg(frame, max_bytes=max_frame_bytes)
+            finally:
+                video.release()
+
+        return frames(), nframes, fps
+
+    @staticmethod
+    def _frame_byte_budget(max_request_bytes, max_samples):
+        """Byte budget of each of `max_samples` frames sharing `max_request_bytes` (`None` if unlimited)."""
+        return max_request_bytes // max(1, max_samples) if max_request_bytes else None
+
+    def _video_frame_urls(self, fname_video, max_samples=15, max_request_bytes=MAX_VISION_REQUEST_BYTES):
+        """
+        Samples a video into image data URLs whose total size stays within `max_request_bytes`.
+        Each frame is converted to its data URL as soon as it is encoded, so no other copy
+        of the frames (base64 list, raw frames) is kept.
 
-    def generate_video_description(self, fname_video, instructions, max_samples=15, model='gpt-4o-mini'):
+        Returns:
+        -------
+        tuple
+            (image_urls, nframes, fps)
+        """
+        max_frame_bytes = self._frame_byte_budget(max_request_bytes, max_samples)
+        with self.metrics.track(type(self).__name__, "extract_frames") as call:
+            frames, nframes, fps = self.iter_frames(fname_video, max_samples, max_frame_bytes=max_frame_bytes)
+            image_urls = [jpeg_data_url(buffer) for buffer in frames]
+            call.request_bytes = sum(len(url) for url in image_urls)
+        return image_urls, nframes, fps
+
+    def generate_video_description(self, fname_video, instructions, max_samples=15, model='gpt-4o-mini', frames=None,
+                                   max_request_bytes=MAX_VISION_REQUEST_BYTES):
         """
         Generates a textual description of a video by analyzing sampled frames.
 
@@ -333,44 +544,37 @@ class GenAI:
             Maximum number of frames to sample from the video (default is 15).
         model : str, optional
             OpenAI model used for generating the description (default is 'gpt-4o-mini').
+        frames : tuple, optional
+            Frames sampled beforehand as (base64 frames, nframes, fps), e.g. by
+            `MovieAI.sample_clip_frames`. If `None`, they are extracted from `fname_video`.
+        max_request_bytes : int, optional
+            Byte budget of the frames in the request (default is 8 MB). Frames extracted
+            here are re-encoded at a lower quality or resolution to fit (`sample_clip_frames`
+            applies the same budget to the frames it samples). `None` disables it.
 
         Returns
         -------
         str
             A descriptive summary of the video content.
         """
-        # Extract sampled frames and video metadata
-        base64Frames_samples, nframes, fps = self.extract_frames(fname_video, max_samples)
+        # Sample frames straight into image URLs (or convert the frames sampled beforehand)
+        if frames is None:
+            image_urls, nframes, fps = self._video_frame_urls(fname_video, max_samples, max_request_bytes)
+        else:
+            base64Frames_samples, nframes, fps = frames
+            image_urls = [f"data:image/jpeg;base64,{base64_image}" for base64_image in base64Frames_samples]
 
         # Estimate the maximum number of words based on speech rate
         words_per_second = 200 / 60  # Typical speech rate
         max_words = round(nframes / fps * words_per_second)
 
-        # Convert frames to base64 image URLs
-        image_urls = [f"data:image/jpeg;base64,{base64_image}" for base64_image in base64Frames_samples]
-
-        # Prepare API prompt messages
-        prompt_messages = [
-            {
-                "role": "user",
-                "content": [{"type": "text", "text": instructions}] +
-                        [{"type": "image_url", "image_url": {"url": url}} for url in image_urls],
-            },
-        ]
-
-        # API request parameters
-        params = {
-            "model": model,
-            "messages": prompt_messages,
-            "max_tokens": 1000,
-        }
-
         # Generate completion using OpenAI's API
-        completion = self.client.chat.completions.create(**params)
+        completion = self.chat_completion(self._vision_messages(instructions, image_urls), model,
+                                          name="chat.completions.vision", max_tokens=1000)
         response = completion.choices[0].message.content
 
         # Clean up response formatting
-        return response.replace("```html", "").replace("```", "")
+        return self._clean_response(response)
 
     def generate_audio(self, text, file_path, model='tts-1', voice='nova', speed=1.0):
         """
@@ -402,15 +606,16 @@ class GenAI:
         """
 
         # Generate speech using OpenAI's API
-        response = self.client.audio.speech.create(
-            model=model,
-            voice=voice,
-            input=text,
-            speed=speed  # Include speed parameter
-        )
+        with self.metrics.track(type(self).__name__, "audio.speech", model=model):
+            response = self.client.audio.speech.create(
+                model=model,
+                voice=voice,
+                input=text,
+                speed=speed  # Include speed parameter
+            )
 
-        # Save the generated audio to the specified file path
-        response.stream_to_file(file_path)
+            # Save the generated audio to the specified file path
+            response.stream_to_file(file_path)
 
         return True
 
@@ -425,10 +630,11 @@ class GenAI:
             audio_file= open(audio_filename, "rb")
 
             #print("\ttranscribe audio")
-            transcription = self.client.audio.transcriptions.create(
-              model="whisper-1", 
-              file=audio_file
-            )
+            with self.metrics.track(type(self).__name__, "audio.transcriptions", model=model):
+                transcription = self.client.audio.transcriptions.create(
+                  model="whisper-1", 
+                  file=audio_file
+                )
             # Print the transcribed text
             #print(transcription.text)
             
@@ -439,7 +645,10 @@ class GenAI:
             return None
 
 
-    def read_pdf(self,file_path):
+    @staticmethod
+    def read_pdf(file_path):
+        import PyPDF2
+
         # Open the PDF file
         with open(file_path, 'rb') as file:
             # Initialize the PDF reader
@@ -457,7 +666,10 @@ class GenAI:
 
 
 
-    def read_docx(self,file_path):
+    @staticmethod
+    def read_docx(file_path):
+        from docx import Document
+
         doc = Document(file_path)
         full_text = []
         for para in doc.paragraphs:
@@ -488,18 +700,55 @@ class GenAI:
         - The function replaces newline characters in the input text with spaces before processing.
         """
         text = text.replace("\n", " ")
-        response = self.client.embeddings.create(
-            input=text,
-            model=model
-        )
+        with self.metrics.track(type(self).__name__, "embeddings", model=model) as call:
+            response = self.client.embeddings.create(
+                input=text,
+                model=model
+            )
+            call.set_usage(response.usage)
         return response.data[0].embedding
 
+    def get_embeddings(self, texts, model='text-embedding-3-small', batch_size=256):
+        """
+        Generates the embedding vectors of many texts, `batch_size` texts per API call.
+
+        Parameters:
+        ----------
+        texts : list of str
+            The input texts. Newlines are replaced with spaces as in `get_embedding`.
+        model : str, optional
+            The OpenAI embedding model to use. Defaults to 'text-embedding-3-small'.
+        batch_size : int, optional (default=256)
+            Number of texts per request (the API accepts up to 2048).
+
+        Returns:
+        -------
+        list of list
+            The embedding vector of each text, in order.
+        """
+        embeddings = []
+        for start in range(0, len(texts), batch_size):
+            batch = [text.replace("\n", " ") for text in texts[start:start + batch_size]]
+            with self.metrics.track(type(self).__name__, "embeddings", model=model, batch_size=len(batch)) as call:
+                response = self.client.embeddings.create(input=batch, model=model)
+                call.set_usage(response.usage)
+            embeddings.extend(item.embedding for item in sorted(response.data, key=lambda item: item.index))
+        return embeddings
+
 
     def remove_urls(self, text):
-        url_pattern = re.compile(r'https?://\S+|www\.\S+')
-        return url_pattern.sub(r'', text)
+        """
+        Removes http(s):// and www. links from a string or a pandas Series of strings.
+
+        For whole DataFrame columns pass the Series directly instead of using `.apply()`;
+        see `scripts.textclean.TextCleaner` for more normalization options.
+        """
+        if not isinstance(text, str):  # pandas Series
+            return text.str.replace(URL_PATTERN, '', regex=True)
+        return URL_PATTERN.sub(r'', text)
 
-    def display_tweet(self,text='life is good', screen_name='zlisto'):
+    @staticmethod
+    def display_tweet(text='life is good', screen_name='zlisto'):
         display_html = f'''
         <!DOCTYPE html>
         <html>
@@ -537,10 +786,11 @@ class GenAI:
         </body>
         </html>
         '''
-        display(HTML(display_html))
+        show_html(display_html)
         return display_html
 
-    def display_IG(self,caption, image_url, screen_name=None, profile_image_url = None):
+    @staticmethod
+    def display_IG(caption, image_url, screen_name=None, profile_image_url = None):
         ''' HTML template for displaying the image, screen name, and caption in an Instagram-like format'''
 
         display_html = f"""
@@ -607,5 +857,5 @@ class GenAI:
             </div>
         </div>
         """
-        display(HTML(display_html))
+        show_html(display_html)
         return display_html
\ No newline at end of file
@@ -0,0 +1,407 @@
+import os
+import json
+import time
+import uuid
+import threading
+import contextvars
+from collections import deque
+from contextlib import contextmanager
+
+
+
+# Approximate list prices in USD per 1M tokens (input, output). Override with
+# `MetricsRegistry(prices=...)` when prices change or for other models.
+MODEL_PRICES = {
+    "gpt-4o-mini": (0.15, 0.60),
+    "gpt-4o": (2.50, 10.00),
+    "gpt-4.1-mini": (0.40, 1.60),
+    "gpt-4.1": (2.00, 8.00),
+    "text-embedding-3-small": (0.02, 0.0),
+    "text-embedding-3-large": (0.13, 0.0),
+}
+
+# Upper bounds (seconds) of the latency histogram buckets
+LATENCY_BUCKETS = (0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30, 60, 120, 300)
+
+# The call being tracked in the current thread or asyncio task. HTTP event hooks use
+# it to attribute request bytes and retries to the right call.
+_current_call = contextvars.ContextVar("current_call", default=None)
+
+
+
+class CallRecord:
+    """
+    Measurements of a single API call or subprocess.
+
+    Attributes:
+    ----------
+    component : str
+        Class that made the call, e.g. "GenAI", "MovieAI" or "ElevenLabsAPI".
+    name : str
+        Operation name, e.g. "chat.completions", "audio.speech" or "ffmpeg.mux".
+    model : str or None
+        Model used by the call, if any.
+    duration_s : float
+        Wall-clock duration in seconds.
+    prompt_tokens, completion_tokens, cached_tokens : int
+        Token usage reported by the API (0 if not reported).
+    request_bytes, response_bytes : int
+        Bytes sent and received over HTTP (or passed to the subprocess).
+    attempts : int
+        Number of HTTP requests sent. Retries are `attempts - 1`.
+    status : str
+        "ok" or "error".
+    """
+
+    __slots__ = ("run_id", "component", "name", "model", "labels", "timestamp", "duration_s",
+                 "prompt_tokens", "completion_tokens", "cached_tokens", "request_bytes",
+                 "response_bytes", "attempts", "status", "error")
+
+    def __init__(self, run_id, component, name, model=None, labels=None):
+        self.run_id = run_id
+        self.component = component
+        self.name = name
+        self.model = model
+        self.labels = labels or {}
+        self.timestamp = time.time()
+        self.duration_s = 0.0
+        self.prompt_tokens = 0
+        self.completion_tokens = 0
+        self.cached_tokens = 0
+        self.request_bytes = 0
+        self.response_bytes = 0
+        self.attempts = 0
+        self.status = "ok"
+        self.error = None
+
+    @property
+    def retries(self):
+        return max(0, self.attempts - 1)
+
+    def set_usage(self, usage):
+        """
+        Copies token counts from an OpenAI `usage` object (chat completions or embeddings).
+        """
+        if usage is None:
+            return
+        self.prompt_tokens = getattr(usage, "prompt_tokens", 0) or 0
+        self.completion_tokens = getattr(usage, "completion_tokens", 0) or 0
+        details = getattr(usage, "prompt_tokens_details", None)
+        self.cached_tokens = (getattr(details, "cached_tokens", 0) or 0) if details is not None else 0
+
+    def to_dict(self):
+        record = {slot: getattr(self, slot) for slot in self.__slots__}
+        record["retries"] = self.retries
+        return record
+
+
+
+class MetricsRegistry:
+    """
+    In-process registry of per-call latency, token, payload and cost measurements.
+
+    `track` wraps an API call or subprocess and records a `CallRecord` when it finishes.
+    Records are aggregated into cumulative counters (exported with `to_prometheus_text`)
+    and kept for the current run (summarized with `summary`). Sinks registered with
+    `add_sink` receive every record as it is recorded, e.g. `JSONLSink`.
+
+    Attributes:
+    ----------
+    run_id : str
+        ID of the current run. `new_run` starts a new one.
+    records : collections.deque
+        Records of the current run (the oldest are dropped beyond `max_records`).
+    """
+
+    def __init__(self, prices=None, max_records=100_000):
+        """
+        Parameters:
+        ----------
+        prices : dict, optional
+            Maps model name to (input, output) USD per 1M tokens. Defaults to `MODEL_PRICES`.
+        max_records : int, optional (default=100_000)
+            Maximum number of records kept for the run summary.
+        """
+        self.prices = dict(MODEL_PRICES if prices is None else prices)
+        self.run_id = uuid.uuid4().hex[:12]
+        self.records = deque(maxlen=max_records)
+        self._aggregates = {}
+        self._sinks = []
+        self._lock = threading.Lock()
+
+    def add_sink(self, sink):
+        """
+        Registers a callable `sink(record, registry)` that is called for every record.
+        """
+        self._sinks.append(sink)
+
+    def remove_sink(self, sink):
+        self._sinks.remove(sink)
+
+    def new_run(self, run_id=None):
+        """
+        Starts a new run: clears the per-run records (cumulative counters are kept).
+
+        Returns:
+        -------
+        str
+            The new run ID.
+        """
+        with self._lock:
+            self.run_id = run_id or uuid.uuid4().hex[:12]
+            self.records.clear()
+        return self.run_id
+
+    @contextmanager
+    def track(self, component, name, model=None, **labels):
+        """
+        Measures the enclosed block and records it as one call.
+
+        Example:
+        -------
+        >>> with metrics.track("GenAI", "chat.completions", model=model) as call:
+        ...     completion = client.chat.completions.create(...)
+        ...     call.set_usage(completion.usage)
+
+        Parameters:
+        ----------
+        component : str
+            Class making the call.
+        name : str
+            Operation name.
+        model : str, optional
+            Model used by the call.
+        **labels
+            Extra labels stored on the record (not exported to Prometheus).
+
+        Yields:
+        ------
+        CallRecord
+            The record, so the block can add usage and byte counts.
+        """
+        record = CallRecord(self.run_id, component, name, model, labels)
+        token = _current_call.set(record)
+        tstart = time.perf_counter()
+        try:
+            yield record
+        except BaseException as e:
+            record.status = "error"
+            record.error = type(e).__name__
+            raise
+        finally:
+            record.duration_s = time.perf_counter() - tstart
+            _current_call.reset(token)
+            self.record(record)
+
+    def record(self, record):
+        """
+        Adds a finished record to the run and the cumulative counters, then calls the sinks.
+        """
+        key = (record.component, record.name, record.model or "", record.status)
+        with self._lock:
+            self.records.append(record)
+            agg = self._aggregates.get(key)
+            if agg is None:
+                agg = self._aggregates[key] = {
+                    "calls": 0, "duration_s": 0.0, "buckets": [0] * len(LATENCY_BUCKETS),
+                    "prompt_tokens": 0, "completion_tokens": 0, "cached_tokens": 0,
+                    "request_bytes": 0, "response_bytes": 0, "retries": 0, "cost_usd": 0.0,
+                }
+            agg["calls"] += 1
+            agg["duration_s"] += record.duration_s
+            for i, bound in enumerate(LATENCY_BUCKETS):
+                if record.duration_s <= bound:
+                    agg["buckets"][i] += 1
+            agg["prompt_tokens"] += record.prompt_tokens
+            agg["completion_tokens"] += record.completion_tokens
+            agg["cached_tokens"] += record.cached_tokens
+            agg["request_bytes"] += record.request_bytes
+            agg["response_bytes"] += record.response_bytes
+            agg["retries"] += record.retries
+            agg["cost_usd"] += self.cost(record)
+        for sink in list(self._sinks):
+            try:
+                sink(record, self)
+            except Exception as e:
+                print(f"⚠️ Metrics sink {sink} failed: {e}")
+
+    def cost(self, record):
+        """
+        Estimated USD cost of a record from its token counts and `prices`.
+        """
+        input_price, output_price = self.prices.get(record.model, (0.0, 0.0))
+        return (record.prompt_tokens * input_price + record.completion_tokens * output_price) / 1e6
+
+    def summary(self):
+        """
+        Per-run summary table, one row per (component, name, model).
+
+        Returns:
+        -------
+        pd.DataFrame
+            Columns: calls, errors, total_s, mean_s, p50_s, p95_s, prompt_tokens,
+            completion_tokens, cached_tokens, request_mb, retries, cost_usd.
+        """
+        import pandas as pd
+
+        with self._lock:
+            df = pd.DataFrame([r.to_dict() for r in self.records])
+        columns = ["component", "name", "model", "calls", "errors", "total_s", "mean_s", "p50_s", "p95_s",
+                   "prompt_tokens", "completion_tokens", "cached_tokens", "request_mb", "retries", "cost_usd"]
+        if df.empty:
+            return pd.DataFrame(columns=columns)
+
+        df["model"] = df["model"].fillna("")
+        df["is_error"] = df["status"] == "error"
+        df["cost_usd"] = [self.cost(r) for r in self.records]
+        summary = df.groupby(["component", "name", "model"]).agg(
+            calls=("duration_s", "size"),
+            errors=("is_error", "sum"),
+            total_s=("duration_s", "sum"),
+            mean_s=("duration_s", "mean"),
+            p50_s=("duration_s", lambda s: s.quantile(0.5)),
+            p95_s=("duration_s", lambda s: s.quantile(0.95)),
+            prompt_tokens=("prompt_tokens", "sum"),
+            completion_tokens=("completion_tokens", "sum"),
+            cached_tokens=("cached_tokens", "sum"),
+            request_mb=("request_bytes", lambda s: s.sum() / 1e6),
+            retries=("retries", "sum"),
+            cost_usd=("cost_usd", "sum"),
+        ).reset_index()
+        return summary.sort_values("total_s", ascending=False, ignore_index=True)[columns]
+
+    def to_prometheus_text(self, prefix="genai"):
+        """
+        Renders the cumulative counters in the Prometheus text exposition format.
+
+        Parameters:
+        ----------
+        prefix : str, optional (default="genai")
+            Prefix of the metric names.
+
+        Returns:
+        -------
+        str
+            The metrics, e.g. for a /metrics endpoint or the node-exporter textfile collector.
+        """
+        with self._lock:
+            aggregates = {key: dict(agg, buckets=list(agg["buckets"])) for key, agg in self._aggregates.items()}
+
+        counters = [
+            ("calls_total", "calls", "Number of calls."),
+            ("prompt_tokens_total", "prompt_tokens", "Prompt tokens reported by the API."),
+            ("completion_tokens_total", "completion_tokens", "Completion tokens reported by the API."),
+            ("cached_tokens_total", "cached_tokens", "Prompt tokens served from the provider cache."),
+            ("request_bytes_total", "request_bytes", "Request payload bytes."),
+            ("response_bytes_total", "response_bytes", "Response payload bytes."),
+            ("retries_total", "retries", "HTTP retries."),
+            ("cost_usd_total", "cost_usd", "Estimated cost in USD."),
+        ]
+        lines = []
+        for metric, field, help_text in counters:
+            lines.append(f"# HELP {prefix}_{metric} {help_text}")
+            lines.append(f"# TYPE {prefix}_{metric} counter")
+            for key, agg in sorted(aggregates.items()):
+                lines.append(f"{prefix}_{metric}{{{_labels(key)}}} {agg[field]}")
+
+        metric = f"{prefix}_call_duration_seconds"
+        lines.append(f"# HELP {metric} Call latency in seconds.")
+        lines.append(f"# TYPE {metric} histogram")
+        for key, agg in sorted(aggregates.items()):
+            labels = _labels(key)
+            for bound, count in zip(LATENCY_BUCKETS, agg["buckets"]):
+                lines.append(f'{metric}_bucket{{{labels},le="{bound}"}} {count}')
+            lines.append(f'{metric}_bucket{{{labels},le="+Inf"}} {agg["calls"]}')
+            lines.append(f"{metric}_sum{{{labels}}} {agg['duration_s']}")
+            lines.append(f"{metric}_count{{{labels}}} {agg['calls']}")
+        return "\n".join(lines) + "\n"
+
+
+def _labels(key):
+    component, name, model, status = key
+    values = {"component": component, "name": name, "model": model, "status": status}
+    return ",".join(f'{k}="{str(v)}"' for k, v in values.items())
+
+
+
+class JSONLSink:
+    """
+    Metrics sink that appends every record as one JSON line to a file.
+    """
+
+    def __init__(self, file_path):
+        self.file_path = file_path
+        self._lock = threading.Lock()
+        os.makedirs(os.path.dirname(os.path.abspath(file_path)), exist_ok=True)
+
+    def __call__(self, record, registry):
+        line = json.dumps(record.to_dict(), default=str)
+        with self._lock:
+            with open(self.file_path, "a", encoding="utf-8") as f:
+                f.write(line + "\n")
+
+
+class PrometheusFileSink:
+    """
+    Metrics sink that rewrites a Prometheus text file (e.g. for the node-exporter textfile
+    collector) at most once every `min_interval_s` seconds.
+    """
+
+    def __init__(self, file_path, min_interval_s=5.0, prefix="genai"):
+        self.file_path = file_path
+        self.min_interval_s = min_interval_s
+        self.prefix = prefix
+        self._last_write = 0.0
+        os.makedirs(os.path.dirname(os.path.abspath(file_path)), exist_ok=True)
+
+    def __call__(self, record, registry):
+        now = time.time()
+        if now - self._last_write < self.min_interval_s:
+            return
+        self._last_write = now
+        tmp_path = f"{self.file_path}.tmp"
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            f.write(registry.to_prometheus_text(self.prefix))
+        os.replace(tmp_path, self.file_path)  # atomic, so scrapers never see a partial file
+
+
+
+def _on_request(request):
+    record = _current_call.get()
+    if record is not None:
+        record.attempts += 1
+        record.request_bytes += int(request.headers.get("content-length", 0) or 0)
+
+
+def _on_response(response):
+    record = _current_call.get()
+    if record is not None:
+        record.response_bytes += int(response.headers.get("content-length", 0) or 0)
+
+
+async def _on_request_async(request):
+    _on_request(request)
+
+
+async def _on_response_async(response):
+    _on_response(response)
+
+
+def http_event_hooks():
+    """
+    httpx event hooks that add request/response bytes and attempts (for retry counts) to
+    the call currently being tracked. Pass to an httpx.Client as `event_hooks=`.
+    """
+    return {"request": [_on_request], "response": [_on_response]}
+
+
+def async_http_event_hooks():
+    """
+    Same as `http_event_hooks` for an httpx.AsyncClient.
+    """
+    return {"request": [_on_request_async], "response": [_on_response_async]}
+
+
+
+# Registry shared by every GenAI/MovieAI/ElevenLabsAPI instance unless one is passed in
+default_registry = MetricsRegistry()
@@ -6,9 +6,49 @@ import time
 import ast
 import tempfile
 import subprocess
-import pandas as pd
-from tqdm.auto import tqdm  # Ensures compatibility in Jupyter and Colab
-from scripts.genai import GenAI  # Import base class
+from scripts.genai import GenAI, MAX_VISION_REQUEST_BYTES  # Import base class
+from scripts.prompt_cache import PromptLayout
+from scripts.structured_output import ListSchema, StructuredOutput, parse_json_response
+from scripts.frames import FrameSampler
+
+# pandas and tqdm are imported inside the methods that use them (see scripts.genai).
+
+
+# CSV written by `split_video` next to the clips: file name, start and end time (seconds)
+SEGMENT_LIST_NAME = "segments.csv"
+
+
+# System instructions of `generate_summary_script`. They are identical for every call and
+# come first, followed by the clip descriptions, so re-runs over the same clips with new
+# task instructions reuse the provider's prompt cache.
+SUMMARY_SCRIPT_FORMAT = """You write the script of a summary video from the descriptions of its clips, which follow as a JSON list.
+Return your answer as a JSON object with the format
+            {"script":[
+                        {'clip_path': path of the video clip file,
+                        'narration': text of the narration for the clip in the summary video},...
+                        ]
+            }."""
+
+# Hierarchical mode: each window of consecutive clips is summarized first...
+WINDOW_SUMMARY_FORMAT = """You summarize one section of a longer video from the descriptions of its consecutive clips, which follow as a JSON list.
+Return your answer as a JSON object with the format
+            {"summary": a few sentences on what happens in this section,
+             "clip_paths": [paths of the clips of this section most worth including in the summary video, best first]
+            }."""
+
+# ...then the script is written from the section summaries and the shortlisted clips
+SECTIONED_SUMMARY_SCRIPT_FORMAT = """You write the script of a summary video of a long video. The summaries of its consecutive sections follow,
+then the descriptions of the candidate clips as a JSON list.
+Return your answer as a JSON object with the format
+            {"script":[
+                        {'clip_path': path of the video clip file,
+                        'narration': text of the narration for the clip in the summary video},...
+                        ]
+            }."""
+
+# Other keys models use for the fields of a script entry
+SCRIPT_ALIASES = {"clip_path": ["clip", "path", "file", "clip_file"],
+                  "narration": ["text", "narration_text", "voiceover", "voice_over"]}
 
 
 
@@ -19,7 +59,7 @@ class MovieAI(GenAI):
     """
 
 
-    def __init__(self, openai_api_key, ffmpeg_path="ffmpeg.exe"):
+    def __init__(self, openai_api_key, ffmpeg_path="ffmpeg.exe", metrics=None, base_url=None):
         """
         Initializes MovieAI as an extension of GenAI.
 
@@ -29,9 +69,13 @@ class MovieAI(GenAI):
             The API key for accessing OpenAI's services.
         ffmpeg_path : str, optional (default="ffmpeg.exe")
             The path to the FFmpeg executable, used for video processing.
+        metrics : MetricsRegistry, optional
+            Registry that records API calls and FFmpeg runs (see `GenAI`).
+        base_url : str, optional
+            Alternative API endpoint (see `GenAI`).
         """
 
-        super().__init__(openai_api_key)  # Initialize parent class (GenAI)
+        super().__init__(openai_api_key, metrics=metrics, base_url=base_url)  # Initialize parent class (GenAI)
         self.ffmpeg_path = ffmpeg_path
 
         # Check if FFmpeg is accessible
@@ -41,30 +85,9 @@ class MovieAI(GenAI):
             )
     
 
-    def split_video(self, file_path: str, output_directory: str, segment_time: int = 60) -> None:
-        """
-        Splits a video file into multiple clips of specified duration using FFmpeg.
-        If the output directory exists, it clears all files before saving new clips.
-
-        Parameters:
-        ----------
-        file_path : str
-            Path to the input video file.
-        output_directory : str
-            Directory to save the output clips. If it exists, all existing files inside will be deleted.
-        segment_time : int, optional
-            Duration (in seconds) of each clip (default: 60 seconds).
-
-        Returns:
-        -------
-        None
-        """
-
-        # Ensure input file exists
-        if not os.path.exists(file_path):
-            raise FileNotFoundError(f"❌ Error: The input file '{file_path}' does not exist.")
-
-        # Delete all existing files in output directory (if it exists)
+    @staticmethod
+    def _clear_directory(output_directory):
+        """Deletes everything inside `output_directory` (if it exists) and recreates it."""
         if os.path.exists(output_directory):
             print(f"🗑️ Clearing existing files in '{output_directory}'...")
             for filename in os.listdir(output_directory):
@@ -80,32 +103,257 @@ class MovieAI(GenAI):
         # Recreate the output directory
         os.makedirs(output_directory, exist_ok=True)
 
+    @staticmethod
+    def _split_command(ffmpeg_path, file_path, output_directory, segment_time, segment_list=None):
+        """
+        FFmpeg command that splits `file_path` into clip_000.mp4, clip_001.mp4, ... and, if
+        `segment_list` is given, writes the start and end time of each clip to that CSV.
+        """
         # Define output file naming pattern
         output_pattern = os.path.join(output_directory, "clip_%03d.mp4")
-
-        # FFmpeg command
-        command = [
-            self.ffmpeg_path,  # Use full path to ffmpeg executable
+        segment_list_args = ["-segment_list", segment_list, "-segment_list_type", "csv"] if segment_list else []
+        return [
+            ffmpeg_path,  # Use full path to ffmpeg executable
             "-i", file_path,
             "-c", "copy",  # Copy codec (fast processing)
             "-map", "0",
             "-segment_time", str(segment_time),
             "-f", "segment",
             "-reset_timestamps", "1",
+            *segment_list_args,
             output_pattern
         ]
 
+    @staticmethod
+    def _mux_command(ffmpeg_path, video_path, audio_path, processed_clip):
+        """FFmpeg command that replaces a clip's audio track with its narration."""
+        return [
+            ffmpeg_path,
+            "-y",  # ✅ Forces overwrite to prevent FFmpeg from waiting for input
+            "-i", video_path,        # Input video
+            "-i", audio_path,        # Input audio
+            "-map", "0:v:0",         # Use first video stream
+            "-map", "1:a:0",         # Use first audio stream
+            "-c:v", "libx264",       # Video codec
+            "-preset", "ultrafast",  # Fast processing
+            "-c:a", "aac",           # Audio codec
+            "-b:a", "192k",          # High-quality audio bitrate
+            "-strict", "experimental",
+            "-shortest",             # Trim video if longer
+            "-vf", "tpad=stop_mode=clone:stop_duration=5",  # Freeze last frame if audio is longer
+            processed_clip
+        ]
+
+    @staticmethod
+    def _concat_command(ffmpeg_path, concat_list_path, file_path):
+        """FFmpeg command that concatenates the clips listed in `concat_list_path`."""
+        return [
+            ffmpeg_path,
+            "-y",  # ✅ Forces overwrite to prevent FFmpeg from waiting for input
+            "-f", "concat",
+            "-safe", "0",
+            "-i", concat_list_path,
+            "-c", "copy",
+            file_path
+        ]
+
+    @staticmethod
+    def _narration_audio_path(clip_path, output_dir=None):
+        """Path of a clip's narration: next to the clip, or in `output_dir` if given."""
+        if output_dir:
+            os.makedirs(output_dir, exist_ok=True)  # Ensure directory exists
+            audio_filename = os.path.basename(clip_path).replace(".mp4", ".mp3")
+            return os.path.join(output_dir, audio_filename)
+        return clip_path.replace(".mp4", ".mp3")
+
+    @staticmethod
+    def _summary_script_prompt(df_clips, instructions):
+        """
+        Returns the (prompt, system instructions, context, cache key) sent by `generate_summary_script`.
+        The clip descriptions are the shared context; the cache key identifies them.
+        """
+        # Convert DataFrame to compact JSON for the AI model
+        clips_string = MovieAI._compact_json(df_clips)
+        cache_key = "summary_script:" + PromptLayout.fingerprint([{"role": "system", "content": clips_string}])
+        return instructions, SUMMARY_SCRIPT_FORMAT, clips_string, cache_key
+
+    @staticmethod
+    def _compact_json(df):
+        """
+        Serializes DataFrame rows as a JSON list without indentation, escaped slashes or
+        ASCII escapes, which take a large share of the prompt tokens of `to_json(indent=4)`.
+        """
+        return json.dumps(df.to_dict(orient="records"), ensure_ascii=False, separators=(",", ":"), default=str)
+
+    @staticmethod
+    def _windows(df_clips, window_size):
+        """Splits the clips into consecutive windows of `window_size` rows."""
+        return [df_clips.iloc[start:start + window_size] for start in range(0, len(df_clips), window_size)]
+
+    @staticmethod
+    def _window_summary_prompt(df_window, instructions, clips_per_window):
+        """Returns the (prompt, system instructions, context) that summarize one window of clips."""
+        prompt = (f"The summary video should follow these instructions: {instructions}\n"
+                  f"Pick at most {clips_per_window} clips of this section.")
+        return prompt, WINDOW_SUMMARY_FORMAT, MovieAI._compact_json(df_window)
+
+    @staticmethod
+    def _evenly_spaced(items, n):
+        """Up to `n` items spread evenly over `items`, first and last included."""
+        if len(items) <= n:
+            return list(items)
+        if n <= 1:
+            return list(items[:n])
+        return [items[round(i * (len(items) - 1) / (n - 1))] for i in range(n)]
+
+    @staticmethod
+    def _parse_window_summary(response, df_window, clips_per_window):
+        """
+        Parses a window summary into (summary, clip_paths) with at most `clips_per_window`
+        clip paths, so the final prompt stays bounded. Clip paths that are not in the
+        window are dropped; if none is left (or the response cannot be parsed), evenly
+        spaced clips of the window are kept as candidates.
+        """
+        fallback = MovieAI._evenly_spaced(list(df_window["clip_path"]), clips_per_window)
+        result = parse_json_response(response)
+        if not isinstance(result, dict):
+            print("⚠️ Window summary is not a JSON object; keeping evenly spaced clips as candidates.")
+            return "", fallback
+        summary = str(result.get("summary", ""))
+        schema = MovieAI._summary_script_schema(df_window)
+        clip_paths = result.get("clip_paths")
+        matches = [schema.match_choice("clip_path", path) for path in clip_paths] if isinstance(clip_paths, list) else []
+        clip_paths = list(dict.fromkeys(path for path in matches if path is not None))
+        return summary, clip_paths[:clips_per_window] or fallback
+
+    @staticmethod
+    def _sectioned_script_prompt(df_candidates, summaries, instructions):
+        """Returns the (prompt, system instructions, context) of the final hierarchical step."""
+        sections = "\n".join(f"Section {i + 1}: {summary}" for i, summary in enumerate(summaries) if summary)
+        context = f"{sections}\n\nCandidate clips:\n{MovieAI._compact_json(df_candidates)}"
+        return instructions, SECTIONED_SUMMARY_SCRIPT_FORMAT, context
+
+    @staticmethod
+    def _summary_script_schema(df_clips):
+        """Schema of a summary script: entries with a narration and a clip_path from `df_clips`."""
+        return ListSchema("script", {"clip_path": str, "narration": str},
+                          choices={"clip_path": df_clips["clip_path"].tolist()}, aliases=SCRIPT_ALIASES)
+
+    @staticmethod
+    def _script_dataframe(records):
+        """Converts validated script records into a ["clip_path", "narration"] DataFrame (or `False`)."""
+        import pandas as pd
+
+        if records is False:
+            return False
+        return pd.DataFrame(records, columns=["clip_path", "narration"])
+
+    def split_video(self, file_path: str, output_directory: str, segment_time: int = 60) -> None:
+        """
+        Splits a video file into multiple clips of specified duration using FFmpeg.
+        If the output directory exists, it clears all files before saving new clips.
+
+        Parameters:
+        ----------
+        file_path : str
+            Path to the input video file.
+        output_directory : str
+            Directory to save the output clips. If it exists, all existing files inside will be deleted.
+        segment_time : int, optional
+            Duration (in seconds) of each clip (default: 60 seconds).
+
+        Returns:
+        -------
+        None
+
+        Notes:
+        -----
+        The start and end time of each clip are written to `segments.csv` in `output_directory`
+        (see `sample_clip_frames`). Clips start at keyframes, so they can be slightly longer
+        than `segment_time`.
+        """
+
+        # Ensure input file exists
+        if not os.path.exists(file_path):
+            raise FileNotFoundError(f"❌ Error: The input file '{file_path}' does not exist.")
+
+        # Delete all existing files in output directory (if it exists) and recreate it
+        self._clear_directory(output_directory)
+
+        # FFmpeg command
+        command = self._split_command(self.ffmpeg_path, file_path, output_directory, segment_time,
+                                      os.path.join(output_directory, SEGMENT_LIST_NAME))
+
         # Run FFmpeg
         try:
             print(f"🎬 Splitting video into {segment_time}-second clips...")
-            subprocess.run(command, check=True, stdout=subprocess.PIPE, stderr=subprocess.PIPE)
+            with self.metrics.track(type(self).__name__, "ffmpeg.split") as call:
+                call.request_bytes = os.path.getsize(file_path)
+                subprocess.run(command, check=True, stdout=subprocess.PIPE, stderr=subprocess.PIPE)
             print(f"✅ Video successfully split into clips at '{output_directory}'.")
         except subprocess.CalledProcessError as e:
             print(f"❌ Error: FFmpeg encountered an issue.\n{e.stderr.decode('utf-8')}")
 
 
 
-    def generate_clip_descriptions(self, clip_paths, instructions_base="", model = 'gpt-4o-mini', verbose = False):
+    @staticmethod
+    def segment_boundaries(output_directory):
+        """
+        Reads the clips written by `split_video` and their (start, end) times in the source.
+
+        Returns:
+        -------
+        tuple
+            (clip_paths, boundaries): the clip paths in order and one (start, end) tuple in
+            seconds per clip.
+        """
+        import csv
+
+        clip_paths, boundaries = [], []
+        with open(os.path.join(output_directory, SEGMENT_LIST_NAME), newline="") as f:
+            for name, start, end in csv.reader(f):
+                clip_paths.append(os.path.join(output_directory, name))
+                boundaries.append((float(start), float(end)))
+        return clip_paths, boundaries
+
+    def sample_clip_frames(self, file_path, output_directory, max_samples=10, max_width=None, max_workers=None,
+                           max_request_bytes=MAX_VISION_REQUEST_BYTES):
+        """
+        Samples the frames of all clips written by `split_video` in a single decoding pass
+        of the source video (see `scripts.frames.FrameSampler`), instead of opening and
+        decoding every clip in `generate_video_description`.
+
+        Parameters:
+        ----------
+        file_path : str
+            The source video that was passed to `split_video`.
+        output_directory : str
+            The directory of the clips (with the `segments.csv` written by `split_video`).
+        max_samples : int, optional (default=10)
+            Maximum number of frames per clip (`generate_clip_descriptions` uses 10).
+        max_width : int, optional
+            Frames wider than this are downscaled while decoding. Defaults to the native resolution.
+        max_workers : int, optional
+            Number of JPEG encoding threads.
+        max_request_bytes : int, optional (default=MAX_VISION_REQUEST_BYTES)
+            Byte budget of one clip's frames, as in `generate_video_description`. Frames are
+            re-encoded at a lower quality or resolution to fit. `None` disables it.
+
+        Returns:
+        -------
+        dict
+            Maps each (normalized) clip path to its (base64 frames, nframes, fps), ready for the
+            `frame_samples` parameter of `generate_clip_descriptions`.
+        """
+        clip_paths, boundaries = MovieAI.segment_boundaries(output_directory)
+        sampler = FrameSampler(self.ffmpeg_path, max_width=max_width, max_workers=max_workers, metrics=self.metrics,
+                               max_frame_bytes=self._frame_byte_budget(max_request_bytes, max_samples))
+        print(f"🎞️ Sampling frames of {len(clip_paths)} clips in one pass over '{file_path}'...")
+        samples = sampler.sample(file_path, boundaries, max_samples=max_samples)
+        return {os.path.normpath(clip_path): sample for clip_path, sample in zip(clip_paths, samples)}
+
+    def generate_clip_descriptions(self, clip_paths, instructions_base="", model = 'gpt-4o-mini', verbose = False,
+                                   frame_samples=None):
         """
         Generates a detailed description of each movie clip in `clip_paths`.
 
@@ -119,6 +367,9 @@ class MovieAI(GenAI):
             LLM model to use for generating descriptions (default: 'gpt-4o-mini').
         verbose : bool, optional
             Whether to display the descriptions as they are generated (default: False).
+        frame_samples : dict, optional
+            Frames sampled beforehand by `sample_clip_frames`, keyed by clip path. Clips that
+            are not in it are decoded individually.
 
         Returns:
         -------
@@ -128,6 +379,9 @@ class MovieAI(GenAI):
             If no clips are successfully processed, returns `False`.
         """
 
+        import pandas as pd
+        from tqdm.auto import tqdm  # Ensures compatibility in Jupyter and Colab
+
         dict_list = []
         description = "This is the first clip, so no previous scene."
 
@@ -143,7 +397,8 @@ class MovieAI(GenAI):
                     clip_path, 
                     instructions, 
                     max_samples=10, 
-                    model=model
+                    model=model,
+                    frames=frame_samples.get(os.path.normpath(clip_path)) if frame_samples else None
                 )
                 if verbose:
                     print(f"📝 Description for {clip_path}: {description}")
@@ -159,10 +414,16 @@ class MovieAI(GenAI):
 
                 
 
-    def generate_summary_script(self, df_clips, instructions, model='gpt-4o-mini'):
+    def generate_summary_script(self, df_clips, instructions, model='gpt-4o-mini', window_size=None,
+                                clips_per_window=5, max_workers=8, max_fix_calls=2):
         """
         Generates a script for a summary video based on clip descriptions.
 
+        For long videos, set `window_size`: the clips are then summarized in windows of
+        `window_size` consecutive clips (concurrently), each window shortlists at most
+        `clips_per_window` clips, and the script is written from the window summaries and
+        the shortlist. This keeps every prompt small regardless of the video length.
+
         Parameters:
         ----------
         df_clips : pd.DataFrame
@@ -171,6 +432,17 @@ class MovieAI(GenAI):
             Additional guidance for selecting clips and structuring the summary video.
         model : str, optional (default='gpt-4o-mini')
             The OpenAI model used for text generation.
+        window_size : int, optional
+            Number of clips per window in hierarchical mode. `None` (default) sends all
+            clips in a single prompt.
+        clips_per_window : int, optional (default=5)
+            Maximum number of clips each window shortlists in hierarchical mode.
+        max_workers : int, optional (default=8)
+            Number of windows summarized concurrently in hierarchical mode.
+        max_fix_calls : int, optional (default=2)
+            Maximum number of follow-up requests that correct invalid script entries. The
+            response is repaired locally first (see `scripts.structured_output`), and only
+            entries with a missing narration or an unknown clip_path are sent back.
 
         Returns:
         -------
@@ -180,44 +452,57 @@ class MovieAI(GenAI):
         """
 
         try:
-            # Convert DataFrame to JSON format for the AI model
-            clips_string = df_clips.to_json(orient="records", indent=4)    
+            if window_size and len(df_clips) > window_size:
+                return self._generate_sectioned_summary_script(df_clips, instructions, model, window_size,
+                                                               clips_per_window, max_workers, max_fix_calls)
+
+            prompt, system_instructions, clips_string, cache_key = self._summary_script_prompt(df_clips, instructions)
             print(f"Generating script for summary video using {model}...\n")
-            #add JSON formatting to the instructions
-            instructions += """Return your answer as a JSON object with the format
-            {"script":[
-                        {'clip_path': path of the video clip file,
-                        'narration': text of the narration for the clip in the summary video},...
-                        ]
-            }."""
-            # Generate script using AI
-            script = self.generate_text(
-                prompt=instructions,
-                instructions=clips_string,  
+            # Generate script using AI: format and clips form the cached prefix, the task comes last
+            records = StructuredOutput(self, max_fix_calls=max_fix_calls).generate(
+                prompt=prompt,
+                instructions=system_instructions,
+                schema=self._summary_script_schema(df_clips),
+                context=clips_string,
+                cache_key=cache_key,
                 model=model,
-                output_type="json_object",
             )
 
-            # Parse the generated script JSON safely
-            script_json = json.loads(script)  # Use json.loads instead of ast.literal_eval
-
-            # Ensure the key "script" exists in the response
-            if "script" not in script_json:
-                print("❌ Error: Response does not contain 'script' key.")
-                return False
+            return self._script_dataframe(records)
 
-            # Convert JSON to DataFrame
-            df_summary_script = pd.DataFrame(script_json["script"])
-
-            return df_summary_script
-
-        except json.JSONDecodeError:
-            print("❌ Error: Failed to parse AI-generated script response as JSON.")
         except Exception as e:
             print(f"❌ Unexpected error: {e}")
 
         return False  # Return False if anything fails
 
+    def _generate_sectioned_summary_script(self, df_clips, instructions, model, window_size, clips_per_window, max_workers,
+                                           max_fix_calls=2):
+        """Hierarchical mode of `generate_summary_script`."""
+        from concurrent.futures import ThreadPoolExecutor
+
+        windows = self._windows(df_clips, window_size)
+        print(f"Summarizing {len(df_clips)} clips in {len(windows)} windows using {model}...")
+
+        def summarize(df_window):
+            prompt, system_instructions, context = self._window_summary_prompt(df_window, instructions, clips_per_window)
+            response = self.generate_text(prompt=prompt, instructions=system_instructions, context=context,
+                                          model=model, output_type="json_object")
+            return self._parse_window_summary(response, df_window, clips_per_window)
+
+        with ThreadPoolExecutor(max_workers=max_workers) as executor:
+            results = list(executor.map(summarize, windows))  # map keeps window order
+
+        summaries = [summary for summary, _ in results]
+        candidates = [path for _, clip_paths in results for path in clip_paths]
+        df_candidates = df_clips[df_clips["clip_path"].isin(candidates)]
+
+        print(f"Generating script from {len(df_candidates)} shortlisted clips using {model}...\n")
+        prompt, system_instructions, context = self._sectioned_script_prompt(df_candidates, summaries, instructions)
+        records = StructuredOutput(self, max_fix_calls=max_fix_calls).generate(
+            prompt=prompt, instructions=system_instructions, schema=self._summary_script_schema(df_candidates),
+            context=context, model=model)
+        return self._script_dataframe(records)
+
 
 
     def generate_audio_narrations(self, df_summary_script, voice="nova", output_dir=None):
@@ -262,12 +547,7 @@ class MovieAI(GenAI):
                 narration = row["narration"]
 
                 # Determine output path
-                if output_dir:
-                    os.makedirs(output_dir, exist_ok=True)  # Ensure directory exists
-                    audio_filename = os.path.basename(clip_path).replace(".mp4", ".mp3")
-                    audio_path = os.path.join(output_dir, audio_filename)
-                else:
-                    audio_path = clip_path.replace(".mp4", ".mp3")
+                audio_path = self._narration_audio_path(clip_path, output_dir)
 
                 # Generate audio narration
                 if self.generate_audio(narration, audio_path, voice=voice):
@@ -330,26 +610,13 @@ class MovieAI(GenAI):
             processed_clip = os.path.join(final_video_dir, f"processed_clip_{index:03d}.mp4")
             print(f"Proccessed clips will be saved in {processed_clip}")
             # FFmpeg command to replace audio and handle duration mismatches
-            command = [
-                self.ffmpeg_path,
-                "-y",  # ✅ Forces overwrite to prevent FFmpeg from waiting for input
-                "-i", video_path,        # Input video
-                "-i", audio_path,        # Input audio
-                "-map", "0:v:0",         # Use first video stream
-                "-map", "1:a:0",         # Use first audio stream
-                "-c:v", "libx264",       # Video codec
-                "-preset", "ultrafast",  # Fast processing
-                "-c:a", "aac",           # Audio codec
-                "-b:a", "192k",          # High-quality audio bitrate
-                "-strict", "experimental",
-                "-shortest",             # Trim video if longer
-                "-vf", "tpad=stop_mode=clone:stop_duration=5",  # Freeze last frame if audio is longer
-                processed_clip
-            ]
+            command = self._mux_command(self.ffmpeg_path, video_path, audio_path, processed_clip)
 
             try:
                 #print(f"🎥 Processing clips and audio")
-                subprocess.run(command, check=True, stdout=subprocess.PIPE, stderr=subprocess.PIPE)
+                with self.metrics.track(type(self).__name__, "ffmpeg.mux") as call:
+                    call.request_bytes = os.path.getsize(video_path) + os.path.getsize(audio_path)
+                    subprocess.run(command, check=True, stdout=subprocess.PIPE, stderr=subprocess.PIPE)
                 print(f"✅ Processed: {processed_clip}")
                 processed_clips.append(processed_clip)
                 processed_audios.append(audio_path)  # Track audio for deletion
@@ -368,18 +635,11 @@ class MovieAI(GenAI):
 
 
         # FFmpeg command to concatenate processed clips into final video
-        concat_command = [
-            self.ffmpeg_path,
-            "-y",  # ✅ Forces overwrite to prevent FFmpeg from waiting for input
-            "-f", "concat",
-            "-safe", "0",
-            "-i", concat_list_path,
-            "-c", "copy",
-            file_path
-        ]
+        concat_command = self._concat_command(self.ffmpeg_path, concat_list_path, file_path)
 
         try:
-            subprocess.run(concat_command, check=True, stdout=subprocess.PIPE, stderr=subprocess.PIPE)
+            with self.metrics.track(type(self).__name__, "ffmpeg.concat"):
+                subprocess.run(concat_command, check=True, stdout=subprocess.PIPE, stderr=subprocess.PIPE)
             print(f"🎬 Final movie created: {file_path}")
 
             # ✅ Cleanup: Delete processed clips and audio files after successful video creation
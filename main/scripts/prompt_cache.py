@@ -0,0 +1,174 @@
+import json
+import hashlib
+import threading
+
+
+
+# OpenAI caches prompt prefixes of at least this many tokens (in 128-token increments)
+MIN_CACHEABLE_TOKENS = 1024
+
+# Rough characters per token, used to estimate prefix length without a tokenizer
+CHARS_PER_TOKEN = 4
+
+
+
+class PromptLayout:
+    """
+    Assembles chat messages so that provider-side prompt caching can be reused.
+
+    Providers cache the longest previously seen *prefix* of a request, so the parts that
+    repeat across calls (system instructions, shared context such as a clip list) are
+    placed first, and the per-call prompt comes last. The caller's text is sent verbatim.
+    Calls that share a prefix can name it with a `cache_key`. The layout remembers the
+    prefix fingerprint of each key, warns when a call changes it (the cache misses from
+    the first changed byte on), and accumulates the cached-token counts reported in the
+    API `usage` objects.
+
+    Attributes:
+    ----------
+    warn : bool
+        Whether to print a warning when a call breaks its key's prefix.
+    min_cacheable_tokens : int
+        Prefixes shorter than this (estimated) are reported once as too short to cache.
+    """
+
+    def __init__(self, warn=True, min_cacheable_tokens=MIN_CACHEABLE_TOKENS):
+        self.warn = warn
+        self.min_cacheable_tokens = min_cacheable_tokens
+        self._prefixes = {}
+        self._stats = {}
+        self._short_warned = set()
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def normalize(text):
+        """
+        Normalizes line endings and trailing whitespace so that equal instructions built
+        in different ways (files, f-strings, notebooks on Windows) get the same fingerprint.
+        Only used for fingerprints: the messages keep the caller's text.
+        """
+        lines = str(text).replace("\r\n", "\n").replace("\r", "\n").split("\n")
+        return "\n".join(line.rstrip() for line in lines).rstrip("\n")
+
+    def build(self, prompt, instructions, context=None, history=None):
+        """
+        Orders the messages of a chat completion: stable prefix first, per-call content last.
+
+        Parameters:
+        ----------
+        prompt : str or None
+            The per-call user message. `None` adds no user message (e.g. when it is
+            already the last entry of `history`).
+        instructions : str
+            System instructions shared by all calls of a workload.
+        context : str, optional
+            Large shared context (documents, clip descriptions, ...) sent as a second
+            system message right after the instructions.
+        history : list, optional
+            Previous chat messages. They come after the prefix because they only grow by
+            appending, so earlier turns stay cacheable too.
+
+        Returns:
+        -------
+        tuple
+            (messages, prefix) where `prefix` is the list of leading system messages.
+        """
+        prefix = [{"role": "system", "content": instructions}]
+        if context is not None:
+            prefix.append({"role": "system", "content": context})
+        messages = prefix + list(history or [])
+        if prompt is not None:
+            messages.append({"role": "user", "content": prompt})
+        return messages, prefix
+
+    @classmethod
+    def fingerprint(cls, prefix):
+        """
+        Short hash of the prefix messages, with their text normalized (see `normalize`),
+        so line-ending and trailing-whitespace differences do not count as changes.
+        """
+        normalized = [dict(m, content=cls.normalize(m["content"])) if isinstance(m.get("content"), str) else m
+                      for m in prefix]
+        payload = json.dumps(normalized, ensure_ascii=False, separators=(",", ":"))
+        return hashlib.sha256(payload.encode("utf-8")).hexdigest()[:16]
+
+    def _stats_for(self, cache_key):
+        stats = self._stats.get(cache_key)
+        if stats is None:
+            stats = self._stats[cache_key] = {"calls": 0, "prompt_tokens": 0, "cached_tokens": 0,
+                                              "prefix_breaks": 0, "prefix_tokens": 0}
+        return stats
+
+    def check(self, prefix, cache_key, model=None):
+        """
+        Records the prefix used by a call with `cache_key` and warns if it differs from
+        the prefix of the previous call with the same key and model.
+
+        Returns:
+        -------
+        str
+            The prefix fingerprint.
+        """
+        fingerprint = self.fingerprint(prefix)
+        prefix_tokens = sum(len(m["content"]) for m in prefix) // CHARS_PER_TOKEN
+        with self._lock:
+            previous = self._prefixes.get((model, cache_key))
+            self._prefixes[(model, cache_key)] = fingerprint
+            stats = self._stats_for(cache_key)
+            stats["prefix_tokens"] = prefix_tokens
+            broken = previous is not None and previous != fingerprint
+            if broken:
+                stats["prefix_breaks"] += 1
+            too_short = prefix_tokens < self.min_cacheable_tokens and cache_key not in self._short_warned
+            if too_short:
+                self._short_warned.add(cache_key)
+
+        if self.warn and broken:
+            print(f"⚠️ Prompt prefix for cache key '{cache_key}' changed since the last call; "
+                  f"this call cannot reuse the cached prefix.")
+        if self.warn and too_short:
+            print(f"⚠️ Prompt prefix for cache key '{cache_key}' is about {prefix_tokens} tokens, "
+                  f"below the {self.min_cacheable_tokens} tokens needed for prompt caching.")
+        return fingerprint
+
+    def record_usage(self, cache_key, usage):
+        """
+        Adds the prompt and cached token counts of an OpenAI `usage` object to `cache_key`.
+
+        Returns:
+        -------
+        int
+            Number of prompt tokens served from the cache.
+        """
+        if usage is None:
+            return 0
+        details = getattr(usage, "prompt_tokens_details", None)
+        cached_tokens = (getattr(details, "cached_tokens", 0) or 0) if details is not None else 0
+        with self._lock:
+            stats = self._stats_for(cache_key)
+            stats["calls"] += 1
+            stats["prompt_tokens"] += getattr(usage, "prompt_tokens", 0) or 0
+            stats["cached_tokens"] += cached_tokens
+        return cached_tokens
+
+    def report(self):
+        """
+        Cache statistics per cache key.
+
+        Returns:
+        -------
+        pd.DataFrame
+            Columns: cache_key, calls, prompt_tokens, cached_tokens, cache_hit_rate
+            (cached / prompt tokens), prefix_tokens (estimated) and prefix_breaks.
+        """
+        import pandas as pd
+
+        with self._lock:
+            rows = [{"cache_key": key, **stats} for key, stats in self._stats.items()]
+        columns = ["cache_key", "calls", "prompt_tokens", "cached_tokens", "cache_hit_rate",
+                   "prefix_tokens", "prefix_breaks"]
+        if not rows:
+            return pd.DataFrame(columns=columns)
+        df = pd.DataFrame(rows)
+        df["cache_hit_rate"] = (df["cached_tokens"] / df["prompt_tokens"].where(df["prompt_tokens"] > 0)).fillna(0.0)
+        return df[columns]
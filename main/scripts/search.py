@@ -0,0 +1,492 @@
+import os
+import re
+import glob
+import json
+import pickle
+import numpy as np
+import pandas as pd
+from scripts.genai import GenAI
+
+
+
+TOKEN_PATTERN = re.compile(r"\w+(?:'\w+)?")
+PHRASE_PATTERN = re.compile(r'"([^"]+)"')
+
+# Rank constant of reciprocal rank fusion (hybrid ranking)
+RRF_K = 60
+
+
+def tokenize(text):
+    """Lowercase word tokens (apostrophes kept inside words, e.g. "don't")."""
+    return TOKEN_PATTERN.findall(str(text).lower())
+
+
+def split_passages(text, passage_words=120, overlap=20):
+    """
+    Splits a long text (e.g. a lecture transcript) into passages of `passage_words` words
+    that overlap by `overlap` words, so a match is returned with its surrounding text.
+    """
+    words = text.split()
+    step = max(1, passage_words - overlap)
+    return [" ".join(words[start:start + passage_words])
+            for start in range(0, max(1, len(words) - overlap), step)]
+
+
+
+class SearchIndex:
+    """
+    Persistent BM25 search over transcripts, debate text and tweets, with optional hybrid
+    ranking by embedding similarity.
+
+    Documents (passages of text files, or DataFrame rows) are indexed in immutable
+    segments: each `add_*` call tokenizes only the new documents and writes one segment
+    file with its positional postings, so the index is updated incrementally when files
+    are added or changed. Replaced and removed documents are marked deleted until
+    `compact` rewrites the index. Queries score the postings of the query terms with
+    NumPy, so they take milliseconds instead of a pandas scan of every text.
+
+    Quoted phrases in a query ("climate change") must appear as consecutive words, using
+    the positions stored in the postings. Metadata columns (speaker, screen_name,
+    created_at, ...) can be used as filters.
+
+    If a GenAI instance is given, documents are embedded when they are added and
+    `search(mode="hybrid")` fuses the BM25 and cosine similarity rankings (reciprocal
+    rank fusion).
+
+    Example:
+    -------
+    >>> index = SearchIndex("data/_search_index", genai=jarvis)
+    >>> index.add_files("data/lecture_transcripts/*.txt")
+    >>> index.add_csv("data/debate_biden_trump.csv", metadata_columns=["speaker"])
+    >>> index.search('"border" immigration', filters={"speaker": "TRUMP"}, k=5)
+
+    Attributes:
+    ----------
+    index_dir : str
+        Directory holding the manifest and the segment files.
+    docs : pd.DataFrame
+        One row per document (the row number is the doc ID): source, key, text and the
+        metadata columns.
+    """
+
+    MANIFEST_NAME = "_manifest.json"
+
+    def __init__(self, index_dir="data/_search_index", genai=None, embedding_model='text-embedding-3-small',
+                 k1=1.2, b=0.75):
+        """
+        Opens the index in `index_dir` (an empty index if it does not exist yet).
+
+        Parameters:
+        ----------
+        index_dir : str, optional (default="data/_search_index")
+            Directory of the index.
+        genai : GenAI, optional
+            Client used to embed documents and queries. BM25 only if `None`.
+        embedding_model : str, optional (default='text-embedding-3-small')
+            Embedding model of the documents and queries.
+        k1, b : float, optional (default=1.2, 0.75)
+            BM25 term frequency saturation and length normalization.
+        """
+        self.index_dir = index_dir
+        self.genai = genai
+        self.embedding_model = embedding_model
+        self.k1 = k1
+        self.b = b
+        self._load()
+
+    # ---- persistence ---------------------------------------------------------------
+
+    def _load(self):
+        manifest_path = os.path.join(self.index_dir, self.MANIFEST_NAME)
+        if os.path.exists(manifest_path):
+            with open(manifest_path, "r") as f:
+                self.manifest = json.load(f)
+        else:
+            self.manifest = {"sources": {}, "segments": [], "deleted": [], "next_segment": 0}
+        self.docs = pd.DataFrame(columns=["source", "key", "text"])
+        self.lengths = np.zeros(0, dtype=np.int32)
+        self.embeddings = None
+        self.has_embedding = None
+        self.postings = {}
+        for name in self.manifest["segments"]:
+            with open(os.path.join(self.index_dir, name), "rb") as f:
+                self._attach(pickle.load(f))
+        self.alive = np.ones(len(self.docs), dtype=bool)
+        self.alive[self.manifest["deleted"]] = False
+
+    def _save_manifest(self):
+        os.makedirs(self.index_dir, exist_ok=True)
+        self.manifest["deleted"] = np.flatnonzero(~self.alive).tolist()
+        with open(os.path.join(self.index_dir, self.MANIFEST_NAME), "w") as f:
+            json.dump(self.manifest, f, indent=2)
+
+    def _segment_name(self):
+        number = self.manifest.get("next_segment", len(self.manifest["segments"]))
+        self.manifest["next_segment"] = number + 1
+        return f"segment_{number:06d}.pkl"
+
+    def _attach(self, segment):
+        """Adds a loaded or new segment to the in-memory index."""
+        base = len(self.docs)
+        self.docs = segment["docs"] if base == 0 else pd.concat([self.docs, segment["docs"]], ignore_index=True)
+        self.lengths = np.concatenate([self.lengths, segment["lengths"]])
+        for term, (ids, tfs, positions) in segment["postings"].items():
+            self.postings.setdefault(term, []).append((ids + base, tfs, np.concatenate([[0], np.cumsum(tfs)]), positions))
+
+        n = len(segment["docs"])
+        embeddings = segment.get("embeddings")
+        if embeddings is None and self.embeddings is None:
+            return
+        if self.embeddings is None:
+            self.embeddings = np.zeros((base, embeddings.shape[1]), dtype=np.float32)
+        if embeddings is None:
+            embeddings = np.zeros((n, self.embeddings.shape[1]), dtype=np.float32)
+        self.embeddings = np.concatenate([self.embeddings, embeddings])
+        self.has_embedding = self.embeddings.any(axis=1)
+
+    @staticmethod
+    def _build_segment(docs):
+        """Tokenizes documents into positional postings: term -> (doc ids, tfs, positions)."""
+        postings = {}
+        lengths = np.zeros(len(docs), dtype=np.int32)
+        for doc_id, text in enumerate(docs["text"]):
+            term_positions = {}
+            tokens = tokenize(text)
+            for position, token in enumerate(tokens):
+                term_positions.setdefault(token, []).append(position)
+            lengths[doc_id] = len(tokens)
+            for term, positions in term_positions.items():
+                postings.setdefault(term, []).append((doc_id, positions))
+        arrays = {}
+        for term, entries in postings.items():
+            arrays[term] = (
+                np.array([doc_id for doc_id, _ in entries], dtype=np.int64),
+                np.array([len(positions) for _, positions in entries], dtype=np.int32),
+                np.array([p for _, positions in entries for p in positions], dtype=np.int32),
+            )
+        return {"docs": docs.reset_index(drop=True), "lengths": lengths, "postings": arrays}
+
+    def _embed(self, texts):
+        vectors = np.asarray(self.genai.get_embeddings(list(texts), model=self.embedding_model), dtype=np.float32)
+        return vectors / np.maximum(np.linalg.norm(vectors, axis=1, keepdims=True), 1e-12)
+
+    def _add_docs(self, docs):
+        """Indexes a DataFrame of new documents (source, key, text, metadata) as one segment."""
+        if docs.empty:
+            return 0
+        segment = self._build_segment(docs)
+        if self.genai is not None:
+            segment["embeddings"] = self._embed(segment["docs"]["text"])
+        name = self._segment_name()
+        os.makedirs(self.index_dir, exist_ok=True)
+        with open(os.path.join(self.index_dir, name), "wb") as f:
+            pickle.dump(segment, f, protocol=pickle.HIGHEST_PROTOCOL)
+        self.manifest["segments"].append(name)
+        self._attach(segment)
+        self.alive = np.concatenate([self.alive, np.ones(len(docs), dtype=bool)])
+        return len(docs)
+
+    def delete_source(self, source):
+        """Marks every document of `source` as deleted."""
+        self.alive[(self.docs["source"] == source).to_numpy()] = False
+        self.manifest["sources"].pop(source, None)
+        self._save_manifest()
+
+    # ---- adding documents ----------------------------------------------------------
+
+    @staticmethod
+    def read_document(file_path):
+        """Text of a .pdf (`GenAI.read_pdf`), .docx (`GenAI.read_docx`) or plain text file."""
+        extension = os.path.splitext(file_path)[1].lower()
+        if extension == ".pdf":
+            return GenAI.read_pdf(file_path)
+        if extension == ".docx":
+            return GenAI.read_docx(file_path)
+        with open(file_path, "r", encoding="utf-8") as f:
+            return f.read()
+
+    def add_files(self, pattern="data/lecture_transcripts/*.txt", passage_words=120, overlap=20, verbose=False):
+        """
+        Indexes the passages of documents (.txt, .pdf or .docx, see `read_document`),
+        e.g. transcripts or the documents an agent is grounded on. Files whose size and
+        modification time are unchanged since they were indexed are skipped; changed files
+        are re-indexed and files that no longer exist are removed from the index.
+
+        Parameters:
+        ----------
+        pattern : str, optional
+            Glob pattern of the files.
+        passage_words, overlap : int, optional (default=120, 20)
+            Passage length and overlap in words (see `split_passages`).
+        verbose : bool, optional
+            Whether to print the files that are (re)indexed.
+
+        Returns:
+        -------
+        int
+            Number of passages added.
+        """
+        frames = []
+        file_paths = sorted(glob.glob(pattern))
+        for file_path in file_paths:
+            source = os.path.abspath(file_path)
+            stat = os.stat(file_path)
+            signature = f"{stat.st_size}:{stat.st_mtime}"
+            if self.manifest["sources"].get(source) == signature:
+                continue
+            if source in self.manifest["sources"]:
+                self.alive[(self.docs["source"] == source).to_numpy()] = False
+            passages = split_passages(self.read_document(file_path), passage_words, overlap)
+            frames.append(pd.DataFrame({"source": source, "key": [str(i) for i in range(len(passages))],
+                                        "text": passages, "file": os.path.basename(file_path)}))
+            self.manifest["sources"][source] = signature
+            if verbose:
+                print(f"✅ Indexing {file_path} ({len(passages)} passages)")
+
+        # Drop files matching the pattern that were removed from disk
+        directory = os.path.abspath(os.path.dirname(pattern))
+        for source in [s for s in self.manifest["sources"] if s.startswith(directory) and not os.path.exists(s)]:
+            self.alive[(self.docs["source"] == source).to_numpy()] = False
+            self.manifest["sources"].pop(source)
+            if verbose:
+                print(f"🗑️ Removed {source} from the index")
+
+        added = self._add_docs(pd.concat(frames, ignore_index=True)) if frames else 0
+        self._save_manifest()
+        return added
+
+    def add_dataframe(self, df, source, text_column="text", id_column=None, metadata_columns=None):
+        """
+        Indexes the rows of a DataFrame, e.g. tweets or a debate transcript.
+
+        With `id_column`, rows whose ID is already indexed under `source` are skipped, so
+        a refreshed tweet export only indexes its new tweets. Without it, the source is
+        replaced whenever its content changes.
+
+        Parameters:
+        ----------
+        df : pd.DataFrame
+            The documents.
+        source : str
+            Name of the collection, e.g. "tweets" or a file path.
+        text_column : str, optional (default="text")
+            Column with the text to index.
+        id_column : str, optional
+            Column with a unique ID per row, e.g. "tweet_id".
+        metadata_columns : list of str, optional
+            Columns stored with the documents and usable as filters, e.g. ["screen_name", "created_at"].
+
+        Returns:
+        -------
+        int
+            Number of documents added.
+        """
+        metadata_columns = list(metadata_columns or [])
+        if id_column is not None:
+            keys = df[id_column].astype(str)
+            indexed = set(self.docs.loc[(self.docs["source"] == source).to_numpy() & self.alive, "key"])
+            df, keys = df[~keys.isin(indexed).to_numpy()], keys[~keys.isin(indexed).to_numpy()]
+            self.manifest["sources"].setdefault(source, "incremental")
+        else:
+            signature = str(pd.util.hash_pandas_object(df[[text_column] + metadata_columns], index=False).sum())
+            if self.manifest["sources"].get(source) == signature:
+                return 0
+            self.alive[(self.docs["source"] == source).to_numpy()] = False
+            self.manifest["sources"][source] = signature
+            keys = pd.Series(range(len(df)), index=df.index).astype(str)
+
+        docs = df[metadata_columns].copy()
+        docs.insert(0, "text", df[text_column].fillna("").astype(str))
+        docs.insert(0, "key", keys.to_numpy())
+        docs.insert(0, "source", source)
+        added = self._add_docs(docs)
+        self._save_manifest()
+        return added
+
+    def add_csv(self, file_path, text_column="text", id_column=None, metadata_columns=None, **read_csv_kwargs):
+        """
+        Indexes the rows of a CSV file (e.g. `data/debate_biden_trump.csv` with
+        metadata_columns=["speaker"]). The file is read only if it changed since it was indexed.
+
+        Returns:
+        -------
+        int
+            Number of documents added.
+        """
+        stat = os.stat(file_path)
+        signature_key = f"file:{os.path.abspath(file_path)}"
+        signature = f"{stat.st_size}:{stat.st_mtime}"
+        if self.manifest["sources"].get(signature_key) == signature:
+            return 0
+        df = pd.read_csv(file_path, **read_csv_kwargs)
+        added = self.add_dataframe(df, os.path.abspath(file_path), text_column, id_column, metadata_columns)
+        self.manifest["sources"][signature_key] = signature
+        self._save_manifest()
+        return added
+
+    def compact(self):
+        """
+        Rewrites the index as a single segment without the deleted documents. Embeddings
+        are kept, so no API call is made.
+        """
+        keep = np.flatnonzero(self.alive)
+        docs = self.docs.iloc[keep].reset_index(drop=True)
+        embeddings = self.embeddings[keep] if self.embeddings is not None else None
+        old_segments = list(self.manifest["segments"])
+
+        segment = self._build_segment(docs)
+        if embeddings is not None:
+            segment["embeddings"] = embeddings
+        name = self._segment_name()
+        with open(os.path.join(self.index_dir, name), "wb") as f:
+            pickle.dump(segment, f, protocol=pickle.HIGHEST_PROTOCOL)
+        self.manifest["segments"] = [name]
+        self.manifest["deleted"] = []
+        with open(os.path.join(self.index_dir, self.MANIFEST_NAME), "w") as f:
+            json.dump(self.manifest, f, indent=2)
+        for old in old_segments:
+            os.remove(os.path.join(self.index_dir, old))
+        self._load()
+
+    # ---- queries -------------------------------------------------------------------
+
+    def _filter_mask(self, filters):
+        """Boolean mask of the live documents matching `filters`."""
+        mask = self.alive.copy()
+        for column, value in (filters or {}).items():
+            if column not in self.docs.columns:
+                return np.zeros(len(self.docs), dtype=bool)
+            values = self.docs[column]
+            if callable(value):
+                mask &= np.asarray(value(values), dtype=bool)
+            elif isinstance(value, (list, tuple, set)):
+                mask &= values.isin(list(value)).to_numpy()
+            else:
+                mask &= (values == value).to_numpy()
+        return mask
+
+    def _term_postings(self, term):
+        """All postings of a term: (doc ids, tfs)."""
+        segments = self.postings.get(term, [])
+        if not segments:
+            return np.zeros(0, dtype=np.int64), np.zeros(0, dtype=np.int32)
+        return (np.concatenate([ids for ids, _, _, _ in segments]),
+                np.concatenate([tfs for _, tfs, _, _ in segments]))
+
+    def _positions(self, term, doc_id):
+        for ids, _, offsets, positions in self.postings.get(term, []):
+            i = np.searchsorted(ids, doc_id)
+            if i < len(ids) and ids[i] == doc_id:
+                return positions[offsets[i]:offsets[i + 1]]
+        return np.zeros(0, dtype=np.int32)
+
+    def _phrase_mask(self, phrase, mask):
+        """Restricts `mask` to the documents containing the words of `phrase` in order."""
+        terms = tokenize(phrase)
+        if not terms:
+            return mask
+        candidates = mask.copy()
+        for term in terms:
+            ids, _ = self._term_postings(term)
+            present = np.zeros(len(mask), dtype=bool)
+            present[ids] = True
+            candidates &= present
+        result = np.zeros(len(mask), dtype=bool)
+        for doc_id in np.flatnonzero(candidates):
+            starts = set(self._positions(terms[0], doc_id).tolist())
+            for offset, term in enumerate(terms[1:], start=1):
+                starts &= {p - offset for p in self._positions(term, doc_id).tolist()}
+                if not starts:
+                    break
+            result[doc_id] = bool(starts)
+        return result
+
+    def bm25_scores(self, query, mask=None):
+        """
+        BM25 score of every document for `query` (0 for documents outside `mask` or
+        without a query term). Quoted phrases must match exactly.
+        """
+        mask = self.alive if mask is None else mask
+        for phrase in PHRASE_PATTERN.findall(query):
+            mask = self._phrase_mask(phrase, mask)
+        scores = np.zeros(len(self.docs), dtype=np.float64)
+        n_docs = int(mask.sum())
+        if n_docs == 0:
+            return scores
+        avgdl = max(float(self.lengths[mask].mean()), 1.0)
+        for term in set(tokenize(query)):
+            ids, tfs = self._term_postings(term)
+            keep = mask[ids]
+            ids, tfs = ids[keep], tfs[keep].astype(np.float64)
+            if len(ids) == 0:
+                continue
+            idf = np.log(1 + (n_docs - len(ids) + 0.5) / (len(ids) + 0.5))
+            norm = self.k1 * (1 - self.b + self.b * self.lengths[ids] / avgdl)
+            scores[ids] += idf * tfs * (self.k1 + 1) / (tfs + norm)
+        return scores
+
+    def vector_scores(self, query, mask=None):
+        """Cosine similarity of every document to the query embedding (-inf outside `mask`)."""
+        if self.embeddings is None or self.genai is None:
+            raise ValueError("Vector search needs a GenAI instance and embedded documents.")
+        mask = self.alive if mask is None else mask
+        q = self._embed([query])[0]
+        scores = self.embeddings @ q
+        scores[~mask | ~self.has_embedding] = -np.inf
+        return scores
+
+    @staticmethod
+    def _top(scores, k, mask):
+        candidates = np.flatnonzero(mask)
+        if len(candidates) > k:
+            candidates = candidates[np.argpartition(-scores[candidates], k - 1)[:k]]
+        return candidates[np.argsort(-scores[candidates], kind="stable")]
+
+    def search(self, query, k=10, filters=None, mode="bm25", candidates=100):
+        """
+        Finds the documents most relevant to a query.
+
+        Parameters:
+        ----------
+        query : str
+            Words to search for. Quoted phrases must appear as consecutive words.
+        k : int, optional (default=10)
+            Number of results.
+        filters : dict, optional
+            Column -> value, list of values, or function of the column returning a boolean
+            mask, e.g. {"speaker": ["TRUMP", "BIDEN"]} or
+            {"created_at": lambda s: pd.to_datetime(s) >= "2024-06-01"}.
+        mode : str, optional (default="bm25")
+            "bm25", "vector" (embedding similarity) or "hybrid" (reciprocal rank fusion of
+            the top `candidates` of both rankings).
+        candidates : int, optional (default=100)
+            Depth of each ranking fused in hybrid mode.
+
+        Returns:
+        -------
+        pd.DataFrame
+            The top `k` documents, best first, with their doc_id, score, source, key, text
+            and metadata.
+        """
+        mask = self._filter_mask(filters)
+        if mode == "bm25":
+            scores = self.bm25_scores(query, mask)
+            top = self._top(scores, k, mask & (scores > 0))
+        elif mode == "vector":
+            scores = self.vector_scores(query, mask)
+            top = self._top(scores, k, np.isfinite(scores))
+        elif mode == "hybrid":
+            bm25 = self.bm25_scores(query, mask)
+            vector = self.vector_scores(query, mask)
+            scores = np.zeros(len(self.docs), dtype=np.float64)
+            for ranking in (self._top(bm25, candidates, mask & (bm25 > 0)),
+                            self._top(vector, candidates, np.isfinite(vector))):
+                scores[ranking] += 1 / (RRF_K + np.arange(1, len(ranking) + 1))
+            top = self._top(scores, k, scores > 0)
+        else:
+            raise ValueError(f"Unknown search mode: {mode}")
+
+        results = self.docs.iloc[top].copy()
+        results.insert(0, "score", scores[top])
+        results.insert(0, "doc_id", top)
+        return results.reset_index(drop=True)
@@ -0,0 +1,231 @@
+import os
+import numpy as np
+import pandas as pd
+from concurrent.futures import ProcessPoolExecutor
+from tqdm.auto import tqdm  # Ensures compatibility in Jupyter and Colab
+
+
+
+class SentimentScorer:
+    """
+    Batched CPU sentiment scoring of tweet text with a transformers classifier.
+
+    Texts are tokenized once, sorted by length and grouped into batches under a token
+    budget, so short tweets are not padded to the length of the longest one. Inference
+    runs under `torch.inference_mode`, optionally on an int8 dynamically quantized model,
+    and can be sharded across worker processes. Scores are cached by tweet_id so a refresh
+    of an export only scores new tweets.
+
+    The score of a text is P(positive) - P(negative), a float in [-1, 1].
+
+    Attributes:
+    ----------
+    model_name : str
+        Hugging Face model used for classification.
+    cache_path : str or None
+        CSV file with columns ["tweet_id", "sentiment"] holding previously computed scores.
+    """
+
+    def __init__(self, model_name="cardiffnlp/twitter-roberta-base-sentiment-latest", quantize=False,
+                 max_length=128, max_batch_tokens=8192, max_batch_size=256, cache_path=None, num_threads=None):
+        """
+        Initializes the scorer. The model is loaded on first use.
+
+        Parameters:
+        ----------
+        model_name : str, optional
+            Hugging Face sentiment model (default: 'cardiffnlp/twitter-roberta-base-sentiment-latest').
+        quantize : bool, optional (default=False)
+            Apply int8 dynamic quantization to the model's Linear layers. Faster on CPU with
+            a small loss in accuracy.
+        max_length : int, optional (default=128)
+            Texts are truncated to this many tokens.
+        max_batch_tokens : int, optional (default=8192)
+            Upper bound on (batch size x padded length) for each batch.
+        max_batch_size : int, optional (default=256)
+            Upper bound on the number of texts in a batch.
+        cache_path : str, optional
+            CSV file where scores are cached by tweet_id. No caching if `None`.
+        num_threads : int, optional
+            Number of torch intra-op threads. Uses the torch default if `None`.
+        """
+        self.model_name = model_name
+        self.quantize = quantize
+        self.max_length = max_length
+        self.max_batch_tokens = max_batch_tokens
+        self.max_batch_size = max_batch_size
+        self.cache_path = cache_path
+        self.num_threads = num_threads
+        self.tokenizer = None
+        self.model = None
+
+    def load_model(self):
+        """
+        Loads the tokenizer and model (quantizing the model if requested).
+        """
+        if self.model is not None:
+            return
+        import torch
+        from transformers import AutoTokenizer, AutoModelForSequenceClassification
+
+        if self.num_threads:
+            torch.set_num_threads(self.num_threads)
+        self.tokenizer = AutoTokenizer.from_pretrained(self.model_name)
+        model = AutoModelForSequenceClassification.from_pretrained(self.model_name)
+        model.eval()
+        if self.quantize:
+            model = torch.quantization.quantize_dynamic(model, {torch.nn.Linear}, dtype=torch.qint8)
+        self.model = model
+
+        # Locate the negative and positive classes from the model's labels
+        labels = {i: label.lower() for i, label in model.config.id2label.items()}
+        self.negative_index = next((i for i, l in labels.items() if l.startswith("neg")), 0)
+        self.positive_index = next((i for i, l in labels.items() if l.startswith("pos")), len(labels) - 1)
+
+    def _make_batches(self, lengths):
+        """Groups text indices, sorted by token length, into batches under the token budget."""
+        order = np.argsort(lengths, kind="stable")
+        batches = []
+        batch = []
+        batch_max_len = 0
+        for idx in order:
+            length = lengths[idx]
+            new_max_len = max(batch_max_len, length)
+            if batch and (new_max_len * (len(batch) + 1) > self.max_batch_tokens or len(batch) >= self.max_batch_size):
+                batches.append(batch)
+                batch = []
+                new_max_len = length
+            batch.append(idx)
+            batch_max_len = new_max_len
+        if batch:
+            batches.append(batch)
+        return batches
+
+    def score_texts(self, texts, verbose=False):
+        """
+        Scores a list of texts.
+
+        Parameters:
+        ----------
+        texts : list of str
+            Texts to score. Missing values are scored as empty strings.
+        verbose : bool, optional (default=False)
+            Whether to show a progress bar over batches.
+
+        Returns:
+        -------
+        np.ndarray
+            Sentiment scores in [-1, 1], in the same order as `texts`.
+        """
+        import torch
+
+        self.load_model()
+        # pd.isna also catches pd.NA and NaT, which str() would turn into "<NA>" and "NaT"
+        texts = [t if isinstance(t, str) else "" if pd.isna(t) else str(t) for t in texts]
+        if not texts:
+            return np.array([], dtype=np.float32)
+
+        encodings = self.tokenizer(texts, truncation=True, max_length=self.max_length)["input_ids"]
+        lengths = np.array([len(ids) for ids in encodings])
+        scores = np.empty(len(texts), dtype=np.float32)
+
+        batches = self._make_batches(lengths)
+        with torch.inference_mode():
+            for batch in tqdm(batches, desc="Scoring sentiment", unit="batch", disable=not verbose):
+                features = self.tokenizer.pad({"input_ids": [encodings[i] for i in batch]}, return_tensors="pt")
+                logits = self.model(**features).logits
+                probs = torch.softmax(logits, dim=-1)
+                batch_scores = probs[:, self.positive_index] - probs[:, self.negative_index]
+                scores[batch] = batch_scores.numpy()
+        return scores
+
+    def _load_cache(self):
+        if not self.cache_path or not os.path.exists(self.cache_path):
+            return pd.DataFrame({"tweet_id": pd.Series(dtype="int64"), "sentiment": pd.Series(dtype="float64")})
+        return pd.read_csv(self.cache_path, dtype={"tweet_id": "int64", "sentiment": "float64"})
+
+    def _save_cache(self, df_cache):
+        cache_dir = os.path.dirname(os.path.abspath(self.cache_path))
+        os.makedirs(cache_dir, exist_ok=True)
+        df_cache.to_csv(self.cache_path, index=False)
+
+    def score_dataframe(self, df, text_column="text", id_column="tweet_id", n_jobs=1, verbose=False):
+        """
+        Adds a `sentiment` column to a TwExportly DataFrame, scoring only uncached tweets.
+
+        Parameters:
+        ----------
+        df : pd.DataFrame
+            Tweets, e.g. from `TwExportlyLoader.read_export`. Must contain `text_column` and
+            `id_column`.
+        text_column : str, optional (default="text")
+            Column with the tweet text.
+        id_column : str, optional (default="tweet_id")
+            Column with the tweet ID used as the cache key.
+        n_jobs : int, optional (default=1)
+            Number of worker processes. With more than one, the new tweets are split into
+            shards and each process loads its own copy of the model (-1 uses all CPUs).
+        verbose : bool, optional (default=False)
+            Whether to print progress.
+
+        Returns:
+        -------
+        pd.DataFrame
+            A copy of `df` with a `sentiment` column.
+        """
+        df = df.copy()
+        df_cache = self._load_cache()
+        cached_ids = set(df_cache["tweet_id"])
+        is_new = ~df[id_column].isin(cached_ids) & ~df[id_column].duplicated()
+        df_new = df.loc[is_new, [id_column, text_column]]
+
+        if verbose:
+            print(f"Scoring {len(df_new)} new tweets ({len(df) - len(df_new)} cached)...")
+
+        if len(df_new):
+            texts = df_new[text_column].tolist()
+            if n_jobs == 1:
+                scores = self.score_texts(texts, verbose=verbose)
+            else:
+                scores = self._score_sharded(texts, n_jobs)
+            df_scored = pd.DataFrame({"tweet_id": df_new[id_column].to_numpy(), "sentiment": scores.astype("float64")})
+            df_cache = pd.concat([df_cache, df_scored], ignore_index=True)
+            if self.cache_path:
+                self._save_cache(df_cache)
+
+        sentiment_map = df_cache.drop_duplicates("tweet_id", keep="last").set_index("tweet_id")["sentiment"]
+        df["sentiment"] = df[id_column].map(sentiment_map)
+        return df
+
+    def _score_sharded(self, texts, n_jobs):
+        n_workers = os.cpu_count() if n_jobs in (None, -1) else n_jobs
+        n_workers = max(1, min(n_workers, len(texts)))
+        # Split the CPU cores between workers so they don't oversubscribe each other
+        threads_per_worker = max(1, (os.cpu_count() or 1) // n_workers)
+        config = {
+            "model_name": self.model_name,
+            "quantize": self.quantize,
+            "max_length": self.max_length,
+            "max_batch_tokens": self.max_batch_tokens,
+            "max_batch_size": self.max_batch_size,
+            "num_threads": threads_per_worker,
+        }
+        shards = [list(shard) for shard in np.array_split(np.array(texts, dtype=object), n_workers)]
+        with ProcessPoolExecutor(max_workers=n_workers, initializer=_init_worker, initargs=(config,)) as executor:
+            results = list(executor.map(_score_shard, shards))
+        return np.concatenate(results)
+
+
+
+# Per-process scorer used by the sharded mode
+_worker_scorer = None
+
+
+def _init_worker(config):
+    global _worker_scorer
+    _worker_scorer = SentimentScorer(**config)
+    _worker_scorer.load_model()
+
+
+def _score_shard(texts):
+    return _worker_scorer.score_texts(texts)
@@ -0,0 +1,452 @@
+"""
+HTTP service exposing `GenAI.generate_text`, `GenAI.get_embedding` and image descriptions,
+for Flask/gunicorn deployments.
+
+Identical requests are answered by a single upstream call:
+
+- `SingleFlight` collapses identical requests in flight in the same worker.
+- `SharedCache` is a SQLite file shared by every gunicorn worker on the host. It stores
+  answers (with a TTL) and leases, so a worker waits for the answer another worker is
+  already computing instead of calling the API again.
+- `EmbeddingBatcher` collects the embedding requests arriving within a few milliseconds
+  and sends them in one `embeddings.create` call.
+
+Run from the `main` directory with threaded workers (batching and coalescing only happen
+between requests handled concurrently by the same worker):
+
+    OPENAI_API_KEY=... gunicorn -w 4 --threads 16 "scripts.service:create_app()"
+
+or `python -m scripts.service` for the Flask development server.
+"""
+import os
+import json
+import time
+import uuid
+import queue
+import sqlite3
+import hashlib
+import tempfile
+import threading
+from concurrent.futures import Future
+from scripts.genai import GenAI
+
+# Flask is imported inside `create_app`, so the coalescing classes can be used without it.
+
+
+DEFAULT_CACHE_PATH = os.path.join(tempfile.gettempdir(), "genai_service_cache.sqlite3")
+
+# Expected JSON type of each request field, checked before any upstream call
+FIELD_TYPES = {
+    "prompt": str,
+    "instructions": str,
+    "model": str,
+    "output_type": str,
+    "temperature": (int, float),
+    "context": str,
+    "cache_key": str,
+    "text": str,
+    "image_urls": (str, list),
+    "cache": bool,
+}
+
+
+def field_error(name, value):
+    """Returns an error message if `value` does not have the JSON type expected for `name`, else None."""
+    expected = FIELD_TYPES.get(name)
+    if expected is None:
+        return None
+    # bool is a subclass of int, but `true` is not a temperature
+    if not isinstance(value, expected) or (isinstance(value, bool) and expected is not bool):
+        names = expected if isinstance(expected, tuple) else (expected,)
+        return f"Field '{name}' must be of type {' or '.join(t.__name__ for t in names)}."
+    if name == "image_urls" and isinstance(value, list) and not all(isinstance(url, str) for url in value):
+        return "Field 'image_urls' must be a string or a list of strings."
+    return None
+
+
+def request_key(endpoint, payload):
+    """Hash identifying a request: the endpoint and its JSON payload with sorted keys."""
+    body = json.dumps([endpoint, payload], sort_keys=True, ensure_ascii=False, separators=(",", ":"))
+    return hashlib.sha256(body.encode("utf-8")).hexdigest()
+
+
+
+class SingleFlight:
+    """
+    Runs a function once per key among the threads that ask for the same key at the same
+    time. The first caller runs it; the others wait and receive its result (or exception).
+    """
+
+    class _Call:
+        def __init__(self):
+            self.done = threading.Event()
+            self.value = None
+            self.error = None
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._calls = {}
+
+    def do(self, key, fn):
+        """
+        Returns
+        -------
+        tuple
+            (value, shared) where `shared` is True if the value was computed by another caller.
+        """
+        with self._lock:
+            call = self._calls.get(key)
+            leader = call is None
+            if leader:
+                call = self._calls[key] = self._Call()
+        if not leader:
+            call.done.wait()
+            if call.error is not None:
+                raise call.error
+            return call.value, True
+        try:
+            call.value = fn()
+        except BaseException as e:
+            call.error = e
+            raise
+        finally:
+            with self._lock:
+                del self._calls[key]
+            call.done.set()
+        return call.value, False
+
+
+
+class SharedCache:
+    """
+    Answer cache in a SQLite file, shared by the processes of one host (e.g. the workers
+    of a gunicorn server). Values are stored as JSON and expire after `ttl_s` seconds.
+
+    A lease marks a key whose answer is being computed, so other processes can `wait` for
+    it. Leases expire after `lease_s` seconds in case their owner dies.
+
+    Attributes:
+    ----------
+    path : str
+        SQLite database file.
+    ttl_s : float
+        Lifetime of a cached answer.
+    lease_s : float
+        Lifetime of a lease.
+    """
+
+    def __init__(self, path=DEFAULT_CACHE_PATH, ttl_s=3600.0, lease_s=120.0, poll_s=0.02):
+        self.path = path
+        self.ttl_s = ttl_s
+        self.lease_s = lease_s
+        self.poll_s = poll_s
+        self.owner = uuid.uuid4().hex
+        self._local = threading.local()
+        connection = self._connection()
+        connection.execute("PRAGMA journal_mode=WAL")
+        connection.execute("CREATE TABLE IF NOT EXISTS answers (key TEXT PRIMARY KEY, value TEXT, expires REAL)")
+        connection.execute("CREATE INDEX IF NOT EXISTS answers_expires ON answers (expires)")
+        connection.execute("CREATE TABLE IF NOT EXISTS leases (key TEXT PRIMARY KEY, owner TEXT, expires REAL)")
+
+    def _connection(self):
+        # One connection per thread and process (connections must not cross a fork)
+        pid = os.getpid()
+        if getattr(self._local, "pid", None) != pid:
+            self._local.connection = sqlite3.connect(self.path, timeout=30, isolation_level=None,
+                                                     check_same_thread=False)
+            self._local.pid = pid
+        return self._local.connection
+
+    def get(self, key):
+        """Returns the cached value of `key`, or None."""
+        row = self._connection().execute(
+            "SELECT value FROM answers WHERE key = ? AND expires > ?", (key, time.time())).fetchone()
+        return json.loads(row[0]) if row else None
+
+    def set(self, key, value):
+        now = time.time()
+        connection = self._connection()
+        connection.execute("INSERT OR REPLACE INTO answers VALUES (?, ?, ?)",
+                           (key, json.dumps(value), now + self.ttl_s))
+        connection.execute("DELETE FROM answers WHERE expires <= ?", (now,))
+
+    def acquire(self, key):
+        """Takes the lease of `key`. Returns False if another process holds it."""
+        now = time.time()
+        connection = self._connection()
+        connection.execute("DELETE FROM leases WHERE key = ? AND expires <= ?", (key, now))
+        cursor = connection.execute("INSERT OR IGNORE INTO leases VALUES (?, ?, ?)",
+                                    (key, self.owner, now + self.lease_s))
+        return cursor.rowcount == 1
+
+    def release(self, key):
+        self._connection().execute("DELETE FROM leases WHERE key = ? AND owner = ?", (key, self.owner))
+
+    def wait(self, key, timeout=None):
+        """
+        Waits for the answer of a key leased by another process. Returns None if the lease
+        is released without an answer (the owner failed) or after `timeout` seconds.
+        """
+        deadline = time.monotonic() + (self.lease_s if timeout is None else timeout)
+        connection = self._connection()
+        while time.monotonic() < deadline:
+            value = self.get(key)
+            if value is not None:
+                return value
+            leased = connection.execute("SELECT 1 FROM leases WHERE key = ? AND expires > ?",
+                                        (key, time.time())).fetchone()
+            if not leased:
+                return self.get(key)
+            time.sleep(self.poll_s)
+        return None
+
+
+
+class RequestCoalescer:
+    """
+    Answers a request from the shared cache, from a call already in flight in this worker
+    or in another worker, or by calling the API. Counts where the answers came from.
+    """
+
+    SOURCES = ("cache", "coalesced", "worker", "upstream")
+
+    def __init__(self, cache=None):
+        self.cache = cache
+        self.singleflight = SingleFlight()
+        self.counts = dict.fromkeys(self.SOURCES, 0)
+        self._lock = threading.Lock()
+
+    def _count(self, source):
+        with self._lock:
+            self.counts[source] += 1
+
+    def call(self, key, fn, use_cache=True, share=True):
+        """
+        Returns the answer to the request `key`, calling `fn()` only if no identical request
+        is cached or in flight. The answer must be JSON serializable. With `share=False`
+        (and no cache) `fn()` is always called for this caller alone.
+
+        Returns:
+        -------
+        tuple
+            (value, source) with source one of `SOURCES`.
+        """
+        cache = self.cache if use_cache else None
+        if cache is None and not share:
+            self._count("upstream")
+            return fn(), "upstream"
+
+        def load():
+            if cache is None:
+                return fn(), "upstream"
+            value = cache.get(key)
+            if value is not None:
+                return value, "cache"
+            if cache.acquire(key):
+                try:
+                    value = fn()
+                    cache.set(key, value)
+                finally:
+                    cache.release(key)
+                return value, "upstream"
+            value = cache.wait(key)
+            if value is not None:
+                return value, "worker"
+            return fn(), "upstream"  # the other worker failed or timed out
+
+        (value, source), shared = self.singleflight.do((key, cache is not None), load)
+        source = "coalesced" if shared else source
+        self._count(source)
+        return value, source
+
+    def to_prometheus_text(self, prefix="genai_service"):
+        lines = [f"# TYPE {prefix}_requests_total counter"]
+        with self._lock:
+            for source, count in self.counts.items():
+                lines.append(f'{prefix}_requests_total{{source="{source}"}} {count}')
+        return "\n".join(lines) + "\n"
+
+
+
+class EmbeddingBatcher:
+    """
+    Micro-batches embedding requests: requests arriving within `max_wait_ms` of the first
+    one (up to `max_batch_size` texts) are sent in a single `embeddings.create` call, made
+    by a background thread of the worker.
+    """
+
+    def __init__(self, genai, max_wait_ms=5.0, max_batch_size=256):
+        self.genai = genai
+        self.max_wait_s = max_wait_ms / 1000
+        self.max_batch_size = max_batch_size
+        self._queue = queue.Queue()
+        self._lock = threading.Lock()
+        self._thread = None
+        self._pid = None
+
+    def _ensure_thread(self):
+        # Started lazily, in the worker process (threads do not survive gunicorn's fork)
+        with self._lock:
+            if self._thread is None or self._pid != os.getpid() or not self._thread.is_alive():
+                self._pid = os.getpid()
+                self._thread = threading.Thread(target=self._run, name="EmbeddingBatcher", daemon=True)
+                self._thread.start()
+
+    def embed(self, text, model='text-embedding-3-small', timeout=None):
+        """Returns the embedding of `text`, like `GenAI.get_embedding`."""
+        future = Future()
+        self._ensure_thread()
+        self._queue.put((model, text.replace("\n", " "), future))
+        return future.result(timeout)
+
+    def _run(self):
+        while True:
+            batch = [self._queue.get()]
+            deadline = time.monotonic() + self.max_wait_s
+            while len(batch) < self.max_batch_size:
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    break
+                try:
+                    batch.append(self._queue.get(timeout=remaining))
+                except queue.Empty:
+                    break
+            by_model = {}
+            for model, text, future in batch:
+                by_model.setdefault(model, []).append((text, future))
+            for model, requests in by_model.items():
+                self._flush(model, requests)
+
+    def _flush(self, model, requests):
+        texts = list(dict.fromkeys(text for text, _ in requests))
+        try:
+            with self.genai.metrics.track(type(self).__name__, "embeddings", model=model,
+                                          batch_size=len(texts)) as call:
+                response = self.genai.client.embeddings.create(input=texts, model=model)
+                call.set_usage(response.usage)
+            embeddings = {texts[item.index]: item.embedding for item in response.data}
+        except Exception as e:
+            for _, future in requests:
+                future.set_exception(e)
+            return
+        for text, future in requests:
+            future.set_result(embeddings[text])
+
+
+
+def create_app(genai=None, cache_path=None, ttl_s=3600.0, max_wait_ms=5.0, max_batch_size=256):
+    """
+    Builds the Flask app. Each gunicorn worker builds one GenAI (one HTTP connection pool)
+    shared by its threads.
+
+    Parameters:
+    ----------
+    genai : GenAI, optional
+        Client used for the API calls. Defaults to one built from the OPENAI_API_KEY and
+        OPENAI_BASE_URL environment variables.
+    cache_path : str, optional
+        SQLite file of the shared cache (env GENAI_SERVICE_CACHE, default in the temp directory).
+        Every worker of a server must use the same file.
+    ttl_s : float, optional (default=3600)
+        Lifetime of cached answers.
+    max_wait_ms : float, optional (default=5)
+        How long the embedding batcher waits for more requests before calling the API.
+    max_batch_size : int, optional (default=256)
+        Maximum number of texts per embeddings call.
+
+    Returns:
+    -------
+    flask.Flask
+        The app. Every POST endpoint takes a JSON body, returns {"result": ..., "source": ...}
+        and accepts `"cache": false` to skip the shared cache. Fields of the wrong type get a
+        400. `/generate_text` only caches and coalesces deterministic requests
+        (`temperature` 0) by default, so clients do not share one sampled answer; send
+        `"cache": true` to cache sampled answers too.
+    """
+    from flask import Flask, jsonify, request
+
+    if genai is None:
+        genai = GenAI(os.environ["OPENAI_API_KEY"], base_url=os.environ.get("OPENAI_BASE_URL"))
+    cache_path = cache_path or os.environ.get("GENAI_SERVICE_CACHE", DEFAULT_CACHE_PATH)
+    coalescer = RequestCoalescer(SharedCache(cache_path, ttl_s=ttl_s))
+    batcher = EmbeddingBatcher(genai, max_wait_ms=max_wait_ms, max_batch_size=max_batch_size)
+
+    app = Flask(__name__)
+    app.config["genai"] = genai
+    app.config["coalescer"] = coalescer
+
+    def answer(endpoint, payload, fn, share=True):
+        use_cache = payload.pop("cache", True)
+        try:
+            value, source = coalescer.call(request_key(endpoint, payload), fn, use_cache=use_cache,
+                                           share=share or use_cache)
+        except Exception as e:
+            print(f"❌ Error in /{endpoint}: {e}")
+            return jsonify({"error": str(e)}), 502
+        return jsonify({"result": value, "source": source})
+
+    def body(*required):
+        payload = request.get_json(silent=True)
+        if not isinstance(payload, dict):
+            return None, (jsonify({"error": "Expected a JSON object."}), 400)
+        missing = [name for name in required if name not in payload]
+        if missing:
+            return None, (jsonify({"error": f"Missing fields: {', '.join(missing)}"}), 400)
+        for name, value in payload.items():
+            message = field_error(name, value)
+            if message:
+                return None, (jsonify({"error": message}), 400)
+        return payload, None
+
+    @app.post("/generate_text")
+    def generate_text():
+        payload, error = body("prompt")
+        if error:
+            return error
+        payload.setdefault("instructions", "You are a helpful AI named Jarvis")
+        payload.setdefault("model", "gpt-4o-mini")
+        options = {name: payload[name] for name in ("output_type", "temperature", "context", "cache_key")
+                   if name in payload}
+        # Sampled answers (default temperature 1) are only cached when the client asks for it
+        deterministic = payload.get("temperature", 1) == 0
+        payload.setdefault("cache", deterministic)
+
+        def generate():
+            return genai.generate_text(payload["prompt"], payload["instructions"], model=payload["model"], **options)
+
+        return answer("generate_text", payload, generate, share=deterministic)
+
+    @app.post("/get_embedding")
+    def get_embedding():
+        payload, error = body("text")
+        if error:
+            return error
+        payload.setdefault("model", "text-embedding-3-small")
+        return answer("get_embedding", payload, lambda: batcher.embed(payload["text"], model=payload["model"]))
+
+    @app.post("/generate_image_description")
+    def generate_image_description():
+        # Images are sent as http(s) or data URLs; the service does not read local files
+        payload, error = body("image_urls", "instructions")
+        if error:
+            return error
+        if isinstance(payload["image_urls"], str):
+            payload["image_urls"] = [payload["image_urls"]]
+        payload.setdefault("model", "gpt-4o-mini")
+        return answer("generate_image_description", payload, lambda: genai.generate_image_url_description(
+            payload["image_urls"], payload["instructions"], model=payload["model"]))
+
+    @app.get("/metrics")
+    def metrics():
+        text = genai.metrics.to_prometheus_text() + coalescer.to_prometheus_text()
+        return text, 200, {"Content-Type": "text/plain; version=0.0.4"}
+
+    @app.get("/healthz")
+    def healthz():
+        return jsonify({"status": "ok"})
+
+    return app
+
+
+if __name__ == "__main__":
+    create_app().run(threaded=True)
@@ -0,0 +1,278 @@
+import hashlib
+import numpy as np
+import pandas as pd
+from pymongo import ASCENDING, DESCENDING, UpdateOne
+from scripts.instrumentation import default_registry
+
+
+
+# Collection of each kind of result, and the fields that identify a document in it
+COLLECTIONS = {
+    "tweets": ("tweet_id",),
+    "generations": ("generation_id",),
+    "sentiment": ("tweet_id", "model"),
+    "embeddings": ("key", "model"),
+}
+
+EMBEDDING_DTYPE = "float32"
+
+
+
+class MongoStore:
+    """
+    Bulk MongoDB persistence of tweets (TwExportly rows), generated texts, sentiment scores
+    and embeddings.
+
+    Rows are upserted with unordered `bulk_write` calls of `batch_size` operations, so
+    re-saving an export or a rerun only updates what changed and one slow or duplicate row
+    does not stop the batch. Reads stream the query results back as DataFrame chunks of
+    `chunk_size` rows, so large collections are never fully materialized. Embeddings are
+    stored as float32 bytes (4 bytes per dimension instead of ~13 for a BSON array of doubles).
+
+    Any client with the pymongo API works, e.g. `mongomock.MongoClient()` in notebooks and
+    tests without a server:
+
+    >>> store = MongoStore(client=mongomock.MongoClient())
+
+    Attributes:
+    ----------
+    db : pymongo.database.Database
+        Database holding the `COLLECTIONS`.
+    batch_size : int
+        Number of operations per `bulk_write` call.
+    metrics : MetricsRegistry
+        Registry where every bulk write and read is recorded.
+    """
+
+    def __init__(self, uri="mongodb://localhost:27017", db_name="genai", client=None, batch_size=1000,
+                 create_indexes=True, metrics=None):
+        """
+        Connects to the database and creates the indexes.
+
+        Parameters:
+        ----------
+        uri : str, optional (default="mongodb://localhost:27017")
+            MongoDB connection string. Ignored if `client` is given.
+        db_name : str, optional (default="genai")
+            Database name.
+        client : pymongo.MongoClient, optional
+            Existing client, e.g. a `mongomock.MongoClient`.
+        batch_size : int, optional (default=1000)
+            Number of operations per `bulk_write` call.
+        create_indexes : bool, optional (default=True)
+            Whether to create the indexes (see `create_indexes`).
+        metrics : MetricsRegistry, optional
+            Defaults to the shared `scripts.instrumentation.default_registry`.
+        """
+        if client is None:
+            from pymongo import MongoClient
+            client = MongoClient(uri)
+        self.client = client
+        self.db = client[db_name]
+        self.batch_size = batch_size
+        self.metrics = metrics if metrics is not None else default_registry
+        if create_indexes:
+            self.create_indexes()
+
+    def create_indexes(self):
+        """
+        Creates a unique index on the key fields of each collection (used by the upserts)
+        and a (screen_name, created_at) index for per-account time range queries on tweets.
+        """
+        for name, key_fields in COLLECTIONS.items():
+            self.db[name].create_index([(field, ASCENDING) for field in key_fields], unique=True)
+        self.db["tweets"].create_index([("screen_name", ASCENDING), ("created_at", DESCENDING)])
+        self.db["tweets"].create_index([("created_at", DESCENDING)])
+
+    @staticmethod
+    def to_documents(df):
+        """
+        Converts DataFrame rows to BSON-compatible dicts: NaN/NA/NaT become None, NumPy
+        scalars become Python scalars and timestamps become datetimes.
+        """
+        df = df.astype(object)
+        return df.where(df.notna(), None).to_dict("records")
+
+    def bulk_upsert(self, collection, documents, key_fields=None):
+        """
+        Upserts documents with `bulk_write`, `batch_size` operations at a time. Documents
+        are matched on `key_fields` (by default the key fields of `collection` in
+        `COLLECTIONS`) and their other fields are overwritten.
+
+        Parameters:
+        ----------
+        collection : str
+            Collection name.
+        documents : list of dict
+            Documents to upsert. Each one must contain the key fields.
+        key_fields : tuple of str, optional
+            Fields identifying a document.
+
+        Returns:
+        -------
+        dict
+            Counts of "upserted" (new), "modified" and "matched" documents.
+        """
+        key_fields = key_fields or COLLECTIONS[collection]
+        counts = {"upserted": 0, "modified": 0, "matched": 0}
+        for start in range(0, len(documents), self.batch_size):
+            operations = [UpdateOne({field: document[field] for field in key_fields}, {"$set": document}, upsert=True)
+                          for document in documents[start:start + self.batch_size]]
+            with self.metrics.track(type(self).__name__, "mongo.bulk_write", collection=collection,
+                                    operations=len(operations)):
+                result = self.db[collection].bulk_write(operations, ordered=False)
+            counts["upserted"] += result.upserted_count
+            counts["modified"] += result.modified_count
+            counts["matched"] += result.matched_count
+        return counts
+
+    def upsert_tweets(self, df):
+        """
+        Saves TwExportly rows (e.g. from `TwExportlyLoader.load`), keyed by tweet_id.
+
+        Returns:
+        -------
+        dict
+            Counts returned by `bulk_upsert`.
+        """
+        return self.bulk_upsert("tweets", self.to_documents(df))
+
+    @staticmethod
+    def generation_id(prompt, instructions="", model=""):
+        """Default key of a generated text: a hash of its model, instructions and prompt."""
+        return hashlib.sha256(f"{model}\x00{instructions}\x00{prompt}".encode("utf-8")).hexdigest()
+
+    def upsert_generations(self, df, id_column=None):
+        """
+        Saves generated texts.
+
+        Parameters:
+        ----------
+        df : pd.DataFrame
+            One row per generation, e.g. with columns prompt, instructions, model, response.
+        id_column : str, optional
+            Column identifying each generation (e.g. the custom_id of a `GenAIBatch`).
+            Defaults to `generation_id` of the prompt, instructions and model columns.
+
+        Returns:
+        -------
+        dict
+            Counts returned by `bulk_upsert`.
+        """
+        df = df.copy()
+        if id_column is not None:
+            df["generation_id"] = df[id_column].astype(str)
+        else:
+            instructions = df["instructions"] if "instructions" in df.columns else pd.Series("", index=df.index)
+            model = df["model"] if "model" in df.columns else pd.Series("", index=df.index)
+            df["generation_id"] = [self.generation_id(p, i, m) for p, i, m in
+                                   zip(df["prompt"], instructions.fillna(""), model.fillna(""))]
+        return self.bulk_upsert("generations", self.to_documents(df))
+
+    def upsert_sentiment(self, df, id_column="tweet_id", score_column="sentiment", model=""):
+        """
+        Saves sentiment scores (e.g. from `SentimentScorer.score_dataframe`), keyed by
+        tweet_id and model.
+
+        Returns:
+        -------
+        dict
+            Counts returned by `bulk_upsert`.
+        """
+        df = pd.DataFrame({"tweet_id": df[id_column], "sentiment": df[score_column], "model": model})
+        return self.bulk_upsert("sentiment", self.to_documents(df))
+
+    def upsert_embeddings(self, df, key_column="tweet_id", embedding_column="embedding",
+                          model='text-embedding-3-small'):
+        """
+        Saves embedding vectors, keyed by `key_column` and model. Vectors are stored as
+        float32 bytes with their dimension.
+
+        Returns:
+        -------
+        dict
+            Counts returned by `bulk_upsert`.
+        """
+        documents = [
+            {"key": key.item() if isinstance(key, np.generic) else key, "model": model, "dim": len(vector),
+             "embedding": np.asarray(vector, dtype=EMBEDDING_DTYPE).tobytes()}
+            for key, vector in zip(df[key_column], df[embedding_column])
+        ]
+        return self.bulk_upsert("embeddings", documents)
+
+    def iter_chunks(self, collection, filter=None, columns=None, sort=None, chunk_size=10_000):
+        """
+        Streams the documents matching a query as DataFrames of at most `chunk_size` rows.
+        The server cursor fetches `chunk_size` documents per round trip.
+
+        Parameters:
+        ----------
+        collection : str
+            Collection name.
+        filter : dict, optional
+            MongoDB query, e.g. {"favorite_count": {"$gt": 1000}}.
+        columns : list of str, optional
+            Fields to return. Defaults to all fields but `_id`.
+        sort : list of tuple, optional
+            Sort specification, e.g. [("created_at", 1)].
+        chunk_size : int, optional (default=10_000)
+            Rows per DataFrame.
+
+        Yields:
+        ------
+        pd.DataFrame
+        """
+        projection = dict.fromkeys(columns, 1) if columns else {}
+        projection["_id"] = 0
+        cursor = self.db[collection].find(filter or {}, projection, batch_size=chunk_size)
+        if sort:
+            cursor = cursor.sort(sort)
+        chunk = []
+        for document in cursor:
+            chunk.append(document)
+            if len(chunk) == chunk_size:
+                yield pd.DataFrame.from_records(chunk, columns=columns)
+                chunk = []
+        if chunk:
+            yield pd.DataFrame.from_records(chunk, columns=columns)
+
+    def read(self, collection, filter=None, columns=None, sort=None, chunk_size=10_000):
+        """Reads a whole query result (see `iter_chunks`) into one DataFrame."""
+        chunks = list(self.iter_chunks(collection, filter, columns, sort, chunk_size))
+        if not chunks:
+            return pd.DataFrame(columns=columns)
+        return pd.concat(chunks, ignore_index=True)
+
+    @staticmethod
+    def tweet_filter(screen_names=None, since=None, until=None):
+        """Query on the (screen_name, created_at) index, like `TwExportlyLoader.load`."""
+        query = {}
+        if screen_names:
+            query["screen_name"] = {"$in": list(screen_names)}
+        created_at = {}
+        if since is not None:
+            created_at["$gte"] = pd.Timestamp(since).to_pydatetime()
+        if until is not None:
+            created_at["$lt"] = pd.Timestamp(until).to_pydatetime()
+        if created_at:
+            query["created_at"] = created_at
+        return query
+
+    def iter_tweets(self, screen_names=None, since=None, until=None, columns=None, chunk_size=10_000):
+        """
+        Streams tweets of the given accounts and time range, newest first, as DataFrame chunks.
+        """
+        yield from self.iter_chunks("tweets", self.tweet_filter(screen_names, since, until), columns,
+                                    sort=[("created_at", DESCENDING)], chunk_size=chunk_size)
+
+    def iter_embeddings(self, keys=None, model='text-embedding-3-small', chunk_size=10_000):
+        """
+        Streams embeddings as (keys, matrix) chunks, where `matrix` is a float32 array with
+        one row per key.
+        """
+        query = {"model": model}
+        if keys is not None:
+            query["key"] = {"$in": [key.item() if isinstance(key, np.generic) else key for key in keys]}
+        for df in self.iter_chunks("embeddings", query, ["key", "embedding"], chunk_size=chunk_size):
+            matrix = np.frombuffer(b"".join(df["embedding"]), dtype=EMBEDDING_DTYPE).reshape(len(df), -1)
+            yield df["key"].tolist(), matrix
@@ -0,0 +1,483 @@
+import re
+import ast
+import json
+import posixpath
+
+
+
+CODE_FENCE_PATTERN = re.compile(r"^\s*```(?:json)?\s*|\s*```\s*$")
+TRAILING_COMMA_PATTERN = re.compile(r",\s*([\]}])")
+SMART_QUOTES = {"“": '"', "”": '"', "‘": "'", "’": "'"}
+
+# Fix prompts list the allowed values of a field only up to this many; longer lists are
+# already in the cached context of the original request
+MAX_LISTED_CHOICES = 50
+
+
+def _close_truncated(text):
+    """
+    Cuts a truncated JSON document after its last complete nested value and closes the
+    open brackets, e.g. '{"script":[{"a":1},{"a":' -> '{"script":[{"a":1}]}'.
+    Returns `None` if no complete nested value was found.
+    """
+    stack = []
+    in_string = escaped = False
+    last_complete = None
+    for i, char in enumerate(text):
+        if in_string:
+            if escaped:
+                escaped = False
+            elif char == "\\":
+                escaped = True
+            elif char == '"':
+                in_string = False
+        elif char == '"':
+            in_string = True
+        elif char in "{[":
+            stack.append("}" if char == "{" else "]")
+        elif char in "}]":
+            if not stack:
+                return None
+            stack.pop()
+            if stack:
+                last_complete = (i, list(stack))
+    if last_complete is None:
+        return None
+    end, open_brackets = last_complete
+    return text[:end + 1] + "".join(reversed(open_brackets))
+
+
+def parse_json_response(text):
+    """
+    Parses a JSON response from a model, repairing common malformations locally:
+    raw newlines and tabs inside strings, code fences, prose around the JSON, smart
+    quotes, trailing commas, Python literals (single quotes, True/None) and output
+    truncated by the token limit.
+
+    Parameters:
+    ----------
+    text : str
+        The model response.
+
+    Returns:
+    -------
+    dict or list or None
+        The parsed JSON, or `None` if it could not be repaired.
+
+    Examples:
+    --------
+    >>> parse_json_response('{"script": "line one\\nline two\\tend"}')
+    {'script': 'line one\\nline two\\tend'}
+    >>> parse_json_response('```json\\n{"labels": ["a", "b",]}\\n```')
+    {'labels': ['a', 'b']}
+    """
+    if not isinstance(text, str):
+        return None
+    # strict=False accepts control characters (raw newlines, tabs) inside strings
+    try:
+        return json.loads(text, strict=False)
+    except json.JSONDecodeError:
+        pass
+
+    candidate = CODE_FENCE_PATTERN.sub("", text)
+    value = _repair(candidate)
+    if value is None and any(smart in candidate for smart in SMART_QUOTES):
+        # Smart quotes may be legitimate inside strings, so they are only replaced as a last resort
+        for smart, plain in SMART_QUOTES.items():
+            candidate = candidate.replace(smart, plain)
+        value = _repair(candidate)
+    return value
+
+
+def _repair(candidate):
+    """Extracts the JSON value from `candidate` and tries the repairs of `parse_json_response`."""
+    starts = [i for i in (candidate.find("{"), candidate.find("[")) if i >= 0]
+    if not starts:
+        return None
+    candidate = candidate[min(starts):]
+    ends = [i for i in (candidate.rfind("}"), candidate.rfind("]")) if i >= 0]
+    complete = candidate[:max(ends) + 1] if ends else candidate
+    complete = TRAILING_COMMA_PATTERN.sub(r"\1", complete)
+
+    try:
+        return json.loads(complete, strict=False)
+    except json.JSONDecodeError:
+        pass
+    try:
+        value = ast.literal_eval(complete)
+        if isinstance(value, (dict, list)):
+            return json.loads(json.dumps(value))
+    except (ValueError, SyntaxError, TypeError, MemoryError, RecursionError):
+        pass
+    closed = _close_truncated(TRAILING_COMMA_PATTERN.sub(r"\1", candidate))
+    if closed is not None:
+        try:
+            return json.loads(TRAILING_COMMA_PATTERN.sub(r"\1", closed), strict=False)
+        except json.JSONDecodeError:
+            pass
+    return None
+
+
+
+class JSONListStream:
+    """
+    Incremental parser that extracts the records of the list under `key` in a streamed
+    response, e.g. the entries of {"script": [{...}, {...}]}, as soon as each is complete.
+    Lists under other keys are skipped, and nothing is emitted once the list has closed.
+    A response that is itself a list is also accepted.
+
+    Example:
+    -------
+    >>> stream = JSONListStream()
+    >>> stream.feed('{"notes": [], "script": [{"clip_path": "a.mp4", "narr')
+    []
+    >>> stream.feed('ation": "Hi"}, {"clip')
+    [{'clip_path': 'a.mp4', 'narration': 'Hi'}]
+
+    Attributes:
+    ----------
+    key : str or None
+        Key of the list to extract. `None` extracts the first list found.
+    text : str
+        Everything fed so far (parse it with `parse_json_response` once the stream ends).
+    """
+
+    def __init__(self, key="script"):
+        self.key = key
+        self._chunks = []
+        self._stack = []
+        self._in_string = False
+        self._escaped = False
+        self._string = None  # characters of the string being read, outside records
+        self._last_string = None
+        self._last_key = None
+        self._list_depth = None
+        self._done = False
+        self._item_start = None
+        self._item_chunks = []
+
+    @property
+    def text(self):
+        return "".join(self._chunks)
+
+    def _locks(self):
+        """Whether a list opened now is the one to extract."""
+        if self._done or self._list_depth is not None:
+            return False
+        return self.key is None or not self._stack or (self._stack[-1] == "{" and self._last_key == self.key)
+
+    def feed(self, chunk):
+        """
+        Adds a chunk of the response.
+
+        Returns:
+        -------
+        list
+            The records of the list completed by this chunk (records that cannot be parsed
+            are returned as `None` so that positions stay aligned).
+        """
+        self._chunks.append(chunk)
+        records = []
+        start = 0  # where the current record begins in this chunk
+        for i, char in enumerate(chunk):
+            if self._in_string:
+                if self._escaped:
+                    self._escaped = False
+                elif char == "\\":
+                    self._escaped = True
+                elif char == '"':
+                    self._in_string = False
+                    if self._string is not None:
+                        self._last_string = "".join(self._string)
+                        self._string = None
+                elif self._string is not None:
+                    self._string.append(char)
+                continue
+            if char == '"':
+                self._in_string = True
+                if self._item_start is None:
+                    self._string = []
+            elif char == ":":
+                self._last_key = self._last_string
+            elif char == ",":
+                self._last_key = None
+            elif char in "{[":
+                if self._list_depth is not None and len(self._stack) == self._list_depth and self._item_start is None:
+                    self._item_start = i
+                    start = i
+                locks = char == "[" and self._locks()
+                self._stack.append(char)
+                if locks:
+                    self._list_depth = len(self._stack)
+                self._last_key = None
+            elif char in "}]":
+                if self._stack:
+                    self._stack.pop()
+                if self._list_depth is not None and len(self._stack) < self._list_depth:
+                    # The extracted list has closed
+                    self._list_depth = None
+                    self._done = True
+                elif self._item_start is not None and len(self._stack) == self._list_depth:
+                    self._item_chunks.append(chunk[start:i + 1])
+                    records.append(parse_json_response("".join(self._item_chunks)))
+                    self._item_chunks = []
+                    self._item_start = None
+        if self._item_start is not None:
+            self._item_chunks.append(chunk[start:])
+        return records
+
+
+
+class ListSchema:
+    """
+    Schema of a JSON object holding a list of records, e.g. {"script": [{...}, ...]}.
+
+    Records are checked one by one so that only the invalid ones need to be regenerated.
+    Before a record is rejected, `check_item` tries local repairs: alias keys are renamed,
+    values are converted to the field type, and values restricted by `choices` are matched
+    after normalizing case, whitespace, path separators and directories.
+
+    Attributes:
+    ----------
+    key : str
+        Key of the list in the JSON object.
+    fields : dict
+        Maps each required field to its type, e.g. {"clip_path": str, "narration": str}.
+    choices : dict
+        Maps a field to its allowed values.
+    aliases : dict
+        Maps a field to other keys models use for it.
+    """
+
+    def __init__(self, key, fields, choices=None, aliases=None):
+        self.key = key
+        self.fields = dict(fields)
+        self.choices = {field: list(values) for field, values in (choices or {}).items()}
+        self.aliases = dict(aliases or {})
+        self._choice_index = {field: self._index_choices(values) for field, values in self.choices.items()}
+
+    @staticmethod
+    def _normalize(value):
+        return " ".join(str(value).replace("\\", "/").split()).lower()
+
+    def _index_choices(self, values):
+        # Exact value, then normalized value, then normalized file name (if unambiguous)
+        index = {}
+        basenames = {}
+        for value in values:
+            index.setdefault(self._normalize(value), value)
+            name = posixpath.basename(self._normalize(value))
+            basenames.setdefault(name, []).append(value)
+        for name, matches in basenames.items():
+            if len(matches) == 1:
+                index.setdefault(name, matches[0])
+        return index
+
+    def match_choice(self, field, value):
+        """Returns the allowed value of `field` that `value` refers to, or `None`."""
+        if value in self.choices[field]:
+            return value
+        normalized = self._normalize(value)
+        index = self._choice_index[field]
+        return index.get(normalized) or index.get(posixpath.basename(normalized))
+
+    def items(self, data):
+        """
+        Returns the list of records of a parsed response, or `None` if there is none.
+        A bare list and a single-key object holding a list are accepted too.
+        """
+        if isinstance(data, list):
+            return data
+        if not isinstance(data, dict):
+            return None
+        if isinstance(data.get(self.key), list):
+            return data[self.key]
+        lists = [value for value in data.values() if isinstance(value, list)]
+        return lists[0] if len(lists) == 1 else None
+
+    def check_item(self, item):
+        """
+        Validates one record, repairing it locally where possible.
+
+        Returns:
+        -------
+        tuple
+            (record, None) if the (repaired) record is valid, otherwise (item, error message).
+        """
+        if not isinstance(item, dict):
+            return item, "record is not a JSON object"
+        record = {}
+        for field, field_type in self.fields.items():
+            keys = [field] + list(self.aliases.get(field, []))
+            value = next((item[k] for k in keys if item.get(k) not in (None, "")), None)
+            if value is None:
+                return item, f"missing '{field}'"
+            if not isinstance(value, field_type):
+                try:
+                    value = field_type(value)
+                except (TypeError, ValueError):
+                    return item, f"'{field}' is not of type {field_type.__name__}"
+            if field in self.choices:
+                match = self.match_choice(field, value)
+                if match is None:
+                    return item, f"'{field}' value {value!r} is not one of the allowed values"
+                value = match
+            record[field] = value
+        return record, None
+
+    def fix_prompt(self, failures):
+        """
+        Prompt asking the model to correct only the failed records.
+
+        Parameters:
+        ----------
+        failures : list of tuple
+            (position, record, error message) of each failed record.
+        """
+        lines = [f"Some entries of your '{self.key}' list were invalid. Return a JSON object "
+                 f'{{"{self.key}": [...]}} with a corrected version of each entry below, keeping its "index".',
+                 f"Every entry needs the fields: {', '.join(self.fields)}."]
+        for field, values in self.choices.items():
+            if len(values) <= MAX_LISTED_CHOICES:
+                lines.append(f"'{field}' must be exactly one of: {json.dumps(values, ensure_ascii=False)}")
+            else:
+                lines.append(f"'{field}' must be exactly one of the '{field}' values given above.")
+        lines.append("Invalid entries:")
+        for position, item, error in failures:
+            lines.append(json.dumps({"index": position, "entry": item, "error": error}, ensure_ascii=False, default=str))
+        return "\n".join(lines)
+
+
+
+class StructuredOutput:
+    """
+    Structured JSON generation on top of `GenAI.generate_text`.
+
+    The response is parsed with local repair (`parse_json_response`) and validated record
+    by record against a `ListSchema`. Instead of regenerating everything when something is
+    wrong, only the records that fail validation are sent back to the model with the error,
+    up to `max_fix_calls` times; the whole request is repeated only if the response cannot
+    be parsed at all. Fix calls reuse the instructions and context of the original call, so
+    they hit the prompt cache.
+
+    Attributes:
+    ----------
+    genai : GenAI or AsyncGenAI
+        Client used for the requests.
+    max_fix_calls : int
+        Maximum number of follow-up requests per `generate` call.
+    """
+
+    def __init__(self, genai, max_fix_calls=2):
+        self.genai = genai
+        self.max_fix_calls = max_fix_calls
+
+    @staticmethod
+    def _validate(schema, items, positions=None):
+        """Returns ({position: record} of valid records, [(position, item, error)] of failures)."""
+        valid, failures = {}, []
+        for k, item in enumerate(items):
+            position = positions[k] if positions is not None else k
+            record, error = schema.check_item(item)
+            if error is None:
+                valid[position] = record
+            else:
+                failures.append((position, item, error))
+        return valid, failures
+
+    @staticmethod
+    def _fixed_items(schema, data, failures):
+        """Maps the corrected records of a fix response back to the failed positions."""
+        items = schema.items(data) or []
+        failed_positions = [position for position, _, _ in failures]
+        positions, fixed = [], []
+        for k, item in enumerate(items):
+            position = item.get("index") if isinstance(item, dict) else None
+            if isinstance(position, str) and position.isdigit():
+                position = int(position)
+            if position not in failed_positions:
+                # Fall back to the order of the failures if the model dropped the index
+                if k >= len(failed_positions):
+                    continue
+                position = failed_positions[k]
+            if isinstance(item, dict) and isinstance(item.get("entry"), dict):
+                item = item["entry"]
+            positions.append(position)
+            fixed.append(item)
+        return fixed, positions
+
+    @staticmethod
+    def _finish(schema, valid, failures):
+        """Reports the entries that are still invalid and returns the valid ones in order."""
+        for position, _, error in failures:
+            print(f"⚠️ Dropping {schema.key} entry {position}: {error}")
+        if not valid:
+            print(f"❌ Error: Response does not contain any valid '{schema.key}' entries.")
+            return False
+        return [valid[position] for position in sorted(valid)]
+
+    def generate(self, prompt, instructions, schema, model="gpt-4o-mini", context=None, cache_key=None):
+        """
+        Generates a list of records that satisfy `schema`.
+
+        Parameters:
+        ----------
+        prompt, instructions, model, context, cache_key
+            Same as `GenAI.generate_text`.
+        schema : ListSchema
+            Schema of the expected JSON object.
+
+        Returns:
+        -------
+        list of dict or bool
+            The valid records in the order of the response, or `False` if there are none.
+        """
+        request = dict(instructions=instructions, model=model, context=context, cache_key=cache_key,
+                       output_type="json_object")
+        calls = 0
+        items = schema.items(parse_json_response(self.genai.generate_text(prompt=prompt, **request)))
+        while items is None and calls < self.max_fix_calls:
+            calls += 1
+            print("⚠️ Response is not valid JSON for the schema; repeating the request.")
+            items = schema.items(parse_json_response(self.genai.generate_text(prompt=prompt, **request)))
+        if items is None:
+            print(f"❌ Error: Failed to parse a '{schema.key}' list from the AI-generated response.")
+            return False
+
+        valid, failures = self._validate(schema, items)
+        while failures and calls < self.max_fix_calls:
+            calls += 1
+            print(f"Fixing {len(failures)} invalid {schema.key} entries...")
+            data = parse_json_response(self.genai.generate_text(prompt=schema.fix_prompt(failures), **request))
+            fixed, positions = self._fixed_items(schema, data, failures)
+            fixed_valid, _ = self._validate(schema, fixed, positions)
+            valid.update(fixed_valid)
+            failures = [f for f in failures if f[0] not in fixed_valid]
+        return self._finish(schema, valid, failures)
+
+    async def agenerate(self, prompt, instructions, schema, model="gpt-4o-mini", context=None, cache_key=None):
+        """
+        Same as `generate` for an `AsyncGenAI` client.
+        """
+        request = dict(instructions=instructions, model=model, context=context, cache_key=cache_key,
+                       output_type="json_object")
+        calls = 0
+        items = schema.items(parse_json_response(await self.genai.generate_text(prompt=prompt, **request)))
+        while items is None and calls < self.max_fix_calls:
+            calls += 1
+            print("⚠️ Response is not valid JSON for the schema; repeating the request.")
+            items = schema.items(parse_json_response(await self.genai.generate_text(prompt=prompt, **request)))
+        if items is None:
+            print(f"❌ Error: Failed to parse a '{schema.key}' list from the AI-generated response.")
+            return False
+
+        valid, failures = self._validate(schema, items)
+        while failures and calls < self.max_fix_calls:
+            calls += 1
+            print(f"Fixing {len(failures)} invalid {schema.key} entries...")
+            data = parse_json_response(await self.genai.generate_text(prompt=schema.fix_prompt(failures), **request))
+            fixed, positions = self._fixed_items(schema, data, failures)
+            fixed_valid, _ = self._validate(schema, fixed, positions)
+            valid.update(fixed_valid)
+            failures = [f for f in failures if f[0] not in fixed_valid]
+        return self._finish(schema, valid, failures)
@@ -0,0 +1,217 @@
+import os
+import re
+import time
+import pandas as pd
+from concurrent.futures import ProcessPoolExecutor
+
+
+
+# Patterns are compiled once at import. The pattern strings avoid Python-only syntax
+# so they can also be handed to pyarrow's RE2-based compute kernels, except for \w and \s:
+# they are Unicode-aware in `re` but ASCII-only in RE2, so the RE2 versions below spell
+# out the Unicode classes ("@josé" must lose the "é" in both engines).
+URL_REGEX = r"https?://\S+|www\.\S+"
+MENTION_REGEX = r"@\w+"
+HASHTAG_REGEX = r"#\w+"
+# Non-raw string on purpose: the ranges are real characters, which both `re` and RE2 accept.
+EMOJI_REGEX = (
+    "["
+    "\U0001F1E6-\U0001F1FF"  # flags
+    "\U0001F300-\U0001F5FF"  # symbols & pictographs
+    "\U0001F600-\U0001F64F"  # emoticons
+    "\U0001F680-\U0001F6FF"  # transport & map
+    "\U0001F700-\U0001FAFF"  # extended pictographs
+    "\u2600-\u27bf"          # misc symbols & dingbats
+    "\u200d\ufe0f"           # zero-width joiner, variation selector
+    "]+"
+)
+WHITESPACE_REGEX = r"\s+"
+
+# The characters `re` matches with \w and \s, as RE2 classes
+RE2_WORD_CHARS = r"\p{L}\p{N}_"
+RE2_SPACE_CHARS = r"\s\v\x1c-\x1f\x85\p{Z}"
+RE2_REGEXES = {
+    URL_REGEX: f"https?://[^{RE2_SPACE_CHARS}]+|www\\.[^{RE2_SPACE_CHARS}]+",
+    MENTION_REGEX: f"@[{RE2_WORD_CHARS}]+",
+    HASHTAG_REGEX: f"#[{RE2_WORD_CHARS}]+",
+    EMOJI_REGEX: EMOJI_REGEX,
+    WHITESPACE_REGEX: f"[{RE2_SPACE_CHARS}]+",
+}
+
+URL_PATTERN = re.compile(URL_REGEX)
+MENTION_PATTERN = re.compile(MENTION_REGEX)
+HASHTAG_PATTERN = re.compile(HASHTAG_REGEX)
+EMOJI_PATTERN = re.compile(EMOJI_REGEX)
+WHITESPACE_PATTERN = re.compile(WHITESPACE_REGEX)
+
+
+
+class TextCleaner:
+    """
+    Vectorized text normalization for tweet text columns.
+
+    Works on a whole pandas Series (via the `.str` accessor) or a pyarrow array (via
+    pyarrow compute kernels) instead of one string at a time, so there is no need to
+    `.apply()` a per-string function over a DataFrame.
+
+    Attributes:
+    ----------
+    urls, mentions, hashtags, emojis : bool
+        Which token types to remove.
+    whitespace : bool
+        Whether to collapse runs of whitespace to one space and strip the ends.
+    """
+
+    def __init__(self, urls=True, mentions=False, hashtags=False, emojis=False, whitespace=True):
+        """
+        Initializes the cleaner with the normalization steps to apply.
+
+        Parameters:
+        ----------
+        urls : bool, optional (default=True)
+            Remove http(s):// and www. links.
+        mentions : bool, optional (default=False)
+            Remove @mentions.
+        hashtags : bool, optional (default=False)
+            Remove #hashtags.
+        emojis : bool, optional (default=False)
+            Remove emoji characters.
+        whitespace : bool, optional (default=True)
+            Collapse whitespace and strip leading/trailing spaces.
+        """
+        self.urls = urls
+        self.mentions = mentions
+        self.hashtags = hashtags
+        self.emojis = emojis
+        self.whitespace = whitespace
+
+    def _removal_regexes(self):
+        regexes = []
+        if self.urls:
+            regexes.append(URL_REGEX)
+        if self.mentions:
+            regexes.append(MENTION_REGEX)
+        if self.hashtags:
+            regexes.append(HASHTAG_REGEX)
+        if self.emojis:
+            regexes.append(EMOJI_REGEX)
+        return regexes
+
+    def _removal_pattern(self):
+        # One alternation means a single pass over each string instead of one per step
+        regexes = self._removal_regexes()
+        if not regexes:
+            return None
+        return re.compile("|".join(f"(?:{r})" for r in regexes))
+
+    def clean(self, texts, n_jobs=1, chunk_size=1_000_000):
+        """
+        Cleans a Series (or list) of texts in one vectorized pass per step.
+
+        Parameters:
+        ----------
+        texts : pd.Series or list of str
+            The texts to clean. Missing values are kept as missing.
+        n_jobs : int, optional (default=1)
+            Number of worker processes. Values other than 1 split the input into chunks
+            of `chunk_size` rows and clean them in a process pool (-1 uses all CPUs).
+            Only worthwhile for very large corpora (10M+ rows).
+        chunk_size : int, optional (default=1_000_000)
+            Rows per chunk in the multiprocessing path.
+
+        Returns:
+        -------
+        pd.Series
+            The cleaned texts, with the same index as the input.
+        """
+        series = texts if isinstance(texts, pd.Series) else pd.Series(texts, dtype="string")
+        if n_jobs != 1 and len(series) > chunk_size:
+            return self._clean_parallel(series, n_jobs, chunk_size)
+        return self._clean_series(series)
+
+    def _clean_series(self, series):
+        series = series.astype("string")
+        pattern = self._removal_pattern()
+        if pattern is not None:
+            series = series.str.replace(pattern, "", regex=True)
+        if self.whitespace:
+            series = series.str.replace(WHITESPACE_PATTERN, " ", regex=True).str.strip()
+        return series
+
+    def _clean_parallel(self, series, n_jobs, chunk_size):
+        max_workers = os.cpu_count() if n_jobs in (None, -1) else n_jobs
+        chunks = [series.iloc[i:i + chunk_size] for i in range(0, len(series), chunk_size)]
+        with ProcessPoolExecutor(max_workers=max_workers) as executor:
+            cleaned = list(executor.map(self._clean_series, chunks))
+        return pd.concat(cleaned)
+
+    def clean_arrow(self, array):
+        """
+        Cleans a pyarrow string array with pyarrow compute (RE2) kernels.
+
+        Parameters:
+        ----------
+        array : pyarrow.Array or pyarrow.ChunkedArray
+            String array to clean, e.g. a column read by `TwExportlyLoader.load`.
+
+        Returns:
+        -------
+        pyarrow.Array or pyarrow.ChunkedArray
+            The cleaned strings.
+        """
+        import pyarrow.compute as pc
+
+        regexes = [RE2_REGEXES[r] for r in self._removal_regexes()]
+        if regexes:
+            array = pc.replace_substring_regex(array, pattern="|".join(f"(?:{r})" for r in regexes), replacement="")
+        if self.whitespace:
+            array = pc.replace_substring_regex(array, pattern=RE2_REGEXES[WHITESPACE_REGEX], replacement=" ")
+            array = pc.utf8_trim_whitespace(array)
+        return array
+
+
+
+def _remove_urls_per_row(text):
+    # The per-string method this module replaces: recompiles the pattern on every call
+    url_pattern = re.compile(r'https?://\S+|www\.\S+')
+    return url_pattern.sub(r'', text)
+
+
+def benchmark_remove_urls(texts, n_repeats=3):
+    """
+    Times URL removal with the per-row `.apply()` approach against `TextCleaner`.
+
+    Parameters:
+    ----------
+    texts : pd.Series
+        Texts to clean, e.g. the `text` column of a TwExportly export.
+    n_repeats : int, optional (default=3)
+        Number of runs per method. The best time is reported.
+
+    Returns:
+    -------
+    pd.DataFrame
+        One row per method with columns ["method", "seconds", "rows_per_second"].
+    """
+    texts = texts.fillna("").astype(str)
+    cleaner = TextCleaner(urls=True, whitespace=False)
+    methods = {
+        "apply(remove_urls)": lambda: texts.apply(_remove_urls_per_row),
+        "TextCleaner.clean": lambda: cleaner.clean(texts),
+    }
+    try:
+        import pyarrow as pa
+        arrow_texts = pa.array(texts)
+        methods["TextCleaner.clean_arrow"] = lambda: cleaner.clean_arrow(arrow_texts)
+    except ImportError:
+        pass
+
+    results = []
+    for name, method in methods.items():
+        best = float("inf")
+        for _ in range(n_repeats):
+            tstart = time.perf_counter()
+            method()
+            best = min(best, time.perf_counter() - tstart)
+        results.append({"method": name, "seconds": best, "rows_per_second": len(texts) / best if best else float("inf")})
+    return pd.DataFrame(results)
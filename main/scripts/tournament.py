@@ -0,0 +1,249 @@
+import os
+import json
+import math
+import random
+import hashlib
+import threading
+import numpy as np
+import pandas as pd
+from concurrent.futures import ThreadPoolExecutor
+
+
+
+JUDGE_INSTRUCTIONS = """You are judging social media posts.
+Criteria: {criteria}
+You will be given two posts, A and B. Decide which one better meets the criteria.
+Answer with only the letter A or B."""
+
+JUDGE_PROMPT = "Post A:\n{a}\n\nPost B:\n{b}"
+
+
+def fit_bradley_terry(wins, prior=1.0, max_iter=200, tol=1e-8):
+    """
+    Bradley-Terry strengths from a pairwise wins matrix with the MM algorithm.
+
+    Parameters:
+    ----------
+    wins : np.ndarray
+        (n, n) matrix where wins[i, j] is the number of comparisons i won against j
+        (a tie counts 0.5 for each).
+    prior : float, optional (default=1.0)
+        Each candidate also wins and loses `prior` games against a virtual opponent of
+        strength 1, so candidates that won or lost every game keep finite strengths.
+
+    Returns:
+    -------
+    np.ndarray
+        Log-strengths (higher is better), centered on 0.
+    """
+    games = wins + wins.T
+    total_wins = wins.sum(axis=1) + prior
+    strength = np.ones(len(wins))
+    for _ in range(max_iter):
+        denominator = (games / (strength[:, None] + strength[None, :])).sum(axis=1) + 2 * prior / (strength + 1)
+        updated = total_wins / denominator
+        if np.max(np.abs(updated - strength)) < tol:
+            strength = updated
+            break
+        strength = updated
+    log_strength = np.log(strength)
+    return log_strength - log_strength.mean()
+
+
+
+class JudgeTournament:
+    """
+    Ranks candidates (e.g. generated tweets) with pairwise LLM judgments in about
+    O(n log n) comparisons instead of the n(n-1)/2 of an all-pairs tournament.
+
+    Rounds follow the Swiss system: candidates are sorted by their current Bradley-Terry
+    strength and paired with the closest-ranked candidate they have not met yet, so
+    comparisons are spent where the order is still uncertain. The comparisons of a round
+    are independent and run concurrently. After each round the strengths are refitted;
+    the tournament stops once the top `k` has not changed for `patience` rounds (and at
+    least log2(n) rounds have been played).
+
+    Judgments are cached symmetrically by the content of the two candidates, so
+    (a, b) and (b, a) are judged once, across rounds and calls to `rank`. Cache keys
+    start with a fingerprint of the judge (criteria, model, both_orders, and the name of
+    a custom `judge`), so tournaments sharing a `cache_path` never reuse each other's
+    verdicts.
+
+    Example:
+    -------
+    >>> tournament = JudgeTournament(jarvis, criteria="Most persuasive to a college student")
+    >>> df_ranking = tournament.rank(candidate_tweets, k=3)
+
+    Attributes:
+    ----------
+    calls : int
+        Number of judge calls made (cache hits excluded).
+    cache : dict
+        Maps a judge fingerprint and pair key to the result for the candidate whose hash
+        sorts first (1 win, 0 loss, 0.5 tie).
+    fingerprint : str
+        Hash of the judge configuration, the namespace of this tournament's cache keys.
+    """
+
+    def __init__(self, genai=None, criteria="Most engaging and persuasive", model="gpt-4o-mini", judge=None,
+                 both_orders=False, max_workers=8, cache_path=None, seed=0):
+        """
+        Parameters:
+        ----------
+        genai : GenAI, optional
+            Client of the LLM judge. Not needed with a custom `judge`.
+        criteria : str, optional
+            What the judge should prefer.
+        model : str, optional (default="gpt-4o-mini")
+            Judge model.
+        judge : callable, optional
+            `judge(a, b)` returning 1 if a is better, 0 if b is better, 0.5 for a tie.
+            Defaults to the LLM judge. Custom judges are cached under their module and
+            qualified name, so give different judges different names (or cache files).
+        both_orders : bool, optional (default=False)
+            Judge each pair in both orders and count a tie when they disagree, which
+            cancels the judge's position bias at twice the calls.
+        max_workers : int, optional (default=8)
+            Number of concurrent judgments.
+        cache_path : str, optional
+            JSON file where judgments are persisted between sessions.
+        seed : int, optional (default=0)
+            Seed of the first-round pairing and the presentation order.
+        """
+        self.genai = genai
+        self.criteria = criteria
+        self.model = model
+        self.judge = judge or self._llm_judge
+        self.both_orders = both_orders
+        self.max_workers = max_workers
+        self.cache_path = cache_path
+        self.calls = 0
+        self._lock = threading.Lock()
+        self._rng = random.Random(seed)
+        if judge is None:
+            identity = ["llm", criteria, model, both_orders]
+        else:
+            name = f"{getattr(judge, '__module__', '')}.{getattr(judge, '__qualname__', type(judge).__qualname__)}"
+            identity = ["custom", name, criteria, both_orders]
+        self.fingerprint = self._hash(json.dumps(identity))
+        self.cache = {}
+        if cache_path and os.path.exists(cache_path):
+            with open(cache_path, "r") as f:
+                self.cache = json.load(f)
+
+    @staticmethod
+    def _hash(text):
+        return hashlib.sha256(text.encode("utf-8")).hexdigest()[:16]
+
+    def _llm_judge(self, a, b):
+        instructions = JUDGE_INSTRUCTIONS.format(criteria=self.criteria)
+        answer = self.genai.generate_text(JUDGE_PROMPT.format(a=a, b=b), instructions, model=self.model, temperature=0)
+        answer = answer.strip().upper()[:1]
+        return 1.0 if answer == "A" else 0.0 if answer == "B" else 0.5
+
+    def _judged(self, a, b, swap):
+        """Result for `a` (1, 0 or 0.5), shown to the judge as (b, a) if `swap`."""
+        with self._lock:
+            self.calls += 1
+        return 1.0 - self.judge(b, a) if swap else self.judge(a, b)
+
+    def compare(self, a, b):
+        """
+        Result of a against b (1 win, 0 loss, 0.5 tie), from the cache if the pair was
+        already judged in either order.
+        """
+        ha, hb = self._hash(a), self._hash(b)
+        key = "|".join([self.fingerprint] + sorted((ha, hb)))
+        with self._lock:
+            cached = self.cache.get(key)
+        if cached is None:
+            if self.both_orders:
+                first, second = self._judged(a, b, False), self._judged(a, b, True)
+                result = first if first == second else 0.5
+            else:
+                with self._lock:
+                    swap = self._rng.random() < 0.5  # random order spreads position bias
+                result = self._judged(a, b, swap)
+            cached = result if ha <= hb else 1.0 - result
+            with self._lock:
+                self.cache[key] = cached
+        return cached if ha <= hb else 1.0 - cached
+
+    def _pairings(self, order, met):
+        """Pairs each candidate with the next closest-ranked one it has not met."""
+        unpaired = list(order)
+        pairs = []
+        while len(unpaired) > 1:
+            i = unpaired.pop(0)
+            for position, j in enumerate(unpaired):
+                if (min(i, j), max(i, j)) not in met:
+                    pairs.append((i, unpaired.pop(position)))
+                    break
+        return pairs
+
+    def rank(self, candidates, k=3, patience=2, max_rounds=None, verbose=False):
+        """
+        Ranks the candidates.
+
+        Parameters:
+        ----------
+        candidates : list of str
+            Texts to rank, e.g. tweets from `generate_text`.
+        k : int, optional (default=3)
+            Size of the top that must be stable to stop early.
+        patience : int, optional (default=2)
+            Number of consecutive rounds the top `k` must stay unchanged.
+        max_rounds : int, optional
+            Defaults to 2 * ceil(log2(n)) + 2.
+        verbose : bool, optional
+            Whether to print the progress of each round.
+
+        Returns:
+        -------
+        pd.DataFrame
+            One row per candidate, best first: candidate, score (Bradley-Terry
+            log-strength), wins, losses, comparisons.
+        """
+        n = len(candidates)
+        rounds_needed = max(1, math.ceil(math.log2(max(n, 2))))
+        max_rounds = max_rounds or 2 * rounds_needed + 2
+        wins = np.zeros((n, n))
+        met = set()
+        order = list(range(n))
+        self._rng.shuffle(order)
+        scores = np.zeros(n)
+        top, stable = None, 0
+
+        for round_number in range(1, max_rounds + 1):
+            pairs = self._pairings(order, met)
+            if not pairs:
+                break
+            with ThreadPoolExecutor(max_workers=self.max_workers) as executor:
+                results = list(executor.map(lambda pair: self.compare(candidates[pair[0]], candidates[pair[1]]), pairs))
+            for (i, j), result in zip(pairs, results):
+                met.add((min(i, j), max(i, j)))
+                wins[i, j] += result
+                wins[j, i] += 1.0 - result
+
+            scores = fit_bradley_terry(wins)
+            order = [int(i) for i in np.argsort(-scores, kind="stable")]
+            stable = stable + 1 if order[:k] == top else 0
+            top = order[:k]
+            if verbose:
+                print(f"Round {round_number}: {len(pairs)} comparisons, {self.calls} judge calls, top {k} = {top}")
+            if round_number >= rounds_needed and stable >= patience:
+                break
+
+        if self.cache_path:
+            with open(self.cache_path, "w") as f:
+                json.dump(self.cache, f)
+
+        games = wins + wins.T
+        df = pd.DataFrame({
+            "candidate": candidates,
+            "score": scores,
+            "wins": wins.sum(axis=1),
+            "losses": wins.sum(axis=0),
+            "comparisons": (games > 0).sum(axis=1),
+        })
+        return df.iloc[order].reset_index(drop=True)
@@ -0,0 +1,306 @@
+import os
+import re
+import glob
+import json
+import pandas as pd
+
+
+
+# Column dtypes of a TwExportly tweet export. IDs are read as strings first because
+# some exports wrap them in single quotes ('1884693789341544925').
+TWEXPORTLY_DTYPES = {
+    "tweet_id": "string",
+    "text": "string",
+    "language": "string",
+    "type": "string",
+    "bookmark_count": "float64",
+    "favorite_count": "float64",
+    "retweet_count": "float64",
+    "reply_count": "float64",
+    "view_count": "float64",
+    "created_at": "string",
+    "client": "string",
+    "hashtags": "string",
+    "urls": "string",
+    "media_type": "string",
+    "media_urls": "string",
+}
+
+COUNT_COLUMNS = ["bookmark_count", "favorite_count", "retweet_count", "reply_count", "view_count"]
+
+# TwExportly_{screen_name}_tweets_{YYYY_MM_DD}.csv (screen names may contain underscores)
+FILENAME_PATTERN = re.compile(r"TwExportly_(?P<screen_name>.+)_tweets_(?P<export_date>\d{4}_\d{2}_\d{2})\.csv$")
+
+CLIENT_PATTERN = re.compile(r"<a[^>]*>(?P<name>.*?)</a>")
+
+
+
+class TwExportlyLoader:
+    """
+    A loader for TwExportly tweet exports (`data/TwExportly/*.csv`).
+
+    Exports are parsed once with explicit dtypes, cleaned (int64 tweet IDs, parsed
+    `created_at`, plain-text `client`) and cached as Parquet partitioned by screen name.
+    A cached partition is rebuilt only when one of its source CSVs has a newer mtime, and
+    reads from the cache push column projections and filters down to the Parquet scanner.
+
+    Attributes:
+    ----------
+    cache_dir : str
+        Directory of the Parquet cache. One `screen_name=<name>` folder per account.
+    """
+
+    MANIFEST_NAME = "_manifest.json"
+
+    def __init__(self, cache_dir="data/TwExportly/_parquet"):
+        """
+        Initializes the loader with the location of the Parquet cache.
+
+        Parameters:
+        ----------
+        cache_dir : str, optional (default="data/TwExportly/_parquet")
+            Directory where cached Parquet partitions and the manifest are stored.
+        """
+        self.cache_dir = cache_dir
+
+    @staticmethod
+    def parse_filename(file_path):
+        """
+        Extracts the screen name and export date from a TwExportly file name.
+
+        Parameters:
+        ----------
+        file_path : str
+            Path to a TwExportly CSV export.
+
+        Returns:
+        -------
+        tuple
+            (screen_name, export_date) or (None, None) if the file name does not match.
+        """
+        match = FILENAME_PATTERN.search(os.path.basename(file_path))
+        if not match:
+            return None, None
+        return match.group("screen_name"), match.group("export_date")
+
+    def read_export(self, file_path):
+        """
+        Reads a single TwExportly CSV export into a cleaned DataFrame.
+
+        Parameters:
+        ----------
+        file_path : str
+            Path to the CSV export.
+
+        Returns:
+        -------
+        pd.DataFrame
+            Tweets with int64 `tweet_id`, datetime `created_at`, nullable Int64 count
+            columns, plain-text `client` and a `screen_name` column taken from the file name.
+        """
+        df = pd.read_csv(
+            file_path,
+            encoding="utf-8-sig",  # strips the BOM some exports start with
+            dtype=TWEXPORTLY_DTYPES,
+            keep_default_na=True,
+        )
+
+        # Some exports contain rows without an ID (e.g. "RT @undefined"), which are dropped
+        tweet_ids = pd.to_numeric(df["tweet_id"].str.strip("'\" "), errors="coerce")
+        if tweet_ids.isna().any():
+            print(f"⚠️ Dropped {int(tweet_ids.isna().sum())} rows without a valid tweet_id from {file_path}")
+            df = df[tweet_ids.notna()].reset_index(drop=True)
+            tweet_ids = tweet_ids.dropna().reset_index(drop=True)
+        df["tweet_id"] = tweet_ids.astype("int64")
+        df["created_at"] = pd.to_datetime(df["created_at"], format="%Y-%m-%d %H:%M:%S", errors="coerce")
+        for col in COUNT_COLUMNS:
+            if col in df.columns:
+                df[col] = df[col].round().astype("Int64")
+        if "client" in df.columns:
+            df["client"] = df["client"].str.extract(CLIENT_PATTERN, expand=False).fillna(df["client"])
+
+        screen_name, _ = self.parse_filename(file_path)
+        df["screen_name"] = screen_name if screen_name else os.path.splitext(os.path.basename(file_path))[0]
+        return df
+
+    def read_directory(self, directory="data/TwExportly", pattern="TwExportly_*_tweets_*.csv"):
+        """
+        Reads every TwExportly export in a directory and concatenates them.
+
+        Parameters:
+        ----------
+        directory : str, optional (default="data/TwExportly")
+            Directory containing the CSV exports.
+        pattern : str, optional
+            Glob pattern used to select the exports.
+
+        Returns:
+        -------
+        pd.DataFrame
+            All tweets from all matching exports. A tweet found in several exports of
+            the same account is kept once, from the most recent export.
+        """
+        file_paths = sorted(glob.glob(os.path.join(directory, pattern)))
+        if not file_paths:
+            return pd.DataFrame(columns=list(TWEXPORTLY_DTYPES) + ["screen_name"])
+        return self._merge_exports([self.read_export(fp) for fp in file_paths])
+
+    @staticmethod
+    def _merge_exports(dfs):
+        """
+        Concatenates exports sorted oldest first, keeping the latest copy of each tweet of
+        an account (the same tweet can appear in the exports of several accounts).
+        """
+        df = pd.concat(dfs, ignore_index=True)
+        return df.drop_duplicates(subset=["screen_name", "tweet_id"], keep="last").reset_index(drop=True)
+
+    def _load_manifest(self):
+        manifest_path = os.path.join(self.cache_dir, self.MANIFEST_NAME)
+        if not os.path.exists(manifest_path):
+            return {}
+        with open(manifest_path, "r") as f:
+            return json.load(f)
+
+    def _save_manifest(self, manifest):
+        os.makedirs(self.cache_dir, exist_ok=True)
+        manifest_path = os.path.join(self.cache_dir, self.MANIFEST_NAME)
+        with open(manifest_path, "w") as f:
+            json.dump(manifest, f, indent=2)
+
+    def _partition_path(self, file_path):
+        screen_name, _ = self.parse_filename(file_path)
+        stem = os.path.splitext(os.path.basename(file_path))[0]
+        partition = f"screen_name={screen_name if screen_name else stem}"
+        return os.path.join(self.cache_dir, partition, "tweets.parquet")
+
+    def build_cache(self, directory="data/TwExportly", pattern="TwExportly_*_tweets_*.csv", verbose=False):
+        """
+        Converts CSV exports to the Parquet cache, skipping partitions whose cached copy is current.
+
+        All exports of an account are merged into one file of its partition, with each
+        tweet kept once (from the most recent export), so overlapping exports do not
+        duplicate tweets. A partition is rebuilt when one of its source CSVs has a
+        modification time different from the one recorded in the manifest, or when a
+        source was added or deleted. Partitions without any source left are removed.
+
+        Parameters:
+        ----------
+        directory : str, optional (default="data/TwExportly")
+            Directory containing the CSV exports.
+        pattern : str, optional
+            Glob pattern used to select the exports.
+        verbose : bool, optional
+            Whether to print which partitions are (re)built.
+
+        Returns:
+        -------
+        list of str
+            Paths of the exports that were (re)built.
+        """
+        manifest = self._load_manifest()
+        file_paths = sorted(glob.glob(os.path.join(directory, pattern)))
+        partitions = {}
+        for file_path in file_paths:
+            partitions.setdefault(self._partition_path(file_path), []).append(file_path)
+
+        # Drop cache entries for exports that no longer exist
+        stale_paths = set()
+        for key in [k for k in manifest if k.startswith(os.path.abspath(directory)) and not os.path.exists(k)]:
+            stale_paths.add(manifest.pop(key)["parquet_path"])
+        for stale_path in stale_paths - set(partitions):
+            if os.path.exists(stale_path):
+                os.remove(stale_path)
+            if verbose:
+                print(f"🗑️ Removed stale cache entry: {stale_path}")
+
+        rebuilt = []
+        for parquet_path, sources in partitions.items():
+            current = all(
+                manifest.get(os.path.abspath(fp), {}).get("mtime") == os.path.getmtime(fp)
+                and manifest[os.path.abspath(fp)]["parquet_path"] == parquet_path
+                for fp in sources
+            )
+            if current and parquet_path not in stale_paths and os.path.exists(parquet_path):
+                continue
+
+            df = self._merge_exports([self.read_export(fp) for fp in sources])
+            # screen_name is encoded in the partition directory, not stored in the file
+            df = df.drop(columns=["screen_name"])
+            partition_dir = os.path.dirname(parquet_path)
+            os.makedirs(partition_dir, exist_ok=True)
+            # Per-export files of older caches would be read twice by `load`
+            for old_path in glob.glob(os.path.join(partition_dir, "*.parquet")):
+                if old_path != parquet_path:
+                    os.remove(old_path)
+            df.to_parquet(parquet_path, index=False)
+            for fp in sources:
+                manifest[os.path.abspath(fp)] = {"mtime": os.path.getmtime(fp), "parquet_path": parquet_path}
+            rebuilt.extend(sources)
+            if verbose:
+                print(f"✅ Cached {', '.join(sources)} -> {parquet_path}")
+
+        self._save_manifest(manifest)
+        return rebuilt
+
+    def load(self, directory="data/TwExportly", columns=None, since=None, until=None,
+             screen_names=None, filters=None, refresh=True):
+        """
+        Loads tweets from the Parquet cache with column projection and predicate pushdown.
+
+        Only the requested columns are read from disk, `screen_names` prunes whole
+        partitions, and the date and custom filters are evaluated by the Parquet scanner
+        using row-group statistics, so large archives are never fully materialized.
+
+        Parameters:
+        ----------
+        directory : str, optional (default="data/TwExportly")
+            Directory containing the CSV exports backing the cache.
+        columns : list of str, optional
+            Columns to return, e.g. ["text", "favorite_count"]. Defaults to all columns.
+        since : str or datetime, optional
+            Only return tweets with `created_at` >= since.
+        until : str or datetime, optional
+            Only return tweets with `created_at` < until.
+        screen_names : list of str, optional
+            Only return tweets from these accounts.
+        filters : pyarrow.compute.Expression, optional
+            Additional filter expression, e.g. `pc.field("favorite_count") > 1000`.
+        refresh : bool, optional (default=True)
+            Whether to rebuild stale cache entries before reading.
+
+        Returns:
+        -------
+        pd.DataFrame
+            The selected tweets.
+        """
+        import pyarrow.dataset as ds
+
+        if refresh:
+            self.build_cache(directory)
+
+        if not os.path.exists(self.cache_dir):
+            return pd.DataFrame(columns=columns if columns else list(TWEXPORTLY_DTYPES) + ["screen_name"])
+
+        dataset = ds.dataset(
+            self.cache_dir,
+            format="parquet",
+            partitioning="hive",
+            exclude_invalid_files=True,
+        )
+
+        expression = None
+        if since is not None:
+            expression = self._and(expression, ds.field("created_at") >= pd.Timestamp(since).to_datetime64())
+        if until is not None:
+            expression = self._and(expression, ds.field("created_at") < pd.Timestamp(until).to_datetime64())
+        if screen_names:
+            expression = self._and(expression, ds.field("screen_name").isin(list(screen_names)))
+        if filters is not None:
+            expression = self._and(expression, filters)
+
+        table = dataset.to_table(columns=columns, filter=expression)
+        return table.to_pandas()
+
+    @staticmethod
+    def _and(expression, other):
+        return other if expression is None else expression & other
@@ -0,0 +1,55 @@
+"""
+`GenAIBatch` against `LocalBatchClient`, including resuming a job from a fresh instance.
+Run from the `main` directory:
+
+    python -m pytest -q tests/test_batch.py
+"""
+import pytest
+
+from scripts.batch import GenAIBatch, LocalBatchClient, echo_handler, EMBEDDINGS_ENDPOINT
+from scripts.genai import GenAI
+
+
+@pytest.fixture
+def genai():
+    return GenAI("sk-test")
+
+
+def queue_job(batch):
+    batch.add_text("t1", "Label this tweet", instructions="Reply with the prompt")
+    batch.add_embedding("e1", "a tweet\nto embed")
+    batch.add_embedding(2, "another tweet")
+
+
+def test_results_by_kind(genai, tmp_path):
+    client = LocalBatchClient(storage_dir=str(tmp_path / "local"))
+    batch = GenAIBatch(genai, client=client, work_dir=str(tmp_path))
+    queue_job(batch)
+    results = batch.run(poll_interval=0)
+    assert results["t1"] == "Label this tweet"
+    assert results["e1"] == echo_handler(EMBEDDINGS_ENDPOINT, {"input": "a tweet to embed", "model": "m"})["data"][0]["embedding"]
+    assert batch.map_results(["e1", 2, "missing"])[2] is None
+
+
+def test_fresh_instance_attaches_to_submitted_batches(genai, tmp_path):
+    client = LocalBatchClient(storage_dir=str(tmp_path / "local"))
+    submitter = GenAIBatch(genai, client=client, work_dir=str(tmp_path))
+    queue_job(submitter)
+    batch_ids = list(submitter.submit())
+    expected = submitter.results()
+
+    resumed = GenAIBatch(genai, client=client, work_dir=str(tmp_path))
+    statuses = resumed.attach(batch_ids)
+    assert set(statuses) == set(batch_ids)
+    assert resumed.wait(poll_interval=0) == statuses
+    results = resumed.results()
+    assert results == expected
+    assert isinstance(results["e1"], list) and isinstance(results["2"], list)
+    assert isinstance(results["t1"], str)
+
+
+def test_duplicate_custom_id(genai, tmp_path):
+    batch = GenAIBatch(genai, client=LocalBatchClient(storage_dir=str(tmp_path / "local")), work_dir=str(tmp_path))
+    batch.add_embedding(1, "a")
+    with pytest.raises(ValueError):
+        batch.add_text("1", "b")
@@ -0,0 +1,292 @@
+"""
+Behavioral parity of the `scripts.chatgpt` facade with the module it replaced.
+
+The original functions are reproduced below as the reference. Both implementations are
+run against the same recording fake OpenAI client, and the request payloads and return
+values must match. Run from the `main` directory:
+
+    python -m pytest -q tests/test_chatgpt_parity.py
+"""
+import base64
+import re
+import time
+import types
+
+import pytest
+import requests
+from IPython.display import display, HTML
+
+from scripts import chatgpt
+
+
+# ---------------------------------------------------------------------------------------
+# Reference: scripts/chatgpt.py before it became a facade over GenAI
+# ---------------------------------------------------------------------------------------
+
+def legacy_generate_text(prompt, instructions, client, model="gpt-4o", output_type='text'):
+    completion = client.chat.completions.create(
+        model=model,
+        response_format={"type": output_type},
+        messages=[
+            {"role": "system", "content": instructions},
+            {"role": "user", "content": prompt}
+        ]
+    )
+    return completion.choices[0].message.content
+
+
+def legacy_generate_image(prompt, client, model="dall-e-3"):
+    response_img = client.images.generate(model=model, prompt=prompt, size="1024x1024", quality="standard", n=1)
+    time.sleep(1)
+    return response_img.data[0].url, response_img.data[0].revised_prompt
+
+
+def legacy_generate_image_description(image_urls, instructions, client):
+    messages = [{
+        "role": "user",
+        "content": [{"type": "text", "text": instructions},
+                    *map(lambda x: {"type": "image_url", "image_url": {"url": x}}, image_urls)],
+    }]
+    response = client.chat.completions.create(model="gpt-4o", messages=messages, max_tokens=1000)
+    return response.choices[0].message.content
+
+
+def legacy_encode_image(image_path):
+    with open(image_path, "rb") as image_file:
+        return base64.b64encode(image_file.read()).decode('utf-8')
+
+
+def legacy_display_image_url(image_url, width=500, height=500):
+    base64_image = base64.b64encode(requests.get(image_url).content).decode('utf-8')
+    return f'<img src="data:image/jpeg;base64,{base64_image}" width="{width}" height="{height}"/>'
+
+
+def legacy_display_tweet(text='life is good', screen_name='zlisto'):
+    display_html = f'''
+    <!DOCTYPE html>
+    <html>
+    <head>
+        <style>
+            .tweet {{
+                background-color: white;
+                color: black;
+                border: 1px solid #e1e8ed;
+                border-radius: 10px;
+                padding: 20px;
+                max-width: 500px;
+                margin: 20px auto;
+                font-family: 'Helvetica Neue', Helvetica, Arial, sans-serif;
+                box-shadow: 0px 0px 10px rgba(0,0,0,0.1);
+            }}
+            .user strong {{
+                color: #1da1f2;
+            }}
+            .tweet-text p {{
+                margin: 0;
+                line-height: 1.5;
+            }}
+        </style>
+    </head>
+    <body>
+        <div class="tweet">
+            <div class="user">
+                <strong>@{screen_name}</strong>
+            </div>
+            <div class="tweet-text">
+                <p>{text}</p>
+            </div>
+        </div>
+    </body>
+    </html>
+    '''
+    display(HTML(display_html))
+    return display_html
+
+
+def legacy_display_IG(caption, image_url, screen_name=None, profile_image_url=None):
+    display_html = f"""
+    <style>
+        .instagram-post {{
+            border: 1px solid #e1e1e1;
+            border-radius: 3px;
+            width: 600px;
+            margin: 20px auto;
+            background-color: white;
+            font-family: 'Helvetica Neue', Helvetica, Arial, sans-serif;
+        }}
+        .instagram-header {{
+            padding: 14px;
+            border-bottom: 1px solid #e1e1e1;
+            display: flex;
+            align-items: center;
+        }}
+        .instagram-profile-pic {{
+            border-radius: 50%;
+            width: 32px;
+            height: 32px;
+            margin-right: 10px;
+        }}
+        .instagram-screen-name {{
+            font-weight: bold;
+            color: #262626;
+            text-decoration: none;
+            font-size: 14px;
+        }}
+        .instagram-image {{
+            max-width: 600px;
+            width: auto;
+            height: auto;
+            display: block;
+            margin: auto;
+        }}
+        .instagram-caption {{
+            padding: 10px;
+            font-size: 14px;
+            color: #262626;
+        }}
+        .instagram-footer {{
+            padding: 10px;
+            border-top: 1px solid #e1e1e1;
+        }}
+        .instagram-likes {{
+            font-weight: bold;
+            margin-bottom: 8px;
+        }}
+    </style>
+    <div class="instagram-post">
+        <div class="instagram-header">
+            <img src="{profile_image_url}" alt="Profile picture" class="instagram-profile-pic">
+            <a href="#" class="instagram-screen-name">{screen_name}</a>
+        </div>
+        <img src="{image_url}" alt="Instagram image" class="instagram-image">
+        <div class="instagram-caption">
+            <a href="#" class="instagram-screen-name">{screen_name}</a> {caption}
+        </div>
+        <div class="instagram-footer">
+            <div class="instagram-likes">24 likes</div>
+            <!-- Include other footer content here -->
+        </div>
+    </div>
+    """
+    display(HTML(display_html))
+    return display_html
+
+
+# ---------------------------------------------------------------------------------------
+# Recording fake client
+# ---------------------------------------------------------------------------------------
+
+class RecordingClient:
+    """Fake OpenAI client that records every request and returns canned responses."""
+
+    api_key = "sk-test"
+    base_url = "http://fake-openai.local/v1/"
+
+    def __init__(self):
+        self.requests = []
+        self.chat = types.SimpleNamespace(completions=types.SimpleNamespace(create=self._chat))
+        self.images = types.SimpleNamespace(generate=self._images)
+
+    def _chat(self, **params):
+        self.requests.append(("chat.completions.create", params))
+        message = types.SimpleNamespace(content="```json\n{\"reply\": \"ok\"}\n```")
+        usage = types.SimpleNamespace(prompt_tokens=12, completion_tokens=5, prompt_tokens_details=None)
+        return types.SimpleNamespace(choices=[types.SimpleNamespace(message=message)], usage=usage)
+
+    def _images(self, **params):
+        self.requests.append(("images.generate", params))
+        image = types.SimpleNamespace(url="https://images.local/1.png", revised_prompt="A revised prompt")
+        return types.SimpleNamespace(data=[image])
+
+
+@pytest.fixture
+def clients(monkeypatch):
+    """(legacy client, facade client); the facade's shared GenAI sends to the second one."""
+    monkeypatch.setattr(time, "sleep", lambda seconds: None)
+    monkeypatch.setattr(requests, "get", lambda url, **kwargs: types.SimpleNamespace(content=b"\x89PNG image bytes"))
+    legacy, facade = RecordingClient(), RecordingClient()
+    monkeypatch.setattr(chatgpt, "_shared_genai", {})
+    chatgpt.get_genai(facade).client = facade
+    return legacy, facade
+
+
+def normalize_html(html):
+    return re.sub(r"\s+", " ", html).strip()
+
+
+# ---------------------------------------------------------------------------------------
+# Tests
+# ---------------------------------------------------------------------------------------
+
+@pytest.mark.parametrize("kwargs", [{}, {"model": "gpt-4o-mini", "output_type": "json_object"}])
+@pytest.mark.parametrize("instructions", [
+    "You are Jarvis",
+    "You are Jarvis.  \nAnswer in markdown:  \n- one line\n\n",  # trailing spaces and newlines
+    "Line one\r\nLine two\t\n",
+])
+def test_generate_text(clients, kwargs, instructions):
+    legacy, facade = clients
+    expected = legacy_generate_text("Write a tweet  \n", instructions, legacy, **kwargs)
+    assert chatgpt.generate_text("Write a tweet  \n", instructions, facade, **kwargs) == expected
+    assert facade.requests == legacy.requests
+
+
+def test_star_import_names():
+    namespace = {}
+    exec("from scripts.chatgpt import *", namespace)
+    for name in ("generate_text", "display_IG", "display", "HTML", "Image", "Audio", "openai", "requests"):
+        assert name in namespace
+
+
+def test_generate_image(clients):
+    legacy, facade = clients
+    expected = legacy_generate_image("A cat on a skateboard", legacy)
+    assert chatgpt.generate_image("A cat on a skateboard", facade) == expected
+    assert facade.requests == legacy.requests
+
+
+def test_generate_image_description(clients):
+    legacy, facade = clients
+    urls = ["https://images.local/1.png", "https://images.local/2.png"]
+    expected = legacy_generate_image_description(urls, "Describe the images", legacy)
+    assert chatgpt.generate_image_description(urls, "Describe the images", facade) == expected
+    assert facade.requests == legacy.requests
+
+
+def test_shared_genai_per_client_key(clients):
+    _, facade = clients
+    assert chatgpt.get_genai(facade) is chatgpt.get_genai(RecordingClient())
+    other = RecordingClient()
+    other.api_key = "sk-other"
+    assert chatgpt.get_genai(other) is not chatgpt.get_genai(facade)
+
+
+def test_encode_image(tmp_path):
+    image_path = tmp_path / "image.jpg"
+    image_path.write_bytes(b"\xff\xd8\xff\xe0 jpeg bytes")
+    assert chatgpt.encode_image(str(image_path)) == legacy_encode_image(str(image_path))
+
+
+def test_display_image_url(clients):
+    url = "https://images.local/1.png"
+    assert chatgpt.display_image_url(url) == legacy_display_image_url(url)
+    assert chatgpt.display_image_url(url, width=100, height=80) == legacy_display_image_url(url, width=100, height=80)
+
+
+def test_display_image_url_rejects_non_http_urls(clients):
+    # Behavior change: the legacy function passed any string to requests.get
+    with pytest.raises(ValueError):
+        chatgpt.display_image_url("data/image.png")
+
+
+def test_display_tweet():
+    assert normalize_html(chatgpt.display_tweet("hello <b>world</b>", "jarvis")) == \
+        normalize_html(legacy_display_tweet("hello <b>world</b>", "jarvis"))
+    assert normalize_html(chatgpt.display_tweet()) == normalize_html(legacy_display_tweet())
+
+
+def test_display_IG():
+    args = ("Caption #tag", "https://images.local/1.png")
+    kwargs = {"screen_name": "jarvis", "profile_image_url": "https://images.local/me.png"}
+    assert normalize_html(chatgpt.display_IG(*args, **kwargs)) == normalize_html(legacy_display_IG(*args, **kwargs))
+    assert normalize_html(chatgpt.display_IG(*args)) == normalize_html(legacy_display_IG(*args))
@@ -0,0 +1,36 @@
+"""
+Chunked embedding clustering of `scripts.clustering`. Run from the `main` directory:
+
+    python -m pytest -q tests/test_clustering.py
+"""
+import numpy as np
+import pytest
+from sklearn.metrics import adjusted_rand_score
+
+from scripts.clustering import EmbeddingClusterer, embeddings_to_npy, load_embeddings
+
+
+def ordered_blobs(n_blobs=5, per_blob=4000, dim=64, seed=1):
+    """Blobs written one after another, like one account's export after another's."""
+    rng = np.random.default_rng(seed)
+    centers = rng.normal(0, 1, (n_blobs, dim))
+    X = np.vstack([center + rng.normal(0, 0.2, (per_blob, dim)) for center in centers]).astype(np.float32)
+    return X, np.repeat(np.arange(n_blobs), per_blob)
+
+
+@pytest.mark.parametrize("random_state", [0, 1, 2])
+def test_ordered_data(random_state):
+    X, y = ordered_blobs()
+    clusterer = EmbeddingClusterer(n_clusters=5, n_components=10, chunk_size=1000, random_state=random_state).fit(X)
+    assert adjusted_rand_score(y, clusterer.predict(X)["kmeans_label"]) > 0.95
+
+
+def test_memmap_save_and_load(tmp_path):
+    X, y = ordered_blobs(per_blob=500)
+    X = load_embeddings(embeddings_to_npy(list(X), str(tmp_path / "embeddings.npy")))
+    clusterer = EmbeddingClusterer(n_clusters=5, n_components=10, chunk_size=600).fit(X)
+    clusterer.save(str(tmp_path / "clusters.joblib"))
+    restored = EmbeddingClusterer.load(str(tmp_path / "clusters.joblib"))
+    labels = restored.predict(X)["kmeans_label"]
+    assert labels.tolist() == clusterer.predict(X)["kmeans_label"].tolist()
+    assert adjusted_rand_score(y, labels) > 0.95
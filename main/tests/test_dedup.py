@@ -0,0 +1,47 @@
+"""
+Near-duplicate clustering of `scripts.dedup`. Run from the `main` directory:
+
+    python -m pytest -q tests/test_dedup.py
+"""
+import numpy as np
+
+from scripts.dedup import TextDeduplicator, fan_out
+
+
+def test_retweets_and_near_duplicates_cluster():
+    tweet = "Our new reasoning model is available today in the API and in ChatGPT for all paid users"
+    texts = [
+        tweet,
+        f"RT @openai: {tweet}",
+        tweet.replace("today", "now") + " https://t.co/abc",
+        "Completely different tweet about basketball and the playoffs tonight",
+    ]
+    labels = TextDeduplicator(threshold=0.7).cluster(texts)
+    assert labels.tolist() == [0, 0, 0, 3]
+
+
+def test_url_and_mention_only_tweets_stay_singletons():
+    texts = [
+        "https://t.co/AbCdEf1234",
+        "https://t.co/ZyXwVu9876",
+        "@elonmusk",
+        "@sama @openai",
+        "www.example.com/page",
+        "https://t.co/AbCdEf1234",  # even the same link: the media behind it is unknown
+        "ok",
+    ]
+    labels = TextDeduplicator().cluster(texts)
+    assert labels.tolist() == list(range(len(texts)))
+
+
+def test_fan_out_does_not_share_answers_between_url_only_tweets():
+    texts = ["https://t.co/one", "https://t.co/two", "Same words here", "RT @a: Same words here"]
+    calls = []
+    answers = fan_out(texts, TextDeduplicator().cluster(texts), lambda text: calls.append(text) or text.upper())
+    assert answers == ["HTTPS://T.CO/ONE", "HTTPS://T.CO/TWO", "SAME WORDS HERE", "SAME WORDS HERE"]
+    assert len(calls) == 3
+
+
+def test_all_short_texts():
+    labels = TextDeduplicator().cluster(["", "@a", "https://t.co/x"])
+    assert np.array_equal(labels, np.arange(3))
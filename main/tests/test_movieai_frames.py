@@ -0,0 +1,48 @@
+"""
+Frame byte budget of `MovieAI.sample_clip_frames` (FFmpeg and the sampler are replaced by a
+recording stand-in). Run from the `main` directory:
+
+    python -m pytest -q tests/test_movieai_frames.py
+"""
+import pytest
+
+from scripts import movieai
+from scripts.genai import MAX_VISION_REQUEST_BYTES
+from scripts.movieai import MovieAI
+
+
+class RecordingSampler:
+    instances = []
+
+    def __init__(self, ffmpeg_path, **kwargs):
+        self.kwargs = kwargs
+        RecordingSampler.instances.append(self)
+
+    def sample(self, file_path, boundaries, max_samples=15):
+        return [([], 0, 30.0) for _ in boundaries]
+
+
+@pytest.fixture
+def movie(monkeypatch):
+    RecordingSampler.instances = []
+    monkeypatch.setattr(movieai.shutil, "which", lambda path: path)  # no FFmpeg needed
+    monkeypatch.setattr(movieai, "FrameSampler", RecordingSampler)
+    monkeypatch.setattr(MovieAI, "segment_boundaries",
+                        staticmethod(lambda directory: (["clips/a.mp4", "clips/b.mp4"], [(0, 60), (60, 120)])))
+    return MovieAI("sk-test")
+
+
+@pytest.mark.parametrize("max_request_bytes, expected", [
+    (MAX_VISION_REQUEST_BYTES, MAX_VISION_REQUEST_BYTES // 10),
+    (1_000_000, 100_000),
+    (None, None),
+])
+def test_sampled_frames_share_the_request_budget(movie, max_request_bytes, expected):
+    samples = movie.sample_clip_frames("movie.mp4", "clips", max_samples=10, max_request_bytes=max_request_bytes)
+    assert len(samples) == 2
+    assert RecordingSampler.instances[0].kwargs["max_frame_bytes"] == expected
+
+
+def test_default_budget(movie):
+    movie.sample_clip_frames("movie.mp4", "clips", max_samples=10)
+    assert RecordingSampler.instances[0].kwargs["max_frame_bytes"] == MAX_VISION_REQUEST_BYTES // 10
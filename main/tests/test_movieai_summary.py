@@ -0,0 +1,31 @@
+"""
+Window summaries of the hierarchical summary script (`MovieAI.generate_summary_script`).
+Run from the `main` directory:
+
+    python -m pytest -q tests/test_movieai_summary.py
+"""
+import json
+
+import pandas as pd
+
+from scripts.movieai import MovieAI
+
+WINDOW = pd.DataFrame({"clip_path": [f"clips/clip_{i:03d}.mp4" for i in range(12)], "description": "A scene"})
+
+
+def test_window_summary_keeps_at_most_clips_per_window():
+    response = json.dumps({"summary": "The heist", "clip_paths": list(WINDOW["clip_path"])})
+    summary, clip_paths = MovieAI._parse_window_summary(response, WINDOW, 3)
+    assert summary == "The heist"
+    assert clip_paths == ["clips/clip_000.mp4", "clips/clip_001.mp4", "clips/clip_002.mp4"]
+
+
+def test_unparseable_window_summary_falls_back_to_evenly_spaced_clips():
+    summary, clip_paths = MovieAI._parse_window_summary("Sorry, I cannot help with that.", WINDOW, 4)
+    assert summary == ""
+    assert clip_paths == ["clips/clip_000.mp4", "clips/clip_004.mp4", "clips/clip_007.mp4", "clips/clip_011.mp4"]
+
+
+def test_unknown_clip_paths_fall_back_to_evenly_spaced_clips():
+    response = json.dumps({"summary": "s", "clip_paths": ["clips/not_in_window.mp4"]})
+    assert len(MovieAI._parse_window_summary(response, WINDOW, 5)[1]) == 5
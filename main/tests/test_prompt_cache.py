@@ -0,0 +1,34 @@
+"""
+Message layout of `scripts.prompt_cache.PromptLayout`. Run from the `main` directory:
+
+    python -m pytest -q tests/test_prompt_cache.py
+"""
+from scripts.prompt_cache import PromptLayout
+
+
+def test_build_sends_text_verbatim():
+    instructions = "Line one  \nLine two\n\n"
+    context = "Clip list\r\n- a.mp4  \n"
+    messages, prefix = PromptLayout().build("Write the script", instructions, context=context)
+    assert messages == [
+        {"role": "system", "content": instructions},
+        {"role": "system", "content": context},
+        {"role": "user", "content": "Write the script"},
+    ]
+    assert prefix == messages[:2]
+
+
+def test_fingerprint_ignores_line_endings_and_trailing_whitespace():
+    a = [{"role": "system", "content": "Line one  \r\nLine two\n\n"}]
+    b = [{"role": "system", "content": "Line one\nLine two"}]
+    c = [{"role": "system", "content": "Line one\nLine 2"}]
+    assert PromptLayout.fingerprint(a) == PromptLayout.fingerprint(b) != PromptLayout.fingerprint(c)
+
+
+def test_check_warns_only_on_real_prefix_changes(capsys):
+    layout = PromptLayout(min_cacheable_tokens=0)
+    layout.check(layout.build("q1", "You are Jarvis\n")[1], "jarvis")
+    layout.check(layout.build("q2", "You are Jarvis")[1], "jarvis")
+    assert "changed" not in capsys.readouterr().out
+    layout.check(layout.build("q3", "You are Friday")[1], "jarvis")
+    assert "changed" in capsys.readouterr().out
@@ -0,0 +1,82 @@
+"""
+Request validation and caching policy of `scripts.service`, with a fake GenAI and Flask's
+test client. Run from the `main` directory:
+
+    python -m pytest -q tests/test_service.py
+"""
+import itertools
+
+import pytest
+
+from scripts.instrumentation import MetricsRegistry
+from scripts.service import create_app
+
+
+class FakeGenAI:
+    """Answers every text request with a new sample and counts the calls."""
+
+    def __init__(self):
+        self.metrics = MetricsRegistry()
+        self.samples = itertools.count()
+        self.calls = []
+
+    def generate_text(self, prompt, instructions, model="gpt-4o-mini", temperature=1, **kwargs):
+        self.calls.append(("generate_text", prompt, temperature))
+        return f"{prompt} #{next(self.samples)}"
+
+    def generate_image_url_description(self, image_urls, instructions, model='gpt-4o-mini'):
+        self.calls.append(("generate_image_url_description", tuple(image_urls), instructions))
+        return f"{len(image_urls)} image(s)"
+
+
+@pytest.fixture
+def service(tmp_path):
+    genai = FakeGenAI()
+    app = create_app(genai, cache_path=str(tmp_path / "cache.sqlite3"))
+    return app.test_client(), genai
+
+
+@pytest.mark.parametrize("endpoint, payload", [
+    ("/get_embedding", {"text": 5}),
+    ("/generate_text", {"prompt": ["a list"]}),
+    ("/generate_text", {"prompt": "hi", "temperature": "0"}),
+    ("/generate_text", {"prompt": "hi", "temperature": True}),
+    ("/generate_text", {"prompt": "hi", "cache": "yes"}),
+    ("/generate_image_description", {"image_urls": ["https://a.local/1.png", 3], "instructions": "Describe"}),
+])
+def test_wrong_field_types_are_rejected(service, endpoint, payload):
+    client, genai = service
+    response = client.post(endpoint, json=payload)
+    assert response.status_code == 400
+    assert "must be" in response.get_json()["error"]
+    assert genai.calls == []
+
+
+def test_sampled_text_is_not_cached_by_default(service):
+    client, _ = service
+    answers = [client.post("/generate_text", json={"prompt": "hi"}).get_json() for _ in range(2)]
+    assert answers[0]["result"] != answers[1]["result"]
+    assert {answer["source"] for answer in answers} == {"upstream"}
+
+
+def test_sampled_text_is_cached_on_request(service):
+    client, _ = service
+    answers = [client.post("/generate_text", json={"prompt": "hi", "cache": True}).get_json() for _ in range(2)]
+    assert answers[0]["result"] == answers[1]["result"]
+    assert answers[1]["source"] == "cache"
+
+
+def test_deterministic_text_is_cached(service):
+    client, genai = service
+    answers = [client.post("/generate_text", json={"prompt": "hi", "temperature": 0}).get_json() for _ in range(2)]
+    assert answers[0]["result"] == answers[1]["result"]
+    assert answers[1]["source"] == "cache"
+    assert len(genai.calls) == 1
+
+
+def test_image_description_uses_urls(service):
+    client, genai = service
+    response = client.post("/generate_image_description",
+                           json={"image_urls": "https://a.local/1.png", "instructions": "Describe"})
+    assert response.get_json()["result"] == "1 image(s)"
+    assert genai.calls == [("generate_image_url_description", ("https://a.local/1.png",), "Describe")]
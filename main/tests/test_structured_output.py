@@ -0,0 +1,49 @@
+"""
+JSON repair and streaming parsing of `scripts.structured_output`. Run from the `main`
+directory:
+
+    python -m pytest -q tests/test_structured_output.py
+"""
+import doctest
+
+from scripts import structured_output
+from scripts.structured_output import JSONListStream, parse_json_response
+
+
+def feed_all(stream, text, chunk_size):
+    records = []
+    for start in range(0, len(text), chunk_size):
+        records += stream.feed(text[start:start + chunk_size])
+    return records
+
+
+def test_stream_stops_when_the_script_list_closes():
+    text = '{"script":[{"a":1}], "extra":[{"b":2}]}'
+    for chunk_size in (1, 3, len(text)):
+        assert feed_all(JSONListStream(), text, chunk_size) == [{"a": 1}]
+
+
+def test_stream_skips_lists_under_other_keys():
+    text = '{"notes": [], "other": [{"n": 1}], "script": [{"a": 1}, {"a": "[not a list]"}]}'
+    for chunk_size in (1, 5, len(text)):
+        assert feed_all(JSONListStream(), text, chunk_size) == [{"a": 1}, {"a": "[not a list]"}]
+
+
+def test_stream_custom_key_and_nested_values():
+    text = '{"script": [{"x": 0}], "segments" : [{"b": {"c": [1, 2]}}, {"d": "\\"q\\""}]}'
+    assert feed_all(JSONListStream("segments"), text, 2) == [{"b": {"c": [1, 2]}}, {"d": '"q"'}]
+
+
+def test_stream_top_level_list():
+    assert feed_all(JSONListStream(), '[{"a": 1}, {"a": 2}]', 4) == [{"a": 1}, {"a": 2}]
+
+
+def test_doctests():
+    results = doctest.testmod(structured_output)
+    assert results.attempted > 0 and results.failed == 0
+
+
+def test_raw_control_characters_in_strings():
+    text = '{"script": [{"line": "Hello,\nworld\t!"}]}'
+    assert parse_json_response(text) == {"script": [{"line": "Hello,\nworld\t!"}]}
+    assert parse_json_response("Here it is:\n" + text + "\nEnjoy!") == {"script": [{"line": "Hello,\nworld\t!"}]}
@@ -0,0 +1,59 @@
+"""
+Parity of the pandas (`re`) and pyarrow (RE2) paths of `scripts.textclean.TextCleaner`.
+Run from the `main` directory:
+
+    python -m pytest -q tests/test_textclean.py
+"""
+import glob
+import os
+
+import pandas as pd
+import pyarrow as pa
+import pytest
+
+from scripts.textclean import TextCleaner
+
+NON_ASCII_TWEETS = [
+    "Hi @josé #café end x",
+    "¡Olé! @Zoë_99 y #España2024 https://t.co/AbC ahora",
+    "Привет @друг #новости конец",
+    "東京 #東京オリンピック @ユーザー１ です　よ",
+    "naïve café 😀🇫🇷 #crème_brûlée next line",
+    "   leading and trailing   ",
+    "@@double ##hash www.example.com/ü x",
+    "",
+    None,
+]
+
+CLEANERS = [
+    TextCleaner(),
+    TextCleaner(urls=True, mentions=True, hashtags=True, emojis=True, whitespace=True),
+    TextCleaner(urls=False, mentions=True, hashtags=False, whitespace=False),
+    TextCleaner(urls=True, mentions=False, hashtags=True, emojis=True, whitespace=False),
+]
+
+
+def assert_same(cleaner, texts):
+    texts = [None if pd.isna(t) else t for t in texts]
+    expected = cleaner.clean(pd.Series(texts, dtype="string")).tolist()
+    actual = cleaner.clean_arrow(pa.array(texts, type=pa.string())).to_pylist()
+    assert [None if pd.isna(t) else t for t in expected] == actual
+
+
+@pytest.mark.parametrize("cleaner", CLEANERS)
+def test_non_ascii_parity(cleaner):
+    assert_same(cleaner, NON_ASCII_TWEETS)
+
+
+def test_non_ascii_mentions_and_hashtags_are_removed_whole():
+    cleaner = TextCleaner(mentions=True, hashtags=True)
+    assert cleaner.clean_arrow(pa.array(["Hi @josé #café end x"])).to_pylist() == ["Hi end x"]
+
+
+@pytest.mark.parametrize("cleaner", CLEANERS)
+def test_twexportly_parity(cleaner):
+    paths = sorted(glob.glob(os.path.join("data", "TwExportly", "TwExportly_*_tweets_*.csv")))
+    if not paths:
+        pytest.skip("TwExportly exports not found (run from the main directory)")
+    texts = pd.concat([pd.read_csv(path, usecols=["text"], dtype="string")["text"] for path in paths])
+    assert_same(cleaner, texts.tolist())